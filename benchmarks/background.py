@@ -0,0 +1,211 @@
+"""
+Background Queue Benchmarks.
+
+Standalone (offline) runner measuring the overhead of the Background Queue:
+
+* enqueue latency of BackgroundQueue.put().
+* throughput (tasks/sec) of coroutine, sync, partial and TaskWrapper tasks.
+* p50/p99 queue wait of the tasks.
+* round trip of coroutine_in_thread (Event Loop Pool).
+* memory per 10k queued tasks.
+
+Usage:
+    python benchmarks/background.py [--tasks 10000] [--workers 5]
+        [--output results.json] [--compare baseline.json] [--threshold 0.2]
+
+With --compare the run fails (exit code 1) when a metric is worse than the
+baseline by more than threshold (20% by default).
+"""
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import tracemalloc
+from functools import partial
+from aiohttp import web
+import orjson
+from navigator.background import (
+    BackgroundQueue,
+    TaskWrapper,
+    coroutine_in_thread
+)
+
+
+# metrics where a higher value is better (the others: lower is better).
+HIGHER_IS_BETTER = ('tasks_per_sec',)
+
+
+def percentile(values: list, pct: float) -> float:
+    values = sorted(values)
+    if not values:
+        return 0.0
+    idx = min(int(round(pct / 100 * (len(values) - 1))), len(values) - 1)
+    return values[idx]
+
+
+async def noop_coro(x):
+    return x
+
+
+def noop_sync(x):
+    return x
+
+
+def make_task(kind: str, i: int):
+    if kind == 'coroutine':
+        return (noop_coro, (i,))
+    if kind == 'sync':
+        return (noop_sync, (i,))
+    if kind == 'partial':
+        return (partial(noop_sync, i), ())
+    return (TaskWrapper(noop_coro, i), ())
+
+
+async def new_queue(workers: int, size: int) -> tuple:
+    app = web.Application()
+    queue = BackgroundQueue(
+        app,
+        max_workers=workers,
+        queue_size=size,
+        drain_timeout=30
+    )
+    return app, queue
+
+
+async def discard(app: web.Application, queue: BackgroundQueue) -> None:
+    """Stop a queue without running its pending tasks."""
+    queue.queue.drain()
+    queue._tasks.clear()  # pylint: disable=W0212
+    await queue.on_cleanup(app)
+
+
+async def bench_enqueue(tasks: int, workers: int) -> dict:
+    """Latency of put() (consumers not started, no contention)."""
+    app, queue = await new_queue(workers, tasks)
+    latencies = []
+    for i in range(tasks):
+        started = time.perf_counter()
+        await queue.put(noop_coro, i)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    await discard(app, queue)
+    return {
+        "put_p50_us": percentile(latencies, 50),
+        "put_p99_us": percentile(latencies, 99)
+    }
+
+
+async def bench_throughput(kind: str, tasks: int, workers: int) -> dict:
+    """Tasks/sec and queue wait of a kind of task."""
+    app, queue = await new_queue(workers, 0)
+    await queue.on_startup(app)
+    started = time.perf_counter()
+    handles = []
+    for i in range(tasks):
+        fn, args = make_task(kind, i)
+        handles.append(await queue.put(fn, *args))
+    await asyncio.gather(*(handle.wait() for handle in handles))
+    elapsed = time.perf_counter() - started
+    waits = [
+        (handle.started_at - handle.created_at) * 1000 for handle in handles
+    ]
+    await queue.on_cleanup(app)
+    return {
+        f"{kind}.tasks_per_sec": tasks / elapsed,
+        f"{kind}.wait_p50_ms": percentile(waits, 50),
+        f"{kind}.wait_p99_ms": percentile(waits, 99)
+    }
+
+
+async def bench_coroutine_in_thread(tasks: int) -> dict:
+    """Round trip of a coroutine on the Event Loop Pool."""
+    latencies = []
+    for i in range(tasks):
+        started = time.perf_counter()
+        await asyncio.wrap_future(coroutine_in_thread(noop_coro(i)))
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return {
+        "coroutine_in_thread_p50_us": percentile(latencies, 50),
+        "coroutine_in_thread_p99_us": percentile(latencies, 99)
+    }
+
+
+async def bench_memory(workers: int, tasks: int = 10000) -> dict:
+    """Memory allocated by 10k queued (not running) tasks."""
+    app, queue = await new_queue(workers, 0)
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for i in range(tasks):
+        await queue.put(noop_coro, i)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await discard(app, queue)
+    return {
+        "memory_per_10k_kb": (after - before) / 1024 * (10000 / tasks)
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    results = {}
+    results.update(await bench_enqueue(args.tasks, args.workers))
+    for kind in ('coroutine', 'sync', 'partial', 'taskwrapper'):
+        results.update(
+            await bench_throughput(kind, args.tasks, args.workers)
+        )
+    results.update(await bench_coroutine_in_thread(min(args.tasks, 2000)))
+    results.update(await bench_memory(args.workers))
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Returns the metrics worse than the baseline (by more than threshold)."""
+    regressions = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if name.endswith(HIGHER_IS_BETTER):
+            change = (base - value) / base
+        else:
+            change = (value - base) / base
+        if change > threshold:
+            regressions.append((name, base, value, change))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=5)
+    parser.add_argument('--output', help='save the results (JSON).')
+    parser.add_argument('--compare', help='baseline results (JSON).')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument(
+        '--verbose', action='store_true', help='keep the per-task logging.'
+    )
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.getLogger('NAV.Queue').setLevel(logging.WARNING)
+    results = asyncio.run(run(args))
+    print(f"Python {platform.python_version()} ({platform.machine()})")
+    for name, value in results.items():
+        print(f"{name:<36} {value:>14.2f}")
+    if args.output:
+        with open(args.output, 'wb') as fp:
+            fp.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    if args.compare:
+        with open(args.compare, 'rb') as fp:
+            baseline = orjson.loads(fp.read())
+        regressions = compare(results, baseline, args.threshold)
+        for name, base, value, change in regressions:
+            print(
+                f"REGRESSION {name}: {base:.2f} -> {value:.2f} ({change:+.0%})"
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
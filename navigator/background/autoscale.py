@@ -0,0 +1,122 @@
+"""
+Autoscaler.
+
+Grows and shrinks the consumers (and executor threads) of a Background Queue
+between bounds, based on queue depth, queue wait time and CPU utilization.
+"""
+from typing import Any, Optional
+import os
+import time
+import asyncio
+import psutil
+from navconfig.logging import logging
+
+
+class Autoscaler:
+    """Autoscaler.
+
+    Every `interval` seconds the number of consumers is evaluated:
+
+    * scale up (by half of the current consumers) when there are pending tasks
+      and the queue wait time is above `target_wait` (or all consumers are
+      busy), unless the CPU utilization is above `cpu_limit`.
+    * scale down (one consumer at a time) after `idle_time` seconds without
+      pending tasks and with idle consumers.
+
+    Args:
+        queue: the BackgroundQueue.
+        min_workers: minimum number of consumers.
+        max_workers: maximum number of consumers.
+        interval: seconds between evaluations.
+        target_wait: queue wait time (in seconds) triggering a scale up.
+        cpu_limit: CPU utilization (percent of all CPUs) blocking scale ups.
+        idle_time: seconds without pending tasks before a scale down.
+    """
+    def __init__(
+        self,
+        queue: Any,
+        min_workers: int = 1,
+        max_workers: int = 5,
+        interval: float = 1.0,
+        target_wait: float = 0.5,
+        cpu_limit: float = 85.0,
+        idle_time: float = 30.0
+    ):
+        if not 1 <= min_workers <= max_workers:
+            raise ValueError(
+                f"Invalid Autoscaler bounds: {min_workers} - {max_workers}"
+            )
+        self.queue = queue
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.interval = interval
+        self.target_wait = target_wait
+        self.cpu_limit = cpu_limit
+        self.idle_time = idle_time
+        self.logger = logging.getLogger('NAV.Queue.Autoscaler')
+        self._wait: float = 0.0
+        self._busy_at: float = time.monotonic()
+        self._process = psutil.Process()
+        self._cpus: int = os.cpu_count() or 1
+        self._runner: Optional[asyncio.Task] = None
+
+    def __repr__(self):
+        return f"<Autoscaler {self.min_workers}-{self.max_workers}>"
+
+    def observe(self, wait: float) -> None:
+        """Record the queue wait time of a dequeued task (moving average)."""
+        self._wait += (wait - self._wait) * 0.2
+
+    @property
+    def wait(self) -> float:
+        return self._wait
+
+    def start(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._process.cpu_percent()  # first call is always 0.0
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                current = self.queue.workers
+                target = self.evaluate(current)
+                if target != current:
+                    self.logger.info(
+                        f"Scaling Queue consumers: {current} -> {target}"
+                    )
+                    self.queue.scale(target)
+            except Exception as exc:  # pylint: disable=W0718
+                self.logger.error(f"Autoscaler error: {exc}")
+
+    def evaluate(self, current: int) -> int:
+        """Returns the number of consumers the queue needs right now."""
+        depth = self.queue.queue.qsize()
+        running = self.queue.queue.running
+        cpu = self._process.cpu_percent() / self._cpus
+        now = time.monotonic()
+        if depth > 0 or running >= current:
+            self._busy_at = now
+        if depth == 0:
+            # nothing is waiting, the moving average must decay:
+            self.observe(0.0)
+        if depth > 0 and (self._wait > self.target_wait or running >= current):
+            if cpu >= self.cpu_limit:
+                self.logger.debug(
+                    f"Not scaling up, CPU utilization is {cpu:.1f}%"
+                )
+                return current
+            return min(current + max(current // 2, 1), self.max_workers)
+        if now - self._busy_at >= self.idle_time and running < current:
+            return max(current - 1, self.min_workers)
+        return current
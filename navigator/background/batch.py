@@ -0,0 +1,51 @@
+"""
+Task Batches.
+
+Grouping many small items for the same function into a single execution
+of the function with the list of items.
+"""
+from typing import Any, Optional
+from collections.abc import Hashable
+import asyncio
+
+
+class TaskBatch:
+    """TaskBatch.
+
+    Items accumulated (until max_size items or max_wait seconds) for a
+    single execution of the batch Task, fn(items, *args, **kwargs).
+
+    Args:
+        key: batch key (by default, the function).
+        handle: TaskHandle of the batch execution.
+        items: list of items (the first argument of the function).
+        max_size: number of items that flushes the batch.
+    """
+    def __init__(
+        self,
+        key: Hashable,
+        handle: Any,
+        items: list,
+        max_size: int = 100
+    ):
+        self.key = key
+        self.handle = handle
+        self.items = items
+        self.max_size = max_size
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def __repr__(self):
+        return f"<TaskBatch {self.key!r} items={len(self.items)}>"
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, item: Any) -> bool:
+        """Add an item, returns True if the batch is full."""
+        self.items.append(item)
+        return len(self.items) >= self.max_size
+
+    def cancel(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
@@ -0,0 +1,226 @@
+"""
+Task Graphs.
+
+Dependency graphs (DAG) of Tasks executed on a Background Queue: independent
+branches run concurrently and a task starts as soon as all its dependencies
+are done, receiving their results (in memory) as arguments.
+"""
+from typing import Any, Optional, Union
+from collections.abc import Callable
+import copy
+import asyncio
+from navconfig.logging import logging
+from .wrapper import TaskWrapper
+
+
+class TaskNode:
+    """TaskNode.
+
+    A Task of the graph and the names of the tasks it depends on.
+
+    Args:
+        name: name of the task (unique in the graph).
+        task: TaskWrapper (or function) to be executed.
+        depends_on: names of the tasks this task depends on.
+        inject: the results of the dependencies are passed as the first
+          positional arguments of the task (in depends_on order).
+    """
+    def __init__(
+        self,
+        name: str,
+        task: TaskWrapper,
+        depends_on: Optional[list] = None,
+        inject: bool = True
+    ):
+        self.name = name
+        self.task = task
+        self.depends_on: list = list(depends_on or [])
+        self.inject = inject
+
+    def __repr__(self):
+        return f"<TaskNode {self.name} depends_on={self.depends_on}>"
+
+    def bind(self, results: dict) -> TaskWrapper:
+        """Returns the task with the results of its dependencies."""
+        if not self.inject or not self.depends_on:
+            return self.task
+        task = copy.copy(self.task)
+        task.args = (
+            *(results[name] for name in self.depends_on), *self.task.args
+        )
+        return task
+
+
+class TaskGraph:
+    """TaskGraph.
+
+    Directed acyclic graph of Tasks, ex:
+
+        graph = TaskGraph('etl')
+        graph.add('fetch', TaskWrapper(fetch, url))
+        graph.add('transform', transform, depends_on=['fetch'])
+        graph.add('store', store, depends_on=['transform'])
+        graph.add('notify', notify, depends_on=['store'], inject=False)
+        run = await queue.put_graph(graph)
+        results = await run.wait()
+    """
+    def __init__(self, name: str = 'graph'):
+        self.name = name
+        self.nodes: dict[str, TaskNode] = {}
+
+    def __repr__(self):
+        return f"<TaskGraph {self.name} tasks={len(self.nodes)}>"
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def add(
+        self,
+        name: str,
+        task: Union[TaskWrapper, Callable],
+        *args,
+        depends_on: Optional[list] = None,
+        inject: bool = True,
+        **kwargs
+    ) -> TaskNode:
+        """Add a task (a TaskWrapper, or a function and its arguments)."""
+        if name in self.nodes:
+            raise ValueError(
+                f"TaskGraph {self.name}: duplicated task {name}"
+            )
+        if not isinstance(task, TaskWrapper):
+            task = TaskWrapper(task, *args, **kwargs)
+        node = TaskNode(name, task, depends_on=depends_on, inject=inject)
+        self.nodes[name] = node
+        return node
+
+    def dependents(self) -> dict[str, list]:
+        children: dict = {name: [] for name in self.nodes}
+        for node in self.nodes.values():
+            for parent in node.depends_on:
+                children[parent].append(node.name)
+        return children
+
+    def validate(self) -> list:
+        """Check dependencies and cycles, returns the topological order."""
+        for node in self.nodes.values():
+            for parent in node.depends_on:
+                if parent not in self.nodes:
+                    raise ValueError(
+                        f"TaskGraph {self.name}: {node.name} depends on "
+                        f"unknown task {parent}"
+                    )
+        children = self.dependents()
+        pending = {name: len(node.depends_on) for name, node in self.nodes.items()}
+        ready = [name for name, count in pending.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for child in children[name]:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    ready.append(child)
+        if len(order) != len(self.nodes):
+            cycle = sorted(name for name, count in pending.items() if count > 0)
+            raise ValueError(
+                f"TaskGraph {self.name}: cycle between tasks {cycle}"
+            )
+        return order
+
+
+class GraphRun:
+    """GraphRun.
+
+    Execution of a TaskGraph on a BackgroundQueue (see put_graph), every
+    task has a TaskHandle (status "scheduled" until its dependencies are
+    done); when a task fails its dependents are cancelled.
+
+    Args:
+        queue: the BackgroundQueue.
+        graph: the TaskGraph.
+    """
+    def __init__(self, queue: Any, graph: TaskGraph):
+        self.queue = queue
+        self.graph = graph
+        self.logger = logging.getLogger('NAV.Queue.Graph')
+        self._children = graph.dependents()
+        self._pending: dict[str, int] = {
+            name: len(node.depends_on) for name, node in graph.nodes.items()
+        }
+        self._submits: set = set()
+        self.handles: dict = {}
+        for name, node in graph.nodes.items():
+            handle = queue._create_handle(node.task)  # pylint: disable=W0212
+            handle.status = 'scheduled'
+            self.handles[name] = handle
+
+    def __repr__(self):
+        return f"<GraphRun {self.graph.name} status={self.status}>"
+
+    @property
+    def status(self) -> str:
+        statuses = [handle.status for handle in self.handles.values()]
+        if not all(handle.done() for handle in self.handles.values()):
+            return 'running'
+        return 'done' if all(s == 'done' for s in statuses) else 'failed'
+
+    @property
+    def results(self) -> dict:
+        return {
+            name: handle.result
+            for name, handle in self.handles.items() if handle.status == 'done'
+        }
+
+    def start(self) -> None:
+        for name, handle in self.handles.items():
+            handle.add_done_callback(
+                lambda h, name=name: self._task_done(name, h)
+            )
+        for name, count in self._pending.items():
+            if count == 0:
+                self._submit(name)
+
+    def _submit(self, name: str) -> None:
+        handle = self.handles[name]
+        handle.task = self.graph.nodes[name].bind(self.results)
+        submit = asyncio.create_task(
+            self.queue._submit_local(handle)  # pylint: disable=W0212
+        )
+        self._submits.add(submit)
+        submit.add_done_callback(self._submits.discard)
+
+    def _task_done(self, name: str, handle: Any) -> None:
+        for child in self._children[name]:
+            if handle.status != 'done':
+                child_handle = self.handles[child]
+                if not child_handle.done():
+                    # cancelled, and its own dependents too (on its callback).
+                    child_handle.set_error(
+                        RuntimeError(
+                            f"Task {name} of {self.graph.name} was {handle.status}"
+                        ),
+                        status='cancelled'
+                    )
+                    self.queue._task_finished(child_handle)  # pylint: disable=W0212
+                continue
+            self._pending[child] -= 1
+            if self._pending[child] == 0:
+                self._submit(child)
+
+    async def wait(self, timeout: Optional[float] = None) -> dict:
+        """Wait until all tasks are finished, returns the results by name."""
+        await asyncio.wait_for(
+            asyncio.gather(*(h.wait() for h in self.handles.values())),
+            timeout
+        )
+        return self.results
+
+    def to_dict(self) -> dict:
+        return {
+            "graph": self.graph.name,
+            "status": self.status,
+            "tasks": {
+                name: handle.to_dict() for name, handle in self.handles.items()
+            }
+        }
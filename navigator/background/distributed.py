@@ -0,0 +1,173 @@
+"""
+Distributed Background Queue.
+
+Sharing the Background Tasks between processes (ex: gunicorn workers)
+using a Redis Stream (and a consumer group) as transport.
+"""
+from typing import Optional, Union
+import os
+import socket
+import asyncio
+
+
+class RedisTransport:
+    """RedisTransport.
+
+    Tasks are published to a Redis Stream, every process is a consumer of the
+    same group and only pulls as many tasks as it can run right now.
+
+    Messages are acknowledged when the task is finished; messages pending
+    on a dead consumer are claimed by others after `claim_idle` milliseconds.
+    While a message is pulled (waiting or running) its idle time is reset
+    every `heartbeat` milliseconds (XCLAIM JUSTID), so long-running tasks
+    are never claimed (and executed again) by other consumers.
+
+    Args:
+        credentials: Redis credentials (default: REDIS_BROKER_* settings).
+        stream: name of the Redis Stream.
+        group: name of the consumer group.
+        block: max time (in milliseconds) a pull waits for new tasks.
+        claim_idle: idle time (in milliseconds) before claiming orphan tasks.
+        heartbeat: interval (in milliseconds) for refreshing the idle time of
+          the pulled messages (default: a third of claim_idle).
+    """
+    def __init__(
+        self,
+        credentials: Union[str, dict] = None,
+        stream: str = 'navigator_tasks',
+        group: str = 'background_queue',
+        block: int = 1000,
+        claim_idle: int = 60000,
+        heartbeat: Optional[int] = None,
+        **kwargs
+    ):
+        self.stream = stream
+        self.group = group
+        self.block = block
+        self.claim_idle = claim_idle
+        self.heartbeat = heartbeat or claim_idle // 3
+        # pulled messages (not acknowledged yet):
+        self._pulled: set = set()
+        self._heartbeat: Optional[asyncio.Task] = None
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}"
+        # imported here: brokers are optional for the Background Queue.
+        from ..brokers.redis.connection import RedisConnection  # pylint: disable=C0415
+        self._broker = RedisConnection(credentials=credentials, **kwargs)
+        self._broker._queue_name = stream
+        self._broker._group_name = group
+        self._broker._consumer_name = self.consumer_name
+
+    def __repr__(self):
+        return f"<RedisTransport {self.stream}:{self.group} ({self.consumer_name})>"
+
+    async def connect(self) -> None:
+        await self._broker.connect()
+
+    async def disconnect(self) -> None:
+        # the unacknowledged messages can be claimed by other consumers:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        self._pulled.clear()
+        try:
+            # this consumer has no pending messages, can be removed.
+            conn = self._broker.get_connection()
+            info = await conn.xpending_range(
+                self.stream, self.group, min='-', max='+', count=1,
+                consumername=self.consumer_name
+            )
+            if not info:
+                await conn.xgroup_delconsumer(
+                    self.stream, self.group, self.consumer_name
+                )
+        except Exception as exc:  # pylint: disable=W0718
+            self._broker.logger.warning(
+                f"Unable to remove consumer {self.consumer_name}: {exc}"
+            )
+        await self._broker.disconnect()
+
+    async def publish(self, tasks: list[tuple[str, str]]) -> list[str]:
+        """Publish (task_id, payload) pairs in a single round trip."""
+        conn = self._broker.get_connection()
+        async with conn.pipeline(transaction=False) as pipe:
+            for task_id, payload in tasks:
+                pipe.xadd(
+                    self.stream,
+                    {
+                        'task_id': task_id,
+                        'body': payload,
+                        'ContentType': 'application/cloudpickle'
+                    }
+                )
+            return await pipe.execute()
+
+    async def pull(self, count: int, block: Optional[int] = None) -> list[tuple]:
+        """Pull up to `count` tasks, returns (message_id, task_id, payload)."""
+        conn = self._broker.get_connection()
+        messages = []
+        if self.claim_idle:
+            # first, recover the orphan messages (from dead consumers):
+            _, claimed, *_ = await conn.xautoclaim(
+                self.stream,
+                self.group,
+                self.consumer_name,
+                min_idle_time=self.claim_idle,
+                start_id='0-0',
+                count=count
+            )
+            messages.extend(claimed)
+        if len(messages) < count:
+            response = await conn.xreadgroup(
+                groupname=self.group,
+                consumername=self.consumer_name,
+                streams={self.stream: '>'},
+                count=count - len(messages),
+                block=self.block if block is None else block
+            )
+            for _, entries in response or []:
+                messages.extend(entries)
+        tasks = []
+        for message_id, data in messages:
+            if not data or 'body' not in data:
+                # not a task (ex: initial message of the stream).
+                await self.ack(message_id)
+                continue
+            self._pulled.add(message_id)
+            tasks.append((message_id, data.get('task_id'), data['body']))
+        if self._pulled and self.heartbeat > 0 and (
+            self._heartbeat is None or self._heartbeat.done()
+        ):
+            self._heartbeat = asyncio.create_task(self._keep_alive())
+        return tasks
+
+    async def ack(self, *message_ids: str) -> None:
+        if message_ids:
+            self._pulled.difference_update(message_ids)
+            await self._broker.get_connection().xack(
+                self.stream, self.group, *message_ids
+            )
+
+    async def _keep_alive(self) -> None:
+        """Reset the idle time of the pulled messages (while there are any)."""
+        while self._pulled:
+            await asyncio.sleep(self.heartbeat / 1000)
+            message_ids = list(self._pulled)
+            if not message_ids:
+                break
+            try:
+                await self._broker.get_connection().xclaim(
+                    self.stream,
+                    self.group,
+                    self.consumer_name,
+                    min_idle_time=0,
+                    message_ids=message_ids,
+                    justid=True
+                )
+            except Exception as exc:  # pylint: disable=W0718
+                self._broker.logger.warning(
+                    f"Unable to refresh {len(message_ids)} pulled Tasks: {exc}"
+                )
@@ -0,0 +1,219 @@
+"""
+Completion Events.
+
+Task completion events are pushed onto a bounded stream (outside of the
+queue consumers) and delivered to the Queue Callback in batches.
+"""
+from typing import Any, Optional
+from collections.abc import Callable
+import asyncio
+from collections import deque
+from navconfig.logging import logging
+
+
+class CompletionEvent:
+    """CompletionEvent.
+
+    A finished Task (status, result and timings) for the Queue Callback.
+    """
+    __slots__ = (
+        'task_id',
+        'task',
+        'status',
+        'result',
+        'error',
+        'lane',
+        'attempts',
+        'created_at',
+        'started_at',
+        'finished_at'
+    )
+
+    def __init__(self, handle: Any, task: Any = None):
+        self.task_id = handle.id
+        self.task = task if task is not None else handle.task
+        self.status: str = handle.status
+        self.result: Any = handle.result
+        self.error: Optional[BaseException] = handle.error
+        self.lane: Optional[str] = handle.lane
+        self.attempts: int = handle.attempts
+        self.created_at: float = handle.created_at
+        self.started_at: Optional[float] = handle.started_at
+        self.finished_at: Optional[float] = handle.finished_at
+
+    def __repr__(self):
+        return f"<CompletionEvent {self.task_id} status={self.status}>"
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": str(self.task_id),
+            "task": repr(self.task),
+            "status": self.status,
+            "lane": self.lane,
+            "attempts": self.attempts,
+            "error": str(self.error) if self.error else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration": self.duration
+        }
+
+
+class CallbackStream:
+    """CallbackStream.
+
+    Bounded stream of CompletionEvents consumed in batches by `concurrency`
+    workers, so a slow callback never blocks the queue consumers; when the
+    stream is full the oldest events are dropped (and counted).
+
+    Callbacks can be coroutine functions or blocking functions (executed
+    in the default executor).
+
+    Args:
+        callback: called with the task and result of every event,
+          callback(task, result=...), or with the list of events if batch.
+        batch: the callback receives a list of CompletionEvents.
+        maxsize: max number of events waiting on the stream.
+        batch_size: max number of events delivered at once.
+        flush_interval: max time (in seconds) a batch waits to be filled.
+        concurrency: number of workers calling the callback.
+        timeout: max time (in seconds) of a callback call.
+    """
+    def __init__(
+        self,
+        callback: Callable,
+        batch: bool = False,
+        maxsize: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 0.1,
+        concurrency: int = 1,
+        timeout: Optional[float] = None
+    ):
+        self.callback = callback
+        self.batch = batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.logger = logging.getLogger('NAV.Queue.Callback')
+        self._events: deque = deque(maxlen=maxsize)
+        self._ready = asyncio.Event()
+        self._full = asyncio.Event()
+        self._workers: list = []
+        self._inflight: int = 0
+        self.delivered: int = 0
+        self.dropped: int = 0
+        self.failed: int = 0
+
+    def __repr__(self):
+        return f"<CallbackStream {self.callback!r} pending={len(self._events)}>"
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._events),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+    def push(self, event: CompletionEvent) -> None:
+        """Add an event to the stream (never blocks)."""
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+        self._ready.set()
+        if len(self._events) >= self.batch_size:
+            self._full.set()
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._consume())
+                for _ in range(self.concurrency)
+            ]
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Deliver the pending events (up to timeout seconds) and stop."""
+        try:
+            await asyncio.wait_for(self._flush(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                f"Discarding {len(self._events)} Completion Events on shutdown."
+            )
+            self.dropped += len(self._events)
+            self._events.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _flush(self) -> None:
+        while self._events or self._inflight:
+            self._full.set()
+            await asyncio.sleep(self.flush_interval)
+
+    def _take(self) -> list:
+        events = []
+        while self._events and len(events) < self.batch_size:
+            events.append(self._events.popleft())
+        return events
+
+    async def _consume(self) -> None:
+        while True:
+            if not self._events:
+                self._ready.clear()
+                await self._ready.wait()
+            if len(self._events) < self.batch_size:
+                # waiting (a bit) for a fuller batch:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._full.wait(), self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            events = self._take()
+            if not events:
+                continue
+            self._inflight += 1
+            try:
+                await self._deliver(events)
+            finally:
+                self._inflight -= 1
+
+    async def _deliver(self, events: list) -> None:
+        if self.batch is True:
+            await self._safe_call(len(events), events)
+        else:
+            for event in events:
+                await self._safe_call(1, event.task, result=event.result)
+
+    async def _safe_call(self, count: int, *args, **kwargs) -> None:
+        try:
+            await asyncio.wait_for(self._call(*args, **kwargs), self.timeout)
+            self.delivered += count
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # pylint: disable=W0718
+            # failure isolation: the events are discarded, tasks are not affected.
+            self.failed += count
+            self.logger.error(
+                f"Error in Queue Callback {self.callback!r}: {exc}"
+            )
+
+    async def _call(self, *args, **kwargs) -> Any:
+        if asyncio.iscoroutinefunction(self.callback):
+            return await self.callback(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: self.callback(*args, **kwargs)
+        )
@@ -0,0 +1,153 @@
+"""
+Task Handle.
+
+Tracks the status (and result) of a Task enqueued on a BackgroundQueue.
+"""
+from typing import Any, Optional
+from collections.abc import Callable
+import time
+import uuid
+import asyncio
+from ..brokers.pickle import DataSerializer
+
+
+class TaskHandle:
+    """TaskHandle.
+
+    Returned by BackgroundQueue.put(), can be polled (status, result)
+    or awaited until the task is finished.
+
+    Status: scheduled, pending, spilled, running, retrying, done, failed,
+    timeout, cancelled; or published (distributed mode): the task runs on
+    another worker and this handle is never finished.
+    """
+    FINISHED: tuple = ('done', 'failed', 'timeout', 'cancelled')
+    ACTIVE: tuple = ('pending', 'spilled', 'running', 'retrying')
+    # not started yet:
+    WAITING: tuple = ('scheduled', 'pending', 'spilled')
+
+    def __init__(
+        self,
+        task: Any,
+        timeout: Optional[float] = None,
+        max_retries: int = 0,
+        retry_delay: float = 1.0,
+        lane: Optional[str] = None,
+        key: Optional[str] = None,
+        rate_class: Optional[str] = None
+    ):
+        self.id: uuid.UUID = uuid.uuid4()
+        self.task = task
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.lane = lane
+        self.rate_class = rate_class
+        # idempotency key and number of duplicates coalesced into this task:
+        self.key = key
+        self.coalesced: int = 0
+        self.status: str = 'pending'
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.attempts: int = 0
+        self.created_at: float = time.time()
+        self.queued_at: float = self.created_at
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # recorded on the Store (replayed if it is never finished):
+        self.persisted: bool = False
+        # message ID when the task was pulled from a distributed transport.
+        self.message_id: Optional[str] = None
+        self._finished = asyncio.Event()
+        self._done_callbacks: list = []
+
+    @classmethod
+    def from_payload(cls, payload: str, task_id: Optional[str] = None) -> 'TaskHandle':
+        """Build a TaskHandle from a serialized payload (see to_payload)."""
+        handle = cls(None)
+        handle.load_payload(payload)
+        if task_id:
+            handle.id = uuid.UUID(str(task_id))
+        return handle
+
+    def load_payload(self, payload: str) -> None:
+        """Restore the Task (and options) from a serialized payload."""
+        data = DataSerializer.unserialize(payload)
+        self.task = data['task']
+        self.timeout = data.get('timeout')
+        self.max_retries = data.get('max_retries', 0)
+        self.retry_delay = data.get('retry_delay', 1.0)
+        self.lane = data.get('lane')
+        self.key = data.get('key')
+        self.rate_class = data.get('rate_class')
+
+    def to_payload(self) -> str:
+        """Serialize the Task (and options) using cloudpickle.
+
+        Raises RuntimeError if the task is not serializable.
+        """
+        return DataSerializer.serialize({
+            "task": self.task,
+            "timeout": self.timeout,
+            "max_retries": self.max_retries,
+            "retry_delay": self.retry_delay,
+            "lane": self.lane,
+            "key": self.key,
+            "rate_class": self.rate_class
+        })
+
+    def __repr__(self):
+        return f"<TaskHandle {self.id} task={self.task!r} status={self.status}>"
+
+    def done(self) -> bool:
+        return self.status in self.FINISHED
+
+    def set_running(self) -> None:
+        self.status = 'running'
+        self.attempts += 1
+        if self.started_at is None:
+            self.started_at = time.time()
+
+    def set_result(self, result: Any) -> None:
+        self.result = result
+        self._finish('done')
+
+    def set_error(self, error: BaseException, status: str = 'failed') -> None:
+        self.error = error
+        self._finish(status)
+
+    def _finish(self, status: str) -> None:
+        self.status = status
+        self.finished_at = time.time()
+        self._finished.set()
+        callbacks, self._done_callbacks = self._done_callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def add_done_callback(self, callback: Callable[['TaskHandle'], None]) -> None:
+        """Call callback(handle) when the task is finished."""
+        if self.done():
+            callback(self)
+        else:
+            self._done_callbacks.append(callback)
+
+    async def wait(self, timeout: Optional[float] = None) -> Any:
+        """Wait until the task is finished, returns the task result."""
+        await asyncio.wait_for(self._finished.wait(), timeout)
+        return self.result
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": str(self.id),
+            "task": repr(self.task),
+            "status": self.status,
+            "lane": self.lane,
+            "rate_class": self.rate_class,
+            "key": self.key,
+            "coalesced": self.coalesced,
+            "attempts": self.attempts,
+            "error": str(self.error) if self.error else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
@@ -0,0 +1,356 @@
+"""
+Lanes.
+
+Priority Lanes for the Background Queue, with weighted fair dequeuing
+(smooth weighted round-robin) and per-lane concurrency caps.
+"""
+from typing import Any, Optional
+import time
+import asyncio
+from collections import deque
+from .limits import RateLimit
+
+
+DEFAULT_LANE: str = 'default'
+
+
+class QueueOverflow(asyncio.QueueFull):
+    """QueueOverflow.
+
+    A Task rejected by the overflow policy of the Queue,
+    HTTP handlers can reply with status (429) and retry_after.
+    """
+    status: int = 429
+
+    def __init__(self, message: str = 'Task Queue is Full', retry_after: int = 1):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+
+class QueueDraining(QueueOverflow):
+    """QueueDraining.
+
+    The Queue is shutting down and doesn't accept new tasks.
+    """
+    status: int = 503
+
+
+class Lane:
+    """Lane.
+
+    A FIFO of pending tasks with a weight and an (optional) concurrency cap.
+    """
+    def __init__(
+        self,
+        name: str,
+        weight: int = 1,
+        concurrency: Optional[int] = None,
+        size: int = 0
+    ):
+        if weight < 1:
+            raise ValueError(
+                f"Lane {name}: weight must be a positive integer."
+            )
+        self.name = name
+        self.weight = weight
+        self.concurrency = concurrency
+        self.size = size
+        self.items: deque = deque()
+        self.running: int = 0
+        self.current_weight: int = 0
+
+    def __repr__(self):
+        return f"<Lane {self.name} weight={self.weight} pending={len(self.items)}>"
+
+    def full(self) -> bool:
+        return 0 < self.size <= len(self.items)
+
+    def eligible(self) -> bool:
+        if not self.items:
+            return False
+        return self.concurrency is None or self.running < self.concurrency
+
+
+class LaneQueue:
+    """LaneQueue.
+
+    asyncio.Queue-like object with named priority lanes.
+
+    Tasks are dequeued across lanes using smooth weighted round-robin,
+    lanes at their concurrency cap are skipped until one of their tasks
+    is marked as done (task_done(item)).
+
+    Tasks of a rate-limited class (item.rate_class) without a token (or at
+    the concurrency cap of the class) are set aside, without blocking the
+    other tasks of their lane, until the class is allowed again.
+
+    Args:
+        lanes: dictionary of lane name: {"weight", "concurrency", "size"}.
+        maxsize: max number of pending tasks (across all lanes).
+        limits: dictionary of task class: {"rate", "per", "burst", "concurrency"}.
+    """
+    def __init__(
+        self,
+        lanes: Optional[dict] = None,
+        maxsize: int = 0,
+        limits: Optional[dict] = None
+    ):
+        self.maxsize = maxsize
+        self.lanes: dict[str, Lane] = {}
+        for name, cfg in (lanes or {DEFAULT_LANE: {}}).items():
+            self.lanes[name] = Lane(name, **(cfg or {}))
+        if DEFAULT_LANE not in self.lanes:
+            self.lanes[DEFAULT_LANE] = Lane(DEFAULT_LANE)
+        self.limits: dict[str, RateLimit] = {
+            name: RateLimit(name, **(cfg or {}))
+            for name, cfg in (limits or {}).items()
+        }
+        self._size: int = 0
+        self._sentinels: int = 0
+        self._unfinished: int = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+
+    def __repr__(self):
+        return f"<LaneQueue lanes={list(self.lanes)} size={self._size}>"
+
+    def lane_of(self, item: Any) -> Lane:
+        name = getattr(item, 'lane', None) or DEFAULT_LANE
+        try:
+            return self.lanes[name]
+        except KeyError as exc:
+            raise ValueError(
+                f"Unknown Queue Lane: {name}"
+            ) from exc
+
+    def limit_of(self, item: Any) -> Optional[RateLimit]:
+        name = getattr(item, 'rate_class', None)
+        if name is None:
+            return None
+        return self.limits.get(name, None)
+
+    @property
+    def running(self) -> int:
+        return sum(lane.running for lane in self.lanes.values())
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def full(self, item: Any = None) -> bool:
+        if 0 < self.maxsize <= self._size:
+            return True
+        return item is not None and self.lane_of(item).full()
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "pending": len(lane.items),
+                "running": lane.running,
+                "weight": lane.weight,
+                "concurrency": lane.concurrency
+            } for name, lane in self.lanes.items()
+        }
+
+    def put_nowait(self, item: Any) -> None:
+        if item is None:
+            # termination signal for one consumer.
+            self._sentinels += 1
+            self._wakeup.set()
+            return
+        if self.full(item):
+            raise asyncio.QueueFull
+        self.lane_of(item).items.append(item)
+        self._size += 1
+        self._unfinished += 1
+        self._finished.clear()
+        self._wakeup.set()
+
+    async def put(self, item: Any) -> None:
+        while item is not None and self.full(item):
+            self._space.clear()
+            await self._space.wait()
+        self.put_nowait(item)
+
+    def fits(self, items: list) -> bool:
+        """Checks if there is room for all the items."""
+        if 0 < self.maxsize < self._size + len(items):
+            return False
+        per_lane: dict = {}
+        for item in items:
+            lane = self.lane_of(item)
+            per_lane[lane] = per_lane.get(lane, 0) + 1
+        return all(
+            lane.size <= 0 or len(lane.items) + count <= lane.size
+            for lane, count in per_lane.items()
+        )
+
+    def put_many_nowait(self, items: list) -> None:
+        """Enqueue all the items or none (raises QueueFull)."""
+        if not self.fits(items):
+            raise asyncio.QueueFull
+        for item in items:
+            self.lane_of(item).items.append(item)
+        self._size += len(items)
+        self._unfinished += len(items)
+        if items:
+            self._finished.clear()
+            self._wakeup.set()
+
+    async def put_many(self, items: list) -> None:
+        """Wait until there is room for the whole batch, then enqueue it."""
+        if 0 < self.maxsize < len(items):
+            # this batch will never fit in the queue.
+            raise asyncio.QueueFull
+        while not self.fits(items):
+            self._space.clear()
+            await self._space.wait()
+        self.put_many_nowait(items)
+
+    async def wait_space(self) -> None:
+        """Wait until an item is dequeued (or the queue is drained)."""
+        self._space.clear()
+        await self._space.wait()
+
+    def pop_oldest(self, item: Any) -> Any:
+        """Remove (and return) the oldest pending item making room for item."""
+        lane = self.lane_of(item)
+        if not lane.full():
+            # the whole queue is full: the oldest item of any lane.
+            heads = [ln for ln in self.lanes.values() if ln.items]
+            if not heads:
+                return None
+            lane = min(
+                heads, key=lambda ln: getattr(ln.items[0], 'queued_at', 0)
+            )
+        if not lane.items:
+            return None
+        oldest = lane.items.popleft()
+        self._size -= 1
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._finished.set()
+        return oldest
+
+    def _select(self) -> Optional[Lane]:
+        """Smooth Weighted Round-Robin across the eligible lanes."""
+        eligible = [lane for lane in self.lanes.values() if lane.eligible()]
+        if not eligible:
+            return None
+        total = 0
+        best = None
+        for lane in eligible:
+            lane.current_weight += lane.weight
+            total += lane.weight
+            if best is None or lane.current_weight > best.current_weight:
+                best = lane
+        best.current_weight -= total
+        return best
+
+    def _dispatch(self, item: Any, lane: Lane) -> Any:
+        lane.running += 1
+        self._size -= 1
+        self._space.set()
+        return item
+
+    def get_nowait(self) -> Any:
+        now = time.monotonic()
+        # first, the rate-limited tasks allowed again (waiting for longer):
+        for limit in self.limits.values():
+            if limit.waiting and limit.allowed(now):
+                lane = self.lane_of(limit.waiting[0])
+                if lane.concurrency is None or lane.running < lane.concurrency:
+                    limit.acquire(now)
+                    return self._dispatch(limit.waiting.popleft(), lane)
+        while True:
+            lane = self._select()
+            if lane is None:
+                if self._sentinels > 0:
+                    self._sentinels -= 1
+                    return None
+                raise asyncio.QueueEmpty
+            item = lane.items.popleft()
+            limit = self.limit_of(item)
+            if limit is not None:
+                if limit.waiting or not limit.allowed(now):
+                    # set aside (in order) until the class is allowed again.
+                    limit.waiting.append(item)
+                    limit.throttled += 1
+                    continue
+                limit.acquire(now)
+            return self._dispatch(item, lane)
+
+    def _next_token(self) -> Optional[float]:
+        """Seconds until a rate-limited task could be allowed.
+
+        Classes whose next task is in a lane at its concurrency cap are
+        skipped: task_done() wakes up the consumers when the lane is free.
+        """
+        now = time.monotonic()
+        delays = []
+        for limit in self.limits.values():
+            if not limit.waiting:
+                continue
+            lane = self.lane_of(limit.waiting[0])
+            if lane.concurrency is not None and lane.running >= lane.concurrency:
+                continue
+            delay = limit.delay(now)
+            if delay is not None:
+                delays.append(delay)
+        return min(delays) if delays else None
+
+    async def get(self) -> Any:
+        while True:
+            self._wakeup.clear()
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                delay = self._next_token()
+                if delay is None:
+                    await self._wakeup.wait()
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def task_done(self, item: Any = None) -> None:
+        if item is not None:
+            lane = self.lane_of(item)
+            lane.running = max(lane.running - 1, 0)
+            limit = self.limit_of(item)
+            if limit is not None:
+                limit.release()
+            # a capped lane could be eligible again:
+            self._wakeup.set()
+        if self._unfinished <= 0:
+            raise ValueError('task_done() called too many times')
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._finished.set()
+
+    def drain(self) -> list:
+        """Remove (and return) all pending items."""
+        items = []
+        for lane in self.lanes.values():
+            items.extend(lane.items)
+            lane.items.clear()
+        for limit in self.limits.values():
+            items.extend(limit.waiting)
+            limit.waiting.clear()
+        self._size = 0
+        self._unfinished -= len(items)
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._finished.set()
+        self._space.set()
+        return items
+
+    async def join(self) -> None:
+        await self._finished.wait()
@@ -0,0 +1,93 @@
+"""
+Rate Limits.
+
+Token-bucket rate limits and concurrency caps by task class (ex: all the
+tasks calling the same third-party API), enforced when tasks are dequeued.
+"""
+from typing import Optional
+import time
+from collections import deque
+
+
+class RateLimit:
+    """RateLimit.
+
+    Token bucket: `rate` tasks every `per` seconds (with bursts up to
+    `burst` tasks) and at most `concurrency` running tasks of the class.
+
+    Args:
+        name: name of the task class.
+        rate: number of tasks allowed every `per` seconds.
+        per: period (in seconds) of the rate.
+        burst: size of the bucket (default: rate).
+        concurrency: max number of running tasks of this class.
+    """
+    def __init__(
+        self,
+        name: str,
+        rate: Optional[float] = None,
+        per: float = 1.0,
+        burst: Optional[float] = None,
+        concurrency: Optional[int] = None
+    ):
+        if rate is not None and rate <= 0:
+            raise ValueError(
+                f"Rate Limit {name}: rate must be a positive number."
+            )
+        self.name = name
+        self.rate = rate
+        self.per = per
+        self.burst = burst if burst is not None else (rate or 0)
+        self.concurrency = concurrency
+        self.tokens: float = self.burst
+        self.updated: float = time.monotonic()
+        self.running: int = 0
+        # tasks waiting for a token (or a slot), in order:
+        self.waiting: deque = deque()
+        self.throttled: int = 0
+
+    def __repr__(self):
+        return f"<RateLimit {self.name} {self.rate}/{self.per}s>"
+
+    def _refill(self, now: float) -> None:
+        if self.rate is None:
+            return
+        self.tokens = min(
+            self.burst,
+            self.tokens + (now - self.updated) * self.rate / self.per
+        )
+        self.updated = now
+
+    def allowed(self, now: float) -> bool:
+        if self.concurrency is not None and self.running >= self.concurrency:
+            return False
+        self._refill(now)
+        return self.rate is None or self.tokens >= 1
+
+    def acquire(self, now: float) -> None:
+        self._refill(now)
+        if self.rate is not None:
+            self.tokens -= 1
+        self.running += 1
+
+    def release(self) -> None:
+        self.running = max(self.running - 1, 0)
+
+    def delay(self, now: float) -> Optional[float]:
+        """Seconds until the next token (None: waiting for a slot)."""
+        if self.concurrency is not None and self.running >= self.concurrency:
+            return None
+        self._refill(now)
+        if self.rate is None or self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.per / self.rate
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "per": self.per,
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "waiting": len(self.waiting),
+            "throttled": self.throttled
+        }
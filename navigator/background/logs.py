@@ -0,0 +1,180 @@
+"""
+Event Logger.
+
+Structured, sampled log events for high-volume paths (queue consumers,
+broker consumers): successes are sampled, failures are always logged, and
+every event is aggregated into periodic summaries.
+"""
+from typing import Optional, Union
+import time
+import asyncio
+import logging as stdlib_logging
+from navconfig.logging import logging
+
+
+class LogEvent:
+    """LogEvent.
+
+    Message of a log record, formatted (as key=value pairs) only when the
+    record is emitted by a handler.
+    """
+    __slots__ = ('event', 'fields')
+
+    def __init__(self, event: str, fields: dict):
+        self.event = event
+        self.fields = fields
+
+    def __str__(self) -> str:
+        values = ' '.join(
+            f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in self.fields.items()
+        )
+        return f"{self.event} {values}" if values else self.event
+
+    def to_dict(self) -> dict:
+        return {"event": self.event, **self.fields}
+
+
+class EventLogger:
+    """EventLogger.
+
+    Emits structured events (the record carries `event` and `fields` as
+    extra attributes, for JSON handlers), ex:
+
+        events = EventLogger('NAV.Queue', sample=100)
+        events.emit('task.finished', status='done', task=name, duration=0.2)
+
+    * events with status "done" (or no status) are logged 1 in `sample`
+      times (0: never), at `level`.
+    * any other status (failed, timeout, ...) is always logged, at
+      `error_level` (with the traceback of `exc_info`, if given).
+    * nothing is formatted unless the logger is enabled for the level.
+    * counts (and durations) by event and status are logged as a summary
+      every `interval` seconds (once started).
+
+    Args:
+        logger: logger (or logger name).
+        sample: log one in `sample` successful events.
+        level: level of the sampled events.
+        error_level: level of the failed events.
+        interval: seconds between summaries (0: no summaries).
+    """
+    def __init__(
+        self,
+        logger: Union[str, stdlib_logging.Logger],
+        sample: int = 100,
+        level: int = stdlib_logging.DEBUG,
+        error_level: int = stdlib_logging.WARNING,
+        interval: float = 60.0
+    ):
+        if isinstance(logger, str):
+            logger = logging.getLogger(logger)
+        self.logger = logger
+        self.sample = sample
+        self.level = level
+        self.error_level = error_level
+        self.interval = interval
+        self._seen: dict[str, int] = {}
+        self._summary: dict[tuple, list] = {}
+        self._since: float = time.monotonic()
+        self._runner: Optional[asyncio.Task] = None
+
+    def __repr__(self):
+        return f"<EventLogger {self.logger.name} sample=1/{self.sample}>"
+
+    def emit(
+        self,
+        event: str,
+        status: Optional[str] = None,
+        duration: Optional[float] = None,
+        exc_info: Optional[BaseException] = None,
+        **fields
+    ) -> None:
+        """Record an event (and log it if sampled)."""
+        stats = self._summary.get((event, status))
+        if stats is None:
+            stats = self._summary[(event, status)] = [0, 0.0, 0.0]
+        stats[0] += 1
+        if duration is not None:
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+        if status is None or status == 'done':
+            seen = self._seen.get(event, 0) + 1
+            self._seen[event] = seen
+            if self.sample <= 0 or seen % self.sample != 1 % self.sample:
+                return
+            level = self.level
+            exc_info = None
+        else:
+            level = self.error_level
+        if not self.logger.isEnabledFor(level):
+            return
+        if status is not None:
+            fields['status'] = status
+        if duration is not None:
+            fields['duration'] = duration
+        self.logger.log(
+            level,
+            '%s',
+            LogEvent(event, fields),
+            exc_info=exc_info,
+            extra={"event": event, "fields": fields}
+        )
+
+    def summary(self, reset: bool = True) -> dict:
+        """Counts and durations (avg, max) by event and status."""
+        elapsed = time.monotonic() - self._since
+        events: dict = {}
+        for (event, status), (count, total, peak) in self._summary.items():
+            events.setdefault(event, {})[status or 'count'] = {
+                "count": count,
+                "avg": total / count if total else None,
+                "max": peak or None
+            }
+        if reset:
+            self._summary = {}
+            self._since = time.monotonic()
+        return {"interval": elapsed, "events": events}
+
+    def log_summary(self) -> None:
+        if not self._summary:
+            return
+        summary = self.summary()
+        if not self.logger.isEnabledFor(stdlib_logging.INFO):
+            return
+        for event, statuses in summary['events'].items():
+            fields: dict = {"interval": summary['interval']}
+            for status, stats in statuses.items():
+                fields[status] = stats['count']
+                if stats['avg'] is not None:
+                    fields[f"{status}_avg"] = stats['avg']
+                    fields[f"{status}_max"] = stats['max']
+            self.logger.info(
+                '%s',
+                LogEvent(f"{event}.summary", fields),
+                extra={"event": f"{event}.summary", "fields": fields}
+            )
+
+    def start(self) -> None:
+        if self.interval <= 0:
+            return
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        self.log_summary()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.log_summary()
+            except Exception as exc:  # pylint: disable=W0718
+                self.logger.error(f"Error logging the events summary: {exc}")
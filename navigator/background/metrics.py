@@ -0,0 +1,245 @@
+"""
+Queue Metrics.
+
+Low-overhead profiling of Background Tasks: a background sampler for
+process resources (RSS, threads, CPU) and rolling windows of per-task-type
+latency, queue-wait and CPU time.
+"""
+from typing import Any, Optional
+from collections.abc import Callable
+import time
+import asyncio
+import contextvars
+from collections import deque
+from concurrent.futures import Executor, Future
+import psutil
+from navconfig.logging import logging
+
+
+# list collecting the CPU time of the blocking calls made by the running task.
+task_cpu: contextvars.ContextVar = contextvars.ContextVar('task_cpu', default=None)
+
+# Latency buckets (in milliseconds) of the histograms.
+LATENCY_BUCKETS: tuple = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class ProfiledExecutor(Executor):
+    """ProfiledExecutor.
+
+    Executor wrapper measuring the thread CPU time of every call submitted
+    by a task being profiled (see task_cpu).
+    """
+    def __init__(self, executor: Executor):
+        self._executor = executor
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._executor, name)
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        # called from the event loop, inside the context of the task:
+        cpu = task_cpu.get()
+        if cpu is None:
+            return self._executor.submit(fn, *args, **kwargs)
+
+        def timed():
+            start = time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                cpu.append(time.thread_time() - start)
+        return self._executor.submit(timed)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    idx = min(int(round(pct / 100 * (len(values) - 1))), len(values) - 1)
+    return values[idx]
+
+
+class Throughput:
+    """Throughput.
+
+    Ring buffer of per-second counters of finished tasks (by status).
+
+    Args:
+        window: number of seconds kept.
+    """
+    def __init__(self, window: int = 60):
+        self.window = window
+        self._buckets: deque = deque(maxlen=window)
+        self.total: dict[str, int] = {}
+
+    def add(self, status: str) -> None:
+        second = int(time.time())
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append((second, {}))
+        counts = self._buckets[-1][1]
+        counts[status] = counts.get(status, 0) + 1
+        self.total[status] = self.total.get(status, 0) + 1
+
+    def snapshot(self) -> dict:
+        since = int(time.time()) - self.window
+        window: dict[str, int] = {}
+        for second, counts in self._buckets:
+            if second <= since:
+                continue
+            for status, count in counts.items():
+                window[status] = window.get(status, 0) + count
+        return {
+            "window": self.window,
+            "per_second": round(sum(window.values()) / self.window, 2),
+            "last_window": window,
+            "total": dict(self.total)
+        }
+
+
+class QueueMetrics:
+    """QueueMetrics.
+
+    Recording is a single append on the hot path, aggregations are
+    computed when the metrics are requested (snapshot).
+
+    Args:
+        window: size (in seconds) of the rolling window.
+        sample_interval: interval (in seconds) of the resource sampler.
+        max_samples: max number of samples kept by task type.
+    """
+    def __init__(
+        self,
+        window: float = 300.0,
+        sample_interval: float = 1.0,
+        max_samples: int = 10000
+    ):
+        self.window = window
+        self.sample_interval = sample_interval
+        self.max_samples = max_samples
+        self.logger = logging.getLogger('NAV.Queue.Metrics')
+        self._tasks: dict[str, deque] = {}
+        self._resources: deque = deque(
+            maxlen=max(int(window / sample_interval), 1)
+        )
+        self._sampler: Optional[asyncio.Task] = None
+        self._process = psutil.Process()
+        # process-wide resource usage:
+        self.peak_memory_usage: int = 0
+        self.average_num_threads: float = 0.0
+        self.cpu_usage: deque = deque(maxlen=self._resources.maxlen)
+
+    def start(self) -> None:
+        if self._sampler is None or self._sampler.done():
+            self._process.cpu_percent()  # first call is always 0.0
+            self._sampler = asyncio.create_task(self._sample_resources())
+
+    async def stop(self) -> None:
+        if self._sampler is not None:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+            self._sampler = None
+
+    async def _sample_resources(self) -> None:
+        samples = 0
+        while True:
+            try:
+                with self._process.oneshot():
+                    rss = self._process.memory_info().rss
+                    threads = self._process.num_threads()
+                    cpu = self._process.cpu_percent()
+                self._resources.append((time.time(), rss))
+                self.peak_memory_usage = max(self.peak_memory_usage, rss)
+                samples += 1
+                self.average_num_threads += (
+                    threads - self.average_num_threads
+                ) / samples
+                self.cpu_usage.append(cpu)
+            except psutil.Error as exc:
+                self.logger.warning(f"Error sampling resources: {exc}")
+            await asyncio.sleep(self.sample_interval)
+
+    def peak_rss(self, start: float, end: float) -> int:
+        """Max RSS sampled while a task was running."""
+        peak = 0
+        for ts, rss in reversed(self._resources):
+            if ts < start:
+                # the last sample before the task started also counts.
+                peak = max(peak, rss)
+                break
+            if ts <= end:
+                peak = max(peak, rss)
+        return peak
+
+    def record(
+        self,
+        name: str,
+        status: str,
+        started: float,
+        duration: float,
+        wait: float,
+        cpu: Optional[list] = None
+    ) -> None:
+        """Record a finished task (times in seconds, started is a timestamp)."""
+        try:
+            samples = self._tasks[name]
+        except KeyError:
+            samples = self._tasks[name] = deque(maxlen=self.max_samples)
+        samples.append((
+            started,
+            duration,
+            wait,
+            sum(cpu) if cpu else 0.0,
+            status,
+            self.peak_rss(started, started + duration)
+        ))
+
+    def snapshot(self) -> dict:
+        """Aggregates the samples of the rolling window."""
+        since = time.time() - self.window
+        tasks = {}
+        for name, samples in list(self._tasks.items()):
+            window = [s for s in samples if s[0] + s[1] >= since]
+            if not window:
+                continue
+            latencies = sorted(s[1] * 1000 for s in window)
+            waits = sorted(s[2] * 1000 for s in window)
+            histogram = dict.fromkeys([*LATENCY_BUCKETS, '+Inf'], 0)
+            for value in latencies:
+                for bucket in LATENCY_BUCKETS:
+                    if value <= bucket:
+                        histogram[bucket] += 1
+                        break
+                else:
+                    histogram['+Inf'] += 1
+            tasks[name] = {
+                "count": len(window),
+                "failed": sum(1 for s in window if s[4] != 'done'),
+                "latency_ms": {
+                    "p50": percentile(latencies, 50),
+                    "p90": percentile(latencies, 90),
+                    "p99": percentile(latencies, 99),
+                    "max": latencies[-1],
+                    "histogram": histogram
+                },
+                "queue_wait_ms": {
+                    "p50": percentile(waits, 50),
+                    "p99": percentile(waits, 99),
+                    "max": waits[-1]
+                },
+                "cpu_time": sum(s[3] for s in window),
+                "peak_rss": max(s[5] for s in window)
+            }
+        return {
+            "window": self.window,
+            "resources": {
+                "peak_memory_usage": self.peak_memory_usage,
+                "memory_rss": self._resources[-1][1] if self._resources else 0,
+                "average_num_threads": round(self.average_num_threads, 2),
+                "cpu_percent": self.cpu_usage[-1] if self.cpu_usage else 0.0
+            },
+            "tasks": tasks
+        }
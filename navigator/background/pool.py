@@ -0,0 +1,219 @@
+"""
+Event Loop Pool.
+
+Long-lived pool of worker threads, each one owning a persistent event loop,
+used to run coroutines outside of the main (aiohttp) event loop.
+"""
+from typing import Optional, Any
+from collections.abc import Callable
+import asyncio
+import atexit
+import itertools
+import threading
+import concurrent.futures
+from navconfig.logging import logging
+from ..conf import QUEUE_LOOP_WORKERS
+from .types import coroutine
+
+
+class LoopWorker:
+    """LoopWorker.
+
+    A daemon thread running an event loop forever.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.pending: int = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run,
+            name=name,
+            daemon=True
+        )
+
+    def __repr__(self):
+        return f"<LoopWorker {self.name} pending={self.pending}>"
+
+    def start(self) -> None:
+        self.thread.start()
+        self._ready.wait()
+
+    def _run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            # cancel anything still running on this loop:
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                self.loop.run_until_complete(
+                    asyncio.gather(*tasks, return_exceptions=True)
+                )
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def _task_done(self, fut: concurrent.futures.Future) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def submit(self, coro: coroutine) -> concurrent.futures.Future:
+        with self._lock:
+            self.pending += 1
+        fut = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        fut.add_done_callback(self._task_done)
+        return fut
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+
+
+class EventLoopPool:
+    """EventLoopPool.
+
+    Size-bounded pool of threads with a persistent event loop each,
+    coroutines are dispatched to the workers using a "least_loaded"
+    (default) or "round_robin" strategy.
+
+    Args:
+        max_workers: number of threads (and event loops) in the pool.
+        strategy: dispatching strategy ("least_loaded" or "round_robin").
+    """
+    def __init__(
+        self,
+        max_workers: int = QUEUE_LOOP_WORKERS,
+        strategy: str = 'least_loaded',
+        name: str = 'NAV.LoopPool'
+    ):
+        if max_workers < 1:
+            raise ValueError(
+                "EventLoopPool requires at least one worker."
+            )
+        if strategy not in ('least_loaded', 'round_robin'):
+            raise ValueError(
+                f"Invalid dispatching strategy: {strategy}"
+            )
+        self.max_workers = max_workers
+        self.strategy = strategy
+        self.name = name
+        self.logger = logging.getLogger(name)
+        self._workers: list[LoopWorker] = []
+        self._cycle = None
+        self._lock = threading.Lock()
+        self._futures: set = set()
+
+    def __repr__(self):
+        return f"<EventLoopPool workers={self.max_workers} strategy={self.strategy}>"
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def pending(self) -> int:
+        return sum(w.pending for w in self._workers)
+
+    def start(self) -> None:
+        """Start the worker threads (if not started yet)."""
+        with self._lock:
+            if self._workers:
+                return
+            for idx in range(self.max_workers):
+                worker = LoopWorker(name=f"{self.name}-{idx}")
+                worker.start()
+                self._workers.append(worker)
+            self._cycle = itertools.cycle(self._workers)
+        self.logger.debug(
+            f"Started {self.max_workers} event loop workers."
+        )
+
+    def _next_worker(self) -> LoopWorker:
+        if self.strategy == 'round_robin':
+            return next(self._cycle)
+        return min(self._workers, key=lambda w: w.pending)
+
+    def _forget(self, fut: concurrent.futures.Future) -> None:
+        self._futures.discard(fut)
+
+    def submit(
+        self,
+        coro: coroutine,
+        callback: Optional[Callable] = None
+    ) -> concurrent.futures.Future:
+        """submit.
+
+        Schedule a coroutine on one of the pool workers.
+
+        Returns a concurrent.futures.Future that can be ignored, waited
+        for (from any thread) or awaited with asyncio.wrap_future.
+        Args:
+        - coro: coroutine object to be executed.
+        - callback: called (or awaited) with the coroutine result.
+        """
+        if not self._workers:
+            self.start()
+        if callback is not None:
+            coro = self._with_callback(coro, callback)
+        with self._lock:
+            worker = self._next_worker()
+            fut = worker.submit(coro)
+        self._futures.add(fut)
+        fut.add_done_callback(self._forget)
+        return fut
+
+    async def run(self, coro: coroutine, callback: Optional[Callable] = None) -> Any:
+        """Run a coroutine on the pool and wait for its result."""
+        return await asyncio.wrap_future(
+            self.submit(coro, callback=callback)
+        )
+
+    @staticmethod
+    async def _with_callback(coro: coroutine, callback: Callable) -> Any:
+        result = await coro
+        if asyncio.iscoroutinefunction(callback):
+            await callback(result)
+        else:
+            callback(result)
+        return result
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None) -> None:
+        """Stop the workers, optionally waiting for pending coroutines."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._cycle = None
+        if wait and self._futures:
+            concurrent.futures.wait(list(self._futures), timeout=timeout)
+        for worker in workers:
+            worker.stop(timeout)
+
+
+_default_pool: Optional[EventLoopPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_loop_pool() -> EventLoopPool:
+    """Returns the shared Event Loop Pool (created on first use)."""
+    global _default_pool  # pylint: disable=W0603
+    with _pool_lock:
+        if _default_pool is None:
+            _default_pool = EventLoopPool()
+            atexit.register(_default_pool.shutdown, wait=False, timeout=1)
+    return _default_pool
+
+
+def coroutine_in_thread(
+    coro: coroutine,
+    callback: Optional[coroutine] = None
+) -> concurrent.futures.Future:
+    """Run a coroutine in the shared pool of threads with persistent event loops.
+
+    Returns a Future with the coroutine result (can be ignored).
+    """
+    return get_loop_pool().submit(coro, callback=callback)
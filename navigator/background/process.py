@@ -0,0 +1,78 @@
+"""
+Process Pool execution.
+
+Running CPU-bound tasks in a pool of processes (outside of the GIL),
+functions, arguments and results are serialized using cloudpickle.
+"""
+from typing import Any, Optional
+from collections.abc import Callable
+import os
+import asyncio
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from ..conf import QUEUE_PROCESS_WORKERS, QUEUE_PROCESS_START
+from ..brokers.pickle import DataSerializer
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_mp_context() -> multiprocessing.context.BaseContext:
+    """Start method of the Process Pool (QUEUE_PROCESS_START).
+
+    The pool is created once the event loops and the executor threads are
+    running: forking a multithreaded process can deadlock the child, so
+    the processes are started by a fork server (or spawned).
+    """
+    try:
+        return multiprocessing.get_context(QUEUE_PROCESS_START)
+    except ValueError:
+        # forkserver is not available (ex: Windows).
+        return multiprocessing.get_context('spawn')
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Returns the shared Process Pool (created on first use)."""
+    global _process_pool  # pylint: disable=W0603
+    with _pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=QUEUE_PROCESS_WORKERS or os.cpu_count(),
+                mp_context=get_mp_context()
+            )
+            atexit.register(_process_pool.shutdown, wait=False)
+    return _process_pool
+
+
+def run_serialized(payload: str) -> str:
+    """Unserialize and run a function (in the child process)."""
+    fn, args, kwargs = DataSerializer.unserialize(payload)
+    if asyncio.iscoroutinefunction(fn):
+        result = asyncio.run(fn(*args, **kwargs))
+    else:
+        result = fn(*args, **kwargs)
+    return DataSerializer.serialize(result)
+
+
+async def run_in_process(
+    fn: Callable,
+    *args,
+    executor: Optional[ProcessPoolExecutor] = None,
+    **kwargs
+) -> Any:
+    """run_in_process.
+
+    Execute a function (or coroutine function) in a Process Pool,
+    allowing lambdas, closures and partials (serialized with cloudpickle).
+    """
+    payload = DataSerializer.serialize((fn, args, kwargs))
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(
+        executor or get_process_pool(),
+        run_serialized,
+        payload
+    )
+    return DataSerializer.unserialize(result)
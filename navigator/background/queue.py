@@ -0,0 +1,1410 @@
+"""
+Background Queue.
+
+Asyncio Queue (and consumers) for processing Tasks in background.
+"""
+from typing import Union, Optional, Any
+from collections.abc import Awaitable, Callable, Iterable
+import time
+import uuid
+import random
+import asyncio
+from collections import deque
+from datetime import datetime
+from importlib import import_module
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+import psutil
+from aiohttp import web
+from navconfig.logging import logging
+from ..libs.json import json_encoder
+from ..conf import (
+    QUEUE_CALLBACK,
+    QUEUE_CALLBACK_BATCH,
+    QUEUE_CALLBACK_SIZE,
+    QUEUE_CALLBACK_WORKERS,
+    QUEUE_LOG_SAMPLE,
+    QUEUE_LOG_INTERVAL,
+    QUEUE_LANES,
+    QUEUE_RATE_LIMITS,
+    QUEUE_JOURNAL,
+    QUEUE_OVERFLOW,
+    QUEUE_PUT_TIMEOUT,
+    QUEUE_SPILL_PATH,
+    QUEUE_DRAIN_TIMEOUT
+)
+from .types import P, coroutine
+from .pool import get_loop_pool
+from .wrapper import TaskWrapper
+from .handle import TaskHandle
+from .lanes import LaneQueue, QueueOverflow, QueueDraining
+from .stores import BaseStore, JournalStore, SpillStore
+from .distributed import RedisTransport
+from .scheduler import TaskScheduler, ScheduledTask
+from .metrics import QueueMetrics, ProfiledExecutor, Throughput, task_cpu
+from .autoscale import Autoscaler
+from .batch import TaskBatch
+from .events import CompletionEvent, CallbackStream
+from .dag import TaskGraph, GraphRun
+from .logs import EventLogger
+
+
+SERVICE_NAME: str = 'service_queue'
+
+OVERFLOW_POLICIES: tuple = ('block', 'reject', 'drop_oldest', 'spill')
+
+# options of the enqueue calls (never passed to the task function):
+TASK_OPTIONS: tuple = ('dedup_key', 'debounce', 'rate_class')
+
+
+class BackgroundQueue:
+    """BackgroundQueue.
+
+    Asyncio Queue with for background processing.
+
+    Args:
+        app: aiohttp (or Navigator) Application.
+        max_workers: number of consumers (and threads) of the Queue.
+        queue_size: max number of pending tasks.
+        overflow: policy when the queue is full, one of:
+          block: put() waits for room (up to put_timeout seconds).
+          reject: raise QueueOverflow (HTTP 429) above the high watermark.
+          drop_oldest: cancel the oldest pending task to make room.
+          spill: write the tasks to disk above the high watermark, they are
+            enqueued again when the queue is back under the low watermark.
+        put_timeout: max time (in seconds) put() waits for room (0: forever).
+        high_watermark: queue depth where the queue is overloaded
+          (default: 80% of queue_size).
+        low_watermark: queue depth where the queue is no longer overloaded
+          (default: 50% of queue_size).
+        spill_path: directory of the spill file.
+        autoscale: grow and shrink the consumers (and threads) between
+          min_workers and max_workers - 1 based on queue depth, queue wait
+          time and CPU utilization (see Autoscaler).
+        min_workers: min number of consumers when autoscale is enabled.
+        scale_interval: seconds between autoscaling decisions.
+        target_wait: queue wait time (in seconds) triggering a scale up.
+        cpu_limit: CPU utilization (percent) blocking scale ups.
+        idle_time: idle seconds before a scale down.
+        callback_batch: the Queue Callback receives lists of CompletionEvents.
+        callback_size: max number of events waiting for the Callback.
+        callback_workers: number of concurrent calls of the Callback.
+        callback_timeout: max time (in seconds) of a Callback call.
+        drain_timeout: max time (in seconds) for finishing the pending and
+          running tasks on shutdown (see drain).
+        task_timeout: default timeout (in seconds) for every task.
+        max_retries: default number of retries of a failing task.
+        retry_delay: base delay (in seconds) between retries (exponential).
+        max_history: number of finished tasks kept for polling (get_task).
+        lanes: priority lanes (default: QUEUE_LANES), every lane has a
+          "weight" (share of dequeues) and an optional "concurrency" cap.
+        rate_limits: token-bucket rate limits and concurrency caps by task
+          class (default: QUEUE_RATE_LIMITS), {"class": {"rate", "per",
+          "burst", "concurrency"}}; tasks declare their class with
+          TaskWrapper(rate_class=...) or rate_class=... on any enqueue
+          call (put, put_many, put_at, put_after or schedule).
+        store: Store (ex: JournalStore) for persisting the enqueued tasks,
+          by default a JournalStore if QUEUE_JOURNAL is configured (a
+          journal per worker process).
+        distributed: publish the tasks to a Redis Stream shared by all the
+          processes (ex: gunicorn workers), idle workers pull them (the
+          handles returned by put() keep the status "published").
+        transport: custom transport for distributed mode.
+        enable_profiling: record per-task latency, queue-wait, CPU time and
+          sample the process resources (see get_metrics).
+        metrics_url: route for exposing the profiling metrics (as JSON).
+        admin_url: route for the live status of the queue (see get_status).
+        max_failures: number of recent failures kept for get_status.
+        log_sample: log one in N successful tasks (default: QUEUE_LOG_SAMPLE),
+          failed tasks are always logged.
+        log_interval: seconds between summaries of the task events.
+    """
+    service_name: str = SERVICE_NAME
+
+    def __init__(
+        self,
+        app: Optional[web.Application],
+        max_workers: int = 5,
+        coro_in_threads: bool = True,
+        **kwargs: P.kwargs
+    ) -> None:
+        self.logger = logging.getLogger('NAV.Queue')
+        # Task events (sampled, and aggregated into periodic summaries):
+        self.events = EventLogger(
+            self.logger,
+            sample=kwargs.get('log_sample', QUEUE_LOG_SAMPLE),
+            interval=kwargs.get('log_interval', QUEUE_LOG_INTERVAL)
+        )
+        if isinstance(app, web.Application):
+            self.app = app  # register the app into the Extension
+        else:
+            self.app = app.get_app()  # Nav Application
+        self.max_workers = max_workers
+        self.queue_size = kwargs.get('queue_size', 5)
+        self._enable_profiling: bool = kwargs.get('enable_profiling', False)
+        self.coro_in_threads: bool = coro_in_threads
+        # Priority Lanes:
+        self.queue = LaneQueue(
+            lanes=kwargs.get('lanes', QUEUE_LANES),
+            maxsize=self.queue_size,
+            limits=kwargs.get('rate_limits', QUEUE_RATE_LIMITS)
+        )
+        self.consumers: list = []
+        self._retiring: int = 0
+        # Backpressure:
+        self.overflow: str = kwargs.get('overflow', QUEUE_OVERFLOW)
+        if self.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Invalid Queue Overflow policy: {self.overflow}"
+            )
+        self.put_timeout: float = kwargs.get('put_timeout', QUEUE_PUT_TIMEOUT)
+        self.high_watermark: Optional[int] = kwargs.get(
+            'high_watermark',
+            max(int(self.queue_size * 0.8), 1) if self.queue_size > 0 else None
+        )
+        self.low_watermark: int = kwargs.get(
+            'low_watermark',
+            int(self.queue_size * 0.5) if self.queue_size > 0 else 0
+        )
+        if self.high_watermark and self.low_watermark >= self.high_watermark:
+            if 'low_watermark' in kwargs:
+                raise ValueError(
+                    "Queue low watermark must be lower than the high watermark."
+                )
+            # small queues: the default is kept under the high watermark.
+            self.low_watermark = max(self.high_watermark - 1, 0)
+        self._overloaded: bool = False
+        self._spill: Optional[SpillStore] = None
+        if self.overflow == 'spill':
+            self._spill = SpillStore(
+                kwargs.get('spill_path', QUEUE_SPILL_PATH)
+            )
+        self._unspiller: Optional[asyncio.Task] = None
+        # Graceful shutdown:
+        self.drain_timeout: float = kwargs.get('drain_timeout', QUEUE_DRAIN_TIMEOUT)
+        self._draining: bool = False
+        # Batches being accumulated (by function or batch_key):
+        self._batches: dict = {}
+        self._flushes: set = set()
+        # Delayed and Periodic Tasks:
+        self._scheduler = TaskScheduler(self._dispatch_scheduled)
+        # Timeout and Retries (TaskWrapper can override them):
+        self.task_timeout: Optional[float] = kwargs.get('task_timeout', None)
+        self.max_retries: int = kwargs.get('max_retries', 0)
+        self.retry_delay: float = kwargs.get('retry_delay', 1.0)
+        self._retries: set = set()
+        # Task Handles (pending and recently finished tasks):
+        self._tasks: dict = {}
+        # Idempotency keys of the pending tasks:
+        self._keys: dict[str, TaskHandle] = {}
+        self._history: deque = deque(maxlen=kwargs.get('max_history', 1000))
+        # Live status (ring buffers): running tasks by consumer, recent
+        # failures and throughput counters:
+        self._running: dict = {}
+        self._failures: deque = deque(maxlen=kwargs.get('max_failures', 50))
+        self._throughput = Throughput()
+        # Durable Store (replay unfinished tasks after a restart):
+        self._store: Optional[BaseStore] = kwargs.get('store', None)
+        if self._store is None and QUEUE_JOURNAL:
+            self._store = JournalStore(QUEUE_JOURNAL)
+        self._replay: Optional[asyncio.Task] = None
+        # Distributed mode (tasks shared with other processes):
+        self._transport = kwargs.get('transport', None)
+        if self._transport is None and kwargs.get('distributed', False):
+            self._transport = RedisTransport()
+        self._puller: Optional[asyncio.Task] = None
+        self.logger.notice(
+            f'Started Queue Manager with size: {self.queue_size}'
+        )
+        ### Getting Queue Callback (called when queue object is consumed)
+        self._callback: Union[Callable, Awaitable] = self.get_callback(
+            QUEUE_CALLBACK
+        )
+        self.logger.notice(
+            f'Callback Queue: {self._callback!r}'
+        )
+        # completion events are delivered to the callback out of the consumers:
+        self._events = CallbackStream(
+            self._callback,
+            batch=kwargs.get('callback_batch', QUEUE_CALLBACK_BATCH),
+            maxsize=kwargs.get('callback_size', QUEUE_CALLBACK_SIZE),
+            concurrency=kwargs.get('callback_workers', QUEUE_CALLBACK_WORKERS),
+            timeout=kwargs.get('callback_timeout', None)
+        )
+        self.service_name: str = kwargs.get('service_name', SERVICE_NAME)
+        ## Register the Queue Manager to the Application
+        # Add Manager to main Application:
+        self.app[self.service_name] = self
+        self.app.on_startup.append(self.on_startup)
+        self.app.on_cleanup.append(self.on_cleanup)
+        # resource usage:
+        self._metrics: Optional[QueueMetrics] = None
+        if self._enable_profiling is True:
+            self._metrics = QueueMetrics(
+                window=kwargs.get('metrics_window', 300.0),
+                sample_interval=kwargs.get('sample_interval', 1.0)
+            )
+            if kwargs.get('metrics_url', None):
+                self.app.router.add_get(
+                    kwargs['metrics_url'], self.metrics_handler
+                )
+        if kwargs.get('admin_url', None):
+            self.app.router.add_get(kwargs['admin_url'], self.status_handler)
+        # Main Executor (threads are started on demand):
+        self.executor = self._make_executor()
+        # Consumers Autoscaling:
+        self._autoscaler: Optional[Autoscaler] = None
+        if kwargs.get('autoscale', False) is True:
+            self._autoscaler = Autoscaler(
+                self,
+                min_workers=kwargs.get('min_workers', 1),
+                max_workers=max(self.max_workers - 1, 1),
+                interval=kwargs.get('scale_interval', 1.0),
+                target_wait=kwargs.get('target_wait', 0.5),
+                cpu_limit=kwargs.get('cpu_limit', 85.0),
+                idle_time=kwargs.get('idle_time', 30.0)
+            )
+        # Threads with persistent event loops for running coroutines:
+        self._loop_pool = kwargs.get('loop_pool', None) or get_loop_pool()
+
+    @property
+    def peak_memory_usage(self) -> int:
+        return self._metrics.peak_memory_usage if self._metrics else 0
+
+    @property
+    def average_num_threads(self) -> float:
+        return self._metrics.average_num_threads if self._metrics else 0
+
+    @property
+    def cpu_usage(self) -> list:
+        return list(self._metrics.cpu_usage) if self._metrics else []
+
+    @property
+    def overloaded(self) -> bool:
+        """True from the high watermark until back under the low watermark."""
+        if not self.high_watermark:
+            return False
+        depth = self.queue.qsize()
+        if self._overloaded:
+            if depth <= self.low_watermark:
+                self._overloaded = False
+                self.logger.notice(
+                    f"Task Queue recovered (depth: {depth})"
+                )
+        elif depth >= self.high_watermark:
+            self._overloaded = True
+            self.logger.warning(
+                f"Task Queue overloaded (depth: {depth})"
+            )
+        return self._overloaded
+
+    def pressure(self) -> dict:
+        """Current queue depth, watermarks and overflow policy."""
+        return {
+            "depth": self.queue.qsize(),
+            "maxsize": self.queue.maxsize,
+            "high_watermark": self.high_watermark,
+            "low_watermark": self.low_watermark,
+            "overloaded": self.overloaded,
+            "overflow": self.overflow,
+            "spilled": len(self._spill) if self._spill is not None else 0
+        }
+
+    def get_metrics(self) -> dict:
+        """Profiling Metrics (empty if enable_profiling is False)."""
+        if self._metrics is None:
+            return {}
+        metrics = self._metrics.snapshot()
+        metrics['queue'] = {
+            **self.pressure(),
+            "workers": self.workers,
+            "limits": {
+                name: limit.stats() for name, limit in self.queue.limits.items()
+            },
+            "callbacks": self._events.stats(),
+            "running": self.queue.running,
+            "lanes": self.queue.stats()
+        }
+        return metrics
+
+    def get_status(self) -> dict:
+        """Live status: depth by lane, running tasks, failures and throughput."""
+        now = time.time()
+        consumers = []
+        for idx, consumer in enumerate(self.consumers):
+            handle = self._running.get(consumer, None)
+            consumers.append({
+                "consumer": idx,
+                "state": "running" if handle is not None else "idle",
+                "task_id": str(handle.id) if handle is not None else None
+            })
+        running = [
+            {
+                **handle.to_dict(),
+                "elapsed": round(now - (handle.started_at or now), 3)
+            } for handle in list(self._running.values())
+        ]
+        running.sort(key=lambda task: task['elapsed'], reverse=True)
+        return {
+            **self.pressure(),
+            "draining": self._draining,
+            "workers": self.workers,
+            "lanes": self.queue.stats(),
+            "limits": {
+                name: limit.stats() for name, limit in self.queue.limits.items()
+            },
+            "scheduled": len(self._scheduler),
+            "consumers": consumers,
+            "running": running,
+            "failures": list(self._failures),
+            "throughput": self._throughput.snapshot(),
+            "callbacks": self._events.stats()
+        }
+
+    async def status_handler(self, request: web.Request) -> web.Response:
+        """Returns the live status of the Queue as JSON."""
+        return web.json_response(
+            self.get_status(), dumps=json_encoder
+        )
+
+    async def metrics_handler(self, request: web.Request) -> web.Response:
+        """Returns the Profiling Metrics as JSON."""
+        return web.json_response(
+            self.get_metrics(), dumps=json_encoder
+        )
+
+    async def get_resource_metrics(self):
+        process = psutil.Process()
+        memory_info = process.memory_info()
+        return {
+            "memory_rss": memory_info.rss,
+            "memory_vms": memory_info.vms,
+            "num_threads": process.num_threads(),
+            "cpu_percent": process.cpu_percent()
+        }
+
+    async def on_cleanup(self, app: web.Application) -> None:
+        """Application On cleanup."""
+        # finish (or persist) the pending tasks and stop the consumers:
+        await self.drain()
+        await self._events.stop()
+        await self.events.stop()
+        # also, finish the executor:
+        self.shutdown_executor()
+        if self._metrics is not None:
+            await self._metrics.stop()
+        if self._store is not None:
+            # pending tasks (not acknowledged) will be replayed on startup.
+            await self._store.close()
+        if self._transport is not None:
+            # unacknowledged messages will be claimed by other workers.
+            await self._transport.disconnect()
+        self.logger.info(
+            'Background Queue Processor Stopped.'
+        )
+
+    async def on_startup(self, app: web.Application) -> None:
+        """Application On startup."""
+        if self.coro_in_threads is True:
+            self._loop_pool.start()
+        if self._metrics is not None:
+            self._metrics.start()
+        self._events.start()
+        self.events.start()
+        await self.fire_consumers()
+        if self._autoscaler is not None:
+            self._autoscaler.start()
+        self._scheduler.start()
+        if self._transport is not None:
+            await self._transport.connect()
+            self._puller = asyncio.create_task(self.pull_tasks())
+        if self._store is not None:
+            await self._store.open()
+            pending = await self._store.recover()
+            if pending:
+                self._replay = asyncio.create_task(self.replay_tasks(pending))
+        self.logger.info('Background Queue Processor Started.')
+
+    async def replay_tasks(self, pending: list) -> None:
+        """Enqueue again the tasks recovered from the Store."""
+        self.logger.notice(
+            f"Replaying {len(pending)} unfinished Tasks from {self._store!r}"
+        )
+        for task_id, payload in pending:
+            try:
+                handle = TaskHandle.from_payload(payload, task_id)
+            except RuntimeError as exc:
+                self.logger.error(
+                    f"Unable to recover Task {task_id}: {exc}"
+                )
+                # discarded: don't try to replay it again.
+                self._store.ack(task_id)
+                continue
+            try:
+                self.queue.lane_of(handle)
+            except ValueError:
+                handle.lane = None  # lane was removed, using default.
+            handle.persisted = True
+            self._tasks[handle.id] = handle
+            if handle.key is not None:
+                self._keys[handle.key] = handle
+            await self.queue.put(handle)
+
+    def _make_task(
+        self,
+        fn: Union[partial, Callable[P, Awaitable], Any],
+        args: tuple,
+        kwargs: dict
+    ) -> Any:
+        in_process = kwargs.pop('in_process', False)
+        if isinstance(fn, (TaskWrapper, partial)):
+            task = fn
+            if in_process is True:
+                task = self._to_process(fn)
+        elif in_process is True:
+            task = TaskWrapper(fn, *args, in_process=True, **kwargs)
+        elif callable(fn):
+            task = (fn, args, kwargs)
+        else:
+            raise TypeError(
+                f"Invalid Function {fn!r} for Background Queue"
+            )
+        return task
+
+    @staticmethod
+    def _pop_options(kwargs: dict) -> dict:
+        """Take the queue options (TASK_OPTIONS) out of the task arguments."""
+        return {name: kwargs.pop(name, None) for name in TASK_OPTIONS}
+
+    def _prepare(
+        self,
+        fn: Union[partial, Callable[P, Awaitable], Any],
+        args: tuple,
+        kwargs: dict,
+        options: Optional[dict] = None
+    ) -> tuple[Any, dict]:
+        """Build the task of an enqueue call and its queue options.
+
+        Options are taken out of kwargs (unless given), the values of a
+        TaskWrapper are the defaults.
+        """
+        if options is None:
+            options = self._pop_options(kwargs)
+        else:
+            options = dict(options)
+        task = self._make_task(fn, args, kwargs)
+        for name, value in options.items():
+            if value is None:
+                options[name] = getattr(task, name, None)
+        return task, options
+
+    async def put(
+        self,
+        fn: Union[partial, Callable[P, Awaitable], Any],
+        *args: P.args,
+        **kwargs: P.kwargs
+    ) -> TaskHandle:
+        """put.
+
+        Enqueue a Task, returns a TaskHandle that can be polled or awaited.
+
+        Use in_process=True to run a (CPU-bound) function in the Process Pool.
+
+        Use dedup_key="key" to coalesce duplicates: while a task with the same
+        key is pending its handle is returned instead, and debounce=seconds
+        to delay the task (coalescing the duplicates enqueued meanwhile).
+
+        In distributed mode the task runs on the worker pulling it: the
+        handle keeps the status "published" (wait() never returns), the
+        result is only available on that worker.
+        """
+        self._check_accepting()
+        task, options = self._prepare(fn, args, kwargs)
+        pending = self._coalesce(options['dedup_key'])
+        if pending is not None:
+            return pending
+        handle = self._create_handle(
+            task, key=options['dedup_key'], rate_class=options['rate_class']
+        )
+        if options['debounce']:
+            return self._schedule_handle(handle, time.time() + options['debounce'])
+        try:
+            if self._transport is not None and not await self._publish([handle]):
+                return handle
+            # persisted first: a spilled task is only kept on disk.
+            self._persist(handle)
+            await self._enqueue([handle])
+            return handle
+        except asyncio.QueueFull:
+            self._discard([handle])
+            self.logger.error(
+                f"Task Queue is Full, discarding Task {fn!r}"
+            )
+            raise
+        except BaseException:
+            # not enqueued (transport error, cancelled while waiting):
+            self._discard([handle])
+            raise
+
+    async def put_many(
+        self,
+        tasks: Iterable[Union[TaskWrapper, partial, Callable, tuple]],
+        nowait: bool = False
+    ) -> list[TaskHandle]:
+        """put_many.
+
+        Enqueue a batch of Tasks atomically (all or none), waiting once
+        for room for the whole batch (or raising QueueFull if nowait),
+        other overflow policies are applied to the batch as a whole.
+
+        Every task is a TaskWrapper, a partial, a callable without arguments
+        or a tuple of (fn, args, kwargs), kwargs can have queue options (as
+        in put), duplicates (dedup_key) are coalesced.
+        """
+        self._check_accepting()
+        handles, local = [], []
+        for task in tasks:
+            if isinstance(task, tuple):
+                fn, args, kwargs = (tuple(task) + ((), {}))[:3]
+                task, options = self._prepare(fn, tuple(args), dict(kwargs))
+            else:
+                task, options = self._prepare(task, (), {})
+            key = options['dedup_key']
+            pending = self._coalesce(key)
+            if pending is not None:
+                handles.append(pending)
+                continue
+            handle = self._create_handle(
+                task, key=key, rate_class=options['rate_class']
+            )
+            handles.append(handle)
+            if options['debounce']:
+                self._schedule_handle(handle, time.time() + options['debounce'])
+            else:
+                local.append(handle)
+        try:
+            if self._transport is not None:
+                local = await self._publish(local)
+            for handle in local:
+                self._persist(handle)
+            await self._enqueue(local, nowait=nowait)
+            return handles
+        except asyncio.QueueFull:
+            self._discard(local)
+            self.logger.error(
+                f"Task Queue is Full, discarding a batch of {len(local)} Tasks"
+            )
+            raise
+        except BaseException:
+            self._discard(local)
+            raise
+
+    def _discard(self, handles: list[TaskHandle]) -> None:
+        """Forget the handles of tasks that were not enqueued."""
+        for handle in handles:
+            self._unpersist(handle)
+            self._tasks.pop(handle.id, None)
+            self._release_key(handle)
+
+    def _check_accepting(self) -> None:
+        if self._draining is True:
+            raise QueueDraining(
+                "Task Queue is shutting down, not accepting new Tasks"
+            )
+
+    async def _enqueue(self, handles: list[TaskHandle], nowait: bool = False) -> None:
+        """Enqueue the handles applying the overflow policy."""
+        if not handles:
+            return
+        if self.overflow == 'reject':
+            if self.overloaded or not self.queue.fits(handles):
+                raise QueueOverflow(
+                    f"Task Queue is overloaded, rejecting {len(handles)} Tasks"
+                )
+            self.queue.put_many_nowait(handles)
+        elif self.overflow == 'drop_oldest':
+            for handle in handles:
+                while self.queue.full(handle):
+                    oldest = self.queue.pop_oldest(handle)
+                    if oldest is None:
+                        raise QueueOverflow()
+                    self._drop(oldest)
+                self.queue.put_nowait(handle)
+        elif self.overflow == 'spill':
+            if len(self._spill) or self.overloaded or not self.queue.fits(handles):
+                # once spilling, keep the order: new tasks are spilled too.
+                await self._spill_tasks(handles)
+            else:
+                self.queue.put_many_nowait(handles)
+        elif nowait is True:
+            self.queue.put_many_nowait(handles)
+        elif self.put_timeout:
+            try:
+                await asyncio.wait_for(
+                    self.queue.put_many(handles), self.put_timeout
+                )
+            except asyncio.TimeoutError as exc:
+                raise QueueOverflow(
+                    f"Task Queue is Full after waiting {self.put_timeout} seconds"
+                ) from exc
+        else:
+            await self.queue.put_many(handles)
+
+    def _drop(self, handle: TaskHandle) -> None:
+        self.logger.warning(
+            f"Task Queue is Full, dropping the oldest Task {handle.task!r}"
+        )
+        handle.set_error(QueueOverflow('Task dropped'), status='cancelled')
+        self._unpersist(handle)
+        self._task_finished(handle)
+
+    async def _spill_tasks(self, handles: list[TaskHandle]) -> None:
+        records = []
+        for handle in handles:
+            try:
+                records.append((str(handle.id), handle.to_payload()))
+            except RuntimeError as exc:
+                raise QueueOverflow(
+                    f"Task Queue is Full and Task {handle.task!r} can't be spilled"
+                ) from exc
+        await self._spill.push(records)
+        for handle in handles:
+            handle.status = 'spilled'
+            handle.task = None  # loaded again from the spill file.
+        if self._unspiller is None or self._unspiller.done():
+            self._unspiller = asyncio.create_task(self.unspill_tasks())
+
+    async def unspill_tasks(self) -> None:
+        """Enqueue the spilled tasks when the queue has room again."""
+        while len(self._spill):
+            limit = self.high_watermark or self.queue.maxsize
+            room = limit - self.queue.qsize() if limit else 100
+            if self.overloaded or room <= 0:
+                await self.queue.wait_space()
+                continue
+            handles = []
+            for task_id, payload in await self._spill.pop(room):
+                handle = self._tasks.get(uuid.UUID(task_id), None)
+                if handle is None or handle.done():
+                    continue
+                try:
+                    handle.load_payload(payload)
+                except RuntimeError as exc:
+                    handle.set_error(exc)
+                    self._task_finished(handle)
+                    continue
+                handle.status = 'pending'
+                handle.queued_at = time.time()
+                handles.append(handle)
+            await self.queue.put_many(handles)
+
+    async def put_at(
+        self,
+        when: Union[datetime, float],
+        fn: Union[partial, Callable[P, Awaitable], Any],
+        *args: P.args,
+        **kwargs: P.kwargs
+    ) -> TaskHandle:
+        """put_at.
+
+        Enqueue a Task at a given time (datetime or timestamp), returns
+        a TaskHandle (status "scheduled" until the task is enqueued),
+        cancelled with unschedule(handle.id).
+
+        Accepts the queue options of put() (debounce is ignored: duplicates
+        are coalesced while the task is scheduled).
+        """
+        self._check_accepting()
+        task, options = self._prepare(fn, args, kwargs)
+        pending = self._coalesce(options['dedup_key'])
+        if pending is not None:
+            return pending
+        handle = self._create_handle(
+            task, key=options['dedup_key'], rate_class=options['rate_class']
+        )
+        return self._schedule_handle(handle, when)
+
+    def _schedule_handle(
+        self,
+        handle: TaskHandle,
+        when: Union[datetime, float]
+    ) -> TaskHandle:
+        handle.status = 'scheduled'
+        self._scheduler.add(
+            ScheduledTask(
+                self._scheduler.loop_time(when), handle.task, handle=handle
+            )
+        )
+        return handle
+
+    async def put_after(
+        self,
+        delay: float,
+        fn: Union[partial, Callable[P, Awaitable], Any],
+        *args: P.args,
+        **kwargs: P.kwargs
+    ) -> TaskHandle:
+        """put_after.
+
+        Enqueue a Task after `delay` seconds (see put_at).
+        """
+        return await self.put_at(time.time() + delay, fn, *args, **kwargs)
+
+    def schedule(
+        self,
+        interval: float,
+        fn: Union[partial, Callable[P, Awaitable], Any],
+        *args: P.args,
+        start: Union[datetime, float, None] = None,
+        **kwargs: P.kwargs
+    ) -> ScheduledTask:
+        """schedule.
+
+        Enqueue a Task every `interval` seconds (first run at `start`,
+        or after one interval), a run is skipped while the previous one
+        (or a pending task with the same dedup_key) is still pending
+        or running; rate_class applies to every run.
+
+        Returns a ScheduledTask, stopped with cancel() or unschedule().
+        """
+        self._check_accepting()
+        if interval <= 0:
+            raise ValueError(
+                f"Invalid interval for a Periodic Task: {interval}"
+            )
+        options = self._pop_options(kwargs)
+        if options['debounce']:
+            raise ValueError(
+                "Periodic Tasks can't be debounced, use the interval instead."
+            )
+        when = start if start is not None else time.time() + interval
+        return self._scheduler.add(
+            ScheduledTask(
+                self._scheduler.loop_time(when),
+                fn,
+                args=args,
+                kwargs=kwargs,
+                interval=interval,
+                options=options
+            )
+        )
+
+    def unschedule(self, task_id: Union[str, uuid.UUID]) -> bool:
+        """Cancel a Scheduled Task.
+
+        task_id is the ID of the TaskHandle (delayed task) or the ID of the
+        ScheduledTask (periodic task).
+        """
+        entry = self._scheduler.get(task_id)
+        if entry is not None and entry.handle is not None and entry.interval is None:
+            entry.handle.set_error(asyncio.CancelledError(), status='cancelled')
+            self._task_finished(entry.handle)
+        return self._scheduler.cancel(task_id)
+
+    async def _dispatch_scheduled(self, entry: ScheduledTask) -> None:
+        if entry.interval is not None:
+            previous = entry.handle
+            if previous is not None and previous.status in TaskHandle.ACTIVE:
+                self.logger.warning(
+                    f"Periodic Task {entry.fn!r} is still running, skipping run"
+                )
+                return
+            task, options = self._prepare(
+                entry.fn, entry.args, dict(entry.kwargs), entry.options
+            )
+            if self._coalesce(options['dedup_key']) is not None:
+                return
+            entry.handle = self._create_handle(
+                task, key=options['dedup_key'], rate_class=options['rate_class']
+            )
+        await self._submit(entry.handle)
+
+    async def _submit(self, handle: TaskHandle) -> None:
+        """Enqueue a handle created earlier (scheduled or batch)."""
+        handle.status = 'pending'
+        handle.queued_at = time.time()
+        try:
+            if self._transport is not None and not await self._publish([handle]):
+                return
+            self._persist(handle)
+            await self._enqueue([handle])
+        except BaseException as exc:
+            # the handle was returned earlier: finished with the error.
+            self._unpersist(handle)
+            if isinstance(exc, asyncio.CancelledError):
+                handle.set_error(exc, status='cancelled')
+            else:
+                handle.set_error(exc)
+            self._task_finished(handle)
+            raise
+
+    async def _submit_local(self, handle: TaskHandle) -> None:
+        """Enqueue a handle on this queue (not published nor persisted)."""
+        handle.status = 'pending'
+        handle.queued_at = time.time()
+        try:
+            await self._enqueue([handle])
+        except asyncio.QueueFull as exc:
+            handle.set_error(exc)
+            self._task_finished(handle)
+
+    async def put_graph(self, graph: TaskGraph) -> GraphRun:
+        """put_graph.
+
+        Execute a TaskGraph (DAG of TaskWrappers): tasks without pending
+        dependencies are enqueued (and run concurrently), a task is enqueued
+        as soon as all its dependencies are done, with their results.
+
+        Tasks of a graph run on this process (results are passed in memory),
+        so they are not published (distributed mode) nor persisted.
+
+        Returns a GraphRun (handles by task name, wait() for the results).
+        """
+        self._check_accepting()
+        graph.validate()
+        run = GraphRun(self, graph)
+        run.start()
+        return run
+
+    async def put_batch(
+        self,
+        fn: Callable,
+        item: Any,
+        *args,
+        max_size: int = 100,
+        max_wait: float = 0.05,
+        batch_key: Optional[Any] = None,
+        **kwargs
+    ) -> TaskHandle:
+        """put_batch.
+
+        Add an item to the batch of `fn`, items are accumulated until
+        max_size items (or max_wait seconds since the first item) and then
+        fn(items, *args, **kwargs) is enqueued as a single Task.
+
+        Returns the TaskHandle of the batch (shared by all its items),
+        options of the first item (TaskWrapper arguments) apply to the batch.
+        """
+        self._check_accepting()
+        key = batch_key if batch_key is not None else fn
+        batch = self._batches.get(key, None)
+        if batch is None:
+            items: list = []
+            task = TaskWrapper(fn, items, *args, **kwargs)
+            handle = self._create_handle(task)
+            handle.status = 'scheduled'
+            batch = TaskBatch(key, handle, items, max_size=max_size)
+            batch.timer = asyncio.get_running_loop().call_later(
+                max_wait, self._flush_later, key
+            )
+            self._batches[key] = batch
+        if batch.add(item):
+            await self.flush_batch(key)
+        return batch.handle
+
+    def _flush_later(self, key: Any) -> None:
+        flush = asyncio.create_task(self.flush_batch(key))
+        self._flushes.add(flush)
+        flush.add_done_callback(self._flushes.discard)
+
+    async def flush_batch(self, key: Any) -> Optional[TaskHandle]:
+        """Enqueue a batch now (key is the function or the batch_key)."""
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return None
+        batch.cancel()
+        try:
+            await self._submit(batch.handle)
+        except asyncio.QueueFull as exc:
+            self.logger.error(
+                f"Task Queue is Full, discarding {batch!r}: {exc}"
+            )
+        except Exception as exc:  # pylint: disable=W0718
+            self.logger.error(
+                f"Error enqueueing {batch!r}, discarding it: {exc}"
+            )
+        return batch.handle
+
+    def _to_process(self, task: Union[TaskWrapper, partial]) -> TaskWrapper:
+        if isinstance(task, partial):
+            return TaskWrapper(task, in_process=True)
+        task.in_process = True
+        return task
+
+    def _coalesce(self, key: Optional[str]) -> Optional[TaskHandle]:
+        """Returns the pending task with the same idempotency key (if any)."""
+        if key is None:
+            return None
+        pending = self._keys.get(key, None)
+        if pending is None or pending.status not in TaskHandle.WAITING:
+            return None
+        pending.coalesced += 1
+        self.logger.debug(
+            f"Coalescing Task {key} ({pending.coalesced} duplicates)"
+        )
+        return pending
+
+    def _release_key(self, handle: TaskHandle) -> None:
+        """The task is no longer pending, duplicates will be enqueued again."""
+        if handle.key is not None and self._keys.get(handle.key) is handle:
+            del self._keys[handle.key]
+
+    def _create_handle(
+        self,
+        task: Any,
+        key: Optional[str] = None,
+        rate_class: Optional[str] = None
+    ) -> TaskHandle:
+        if isinstance(task, TaskWrapper):
+            handle = TaskHandle(
+                task,
+                timeout=task.timeout,
+                max_retries=task.max_retries,
+                retry_delay=task.retry_delay,
+                lane=task.lane,
+                rate_class=task.rate_class
+            )
+        else:
+            handle = TaskHandle(
+                task,
+                timeout=self.task_timeout,
+                max_retries=self.max_retries,
+                retry_delay=self.retry_delay
+            )
+        if rate_class is not None:
+            handle.rate_class = rate_class
+        self.queue.lane_of(handle)  # raises ValueError on unknown lanes.
+        self._tasks[handle.id] = handle
+        if key is not None:
+            handle.key = key
+            self._keys[key] = handle
+        return handle
+
+    async def _publish(self, handles: list[TaskHandle]) -> list[TaskHandle]:
+        """Publish the tasks to the transport, returns the ones to run locally."""
+        published, local = [], []
+        for handle in handles:
+            try:
+                published.append((handle, handle.to_payload()))
+            except RuntimeError as exc:
+                self.logger.warning(
+                    f"Task {handle.task!r} is not serializable, running locally: {exc}"
+                )
+                local.append(handle)
+        if published:
+            await self._transport.publish(
+                [(str(handle.id), payload) for handle, payload in published]
+            )
+            for handle, _ in published:
+                # the result will be available on the worker running the task.
+                handle.status = 'published'
+                self._tasks.pop(handle.id, None)
+                self._release_key(handle)
+        return local
+
+    async def pull_tasks(self) -> None:
+        """Pull Tasks from the transport while there are idle consumers."""
+        while True:
+            idle = len(self.consumers) - self.queue.running - self.queue.qsize()
+            if idle <= 0:
+                await asyncio.sleep(.05)
+                continue
+            try:
+                tasks = await self._transport.pull(idle)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # pylint: disable=W0718
+                self.logger.error(
+                    f"Error pulling Tasks from {self._transport!r}: {exc}"
+                )
+                await asyncio.sleep(1)
+                continue
+            if not tasks:
+                # the blocking read already waited, just yield the loop.
+                await asyncio.sleep(0)
+            for message_id, task_id, payload in tasks:
+                try:
+                    handle = TaskHandle.from_payload(payload, task_id)
+                except RuntimeError as exc:
+                    self.logger.error(
+                        f"Discarding invalid Task {message_id}: {exc}"
+                    )
+                    await self._transport.ack(message_id)
+                    continue
+                handle.message_id = message_id
+                try:
+                    self.queue.lane_of(handle)
+                except ValueError:
+                    handle.lane = None  # unknown lane on this worker.
+                self._tasks[handle.id] = handle
+                await self.queue.put(handle)
+
+    def _persist(self, handle: TaskHandle) -> None:
+        if self._store is not None and not handle.persisted:
+            handle.persisted = self._store.add(handle)
+
+    def _unpersist(self, handle: TaskHandle) -> None:
+        if handle.persisted:
+            self._store.ack(handle.id)
+            handle.persisted = False
+
+    def get_task(self, task_id: Union[str, uuid.UUID]) -> Optional[TaskHandle]:
+        """Returns the TaskHandle of a (pending or recently finished) Task."""
+        if isinstance(task_id, str):
+            task_id = uuid.UUID(task_id)
+        return self._tasks.get(task_id, None)
+
+    def _task_finished(self, handle: TaskHandle) -> None:
+        self._release_key(handle)
+        self._throughput.add(handle.status)
+        if handle.status in ('failed', 'timeout'):
+            self._failures.append(handle.to_dict())
+        # keep a bounded history of finished tasks:
+        if len(self._history) == self._history.maxlen:
+            self._tasks.pop(self._history[0], None)
+        self._history.append(handle.id)
+
+    async def task_callback(self, task: Any, **kwargs: P.kwargs):
+        self.logger.notice(
+            f':: Task Executed: {task!r}'
+        )
+
+    def get_callback(self, done_callback: str) -> Union[Callable, Awaitable]:
+        if not done_callback:
+            ## returns a simple logger:
+            return self.task_callback
+        try:
+            parts = done_callback.split(".")
+            bkname = parts.pop()
+            classpath = ".".join(parts)
+            module = import_module(classpath, package=bkname)
+            return getattr(module, bkname)
+        except ImportError as ex:
+            raise RuntimeError(
+                f"Error loading Queue Callback {done_callback}: {ex}"
+            ) from ex
+
+    async def drain(self, timeout: Optional[float] = None) -> dict:
+        """drain.
+
+        Graceful shutdown: stop accepting tasks and wait (up to timeout
+        seconds, default: drain_timeout) for the pending and running tasks.
+
+        The leftovers (pending, retrying, spilled, scheduled or interrupted)
+        are not acknowledged, so are replayed from the Store (or claimed by
+        other workers from the transport) after a restart; the ones that
+        cannot be replayed are dropped.
+
+        Returns a report of drained, persisted, released and dropped tasks.
+        """
+        timeout = self.drain_timeout if timeout is None else timeout
+        self._draining = True
+        started = time.time()
+        # the open batches are enqueued (not accumulating anymore):
+        for key in list(self._batches):
+            await self.flush_batch(key)
+        # no more tasks from the Store, the transport or the Scheduler:
+        for task in (self._replay, self._puller):
+            if task is not None:
+                task.cancel()
+        if self._autoscaler is not None:
+            await self._autoscaler.stop()
+        for entry in await self._scheduler.stop():
+            if entry.interval is None and entry.handle.status == 'scheduled':
+                self._persist(entry.handle)
+        tracked = [
+            handle for handle in self._tasks.values()
+            if not handle.done() and handle.status != 'published'
+        ]
+        active = [h for h in tracked if h.status in TaskHandle.ACTIVE]
+        if active:
+            self.logger.notice(
+                f"Draining {len(active)} Tasks (timeout: {timeout} sec.)"
+            )
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(h.wait() for h in active)), timeout
+                )
+            except asyncio.TimeoutError:
+                self.logger.warning(
+                    "Queue drain timed out, interrupting the running Tasks."
+                )
+        leftovers = [handle for handle in tracked if not handle.done()]
+        # stop everything else (interrupted tasks are not acknowledged):
+        for retry in list(self._retries):
+            retry.cancel()
+        if self._unspiller is not None:
+            self._unspiller.cancel()
+        if self._spill is not None:
+            await self._spill.close()
+        self.queue.drain()
+        consumers = list(self.consumers)
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        report = {
+            "drained": len(tracked) - len(leftovers),
+            "persisted": 0,
+            "released": 0,
+            "dropped": 0,
+            "elapsed": round(time.time() - started, 3)
+        }
+        for handle in leftovers:
+            if handle.persisted:
+                report['persisted'] += 1
+            elif handle.message_id is not None:
+                report['released'] += 1
+            else:
+                report['dropped'] += 1
+            if not handle.done():
+                handle.set_error(asyncio.CancelledError(), status='cancelled')
+        if report['dropped']:
+            self.logger.warning(
+                f"{report['dropped']} Tasks were dropped on shutdown "
+                "(use a Store for replaying them after a restart)."
+            )
+        self.logger.notice(f"Background Queue drained: {report}")
+        return report
+
+    async def empty_queue(self, timeout: float = 0) -> dict:
+        """Shut down the Queue, without waiting for its tasks (see drain)."""
+        return await self.drain(timeout=timeout)
+
+    # Task Execution:
+    async def _execute_taskwrapper(self, task: TaskWrapper):
+        """Execute the a task as a TaskWrapper."""
+        return await task.execute(
+            self.executor,
+            loop_pool=self._loop_pool,
+            coro_in_threads=self.coro_in_threads
+        )
+
+    async def _execute_coroutine(self, coro: coroutine):
+        """Execute a coroutine."""
+        if self.coro_in_threads is True:
+            return await self._loop_pool.run(coro)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            asyncio.run,
+            coro
+        )
+
+    async def _execute_callable(self, func: Callable, *args, **kwargs):
+        """Execute a synchronous callable."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            partial(func, *args, **kwargs)
+        )
+
+    async def _execute_task(self, task: Any):
+        """Dispatch a Task (TaskWrapper, partial or function) to the executors."""
+        if isinstance(task, TaskWrapper):
+            return await self._execute_taskwrapper(task)
+        elif isinstance(task, partial):
+            return await self._execute_callable(task)
+        # Unpack the function and its arguments
+        func, args, kwargs = task
+        if asyncio.iscoroutinefunction(func):
+            return await self._execute_coroutine(func(*args, **kwargs))
+        return await self._execute_callable(func, *args, **kwargs)
+
+    async def _run_task(self, handle: TaskHandle) -> bool:
+        """_run_task.
+
+        Execute a Task (with timeout), returns False if the task was
+        scheduled for a retry.
+        """
+        handle.set_running()
+        try:
+            result = await asyncio.wait_for(
+                self._execute_task(handle.task),
+                timeout=handle.timeout
+            )
+            handle.set_result(result)
+            return True
+        except asyncio.CancelledError:
+            handle.set_error(asyncio.CancelledError(), status='cancelled')
+            raise
+        except Exception as e:
+            timed_out = isinstance(e, asyncio.TimeoutError)
+            if timed_out:
+                # running threads cannot be killed: the slot is released anyway.
+                e = asyncio.TimeoutError(
+                    f"Task {handle.task!r} timed out after {handle.timeout} sec."
+                )
+            if handle.attempts <= handle.max_retries:
+                delay = self._retry_backoff(handle)
+                self.logger.warning(
+                    f"Task {handle.task!r} failed ({e!r}), retry "
+                    f"{handle.attempts}/{handle.max_retries} in {delay:.2f} sec."
+                )
+                handle.status = 'retrying'
+                retry = asyncio.create_task(self._retry_task(handle, delay))
+                self._retries.add(retry)
+                retry.add_done_callback(self._retries.discard)
+                return False
+            # logged (once) by the task.finished event.
+            handle.set_error(e, status='timeout' if timed_out else 'failed')
+            handle.result = {
+                "status": handle.status,
+                "error": e
+            }
+            return True
+
+    def _retry_backoff(self, handle: TaskHandle) -> float:
+        """Exponential Backoff (with jitter) for retrying a Task."""
+        delay = handle.retry_delay * (2 ** (handle.attempts - 1))
+        jitter = getattr(handle.task, 'jitter', 0.0)
+        if jitter > 0:
+            delay += random.uniform(0, jitter)
+        return delay
+
+    async def _retry_task(self, handle: TaskHandle, delay: float):
+        # waiting outside of the consumers, so no worker slot is held.
+        await asyncio.sleep(delay)
+        handle.queued_at = time.time()
+        await self.queue.put(handle)
+
+    def _task_name(self, task: Any) -> str:
+        if isinstance(task, TaskWrapper):
+            return task.name
+        func = task.func if isinstance(task, partial) else task[0]
+        return getattr(func, '__name__', repr(func))
+
+    async def process_queue(self):
+        """Process the Queue."""
+        while True:
+            handle = await self.queue.get()
+            if handle is None:
+                if self._retiring > 0:
+                    self._retiring -= 1  # scaled down.
+                break  # Exit signal
+            # running: a duplicate will be a new execution.
+            self._release_key(handle)
+            consumer = asyncio.current_task()
+            self._running[consumer] = handle
+            task = handle.task
+            started = time.time()
+            wait = started - handle.queued_at
+            if self._autoscaler is not None:
+                self._autoscaler.observe(wait)
+            cpu = None
+            if self._metrics is not None:
+                # collects the CPU time of the blocking calls of this task:
+                cpu = []
+                task_cpu.set(cpu)
+            finished = True
+            try:
+                finished = await self._run_task(handle)
+            except asyncio.CancelledError:
+                # interrupted (ex: on shutdown), the task is not acknowledged
+                # so it can be replayed (from the Store or the transport).
+                finished = False
+                raise
+            finally:
+                self._running.pop(consumer, None)
+                task_duration = time.time() - started
+                if self._metrics is not None:
+                    self._metrics.record(
+                        self._task_name(task),
+                        handle.status,
+                        started,
+                        task_duration,
+                        wait,
+                        cpu
+                    )
+                if finished:
+                    failed = handle.status == 'failed'
+                    error = {"error": handle.error} if handle.error else {}
+                    self.events.emit(
+                        'task.finished',
+                        status=handle.status,
+                        duration=task_duration,
+                        exc_info=handle.error if failed else None,
+                        task=self._task_name(task),
+                        task_id=handle.id,
+                        wait=wait,
+                        attempts=handle.attempts,
+                        **error
+                    )
+                    self._task_finished(handle)
+                    self._unpersist(handle)
+                    if handle.message_id is not None:
+                        try:
+                            await self._transport.ack(handle.message_id)
+                        except Exception as e:
+                            self.logger.error(
+                                f"Error acknowledging Task {handle.message_id}: {e}"
+                            )
+                    if isinstance(task, TaskWrapper):
+                        try:
+                            await task.run_callback(handle.result, self.executor)
+                        except Exception as e:
+                            self.logger.error(
+                                f"Error in TaskWrapper Callback {task!r}: {e}"
+                            )
+                    # Task completion callback (delivered asynchronously):
+                    self._events.push(CompletionEvent(handle, task))
+                # Signal task completion for the queue
+                try:
+                    self.queue.task_done(handle)
+                except Exception as e:
+                    self.logger.exception(
+                        f"Error marking Task {handle.id} as done: {e}"
+                    )
+
+    def _make_executor(self) -> ThreadPoolExecutor:
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers
+        )
+        if self._metrics is not None:
+            return ProfiledExecutor(executor)
+        return executor
+
+    def shutdown_executor(self):
+        self.executor.shutdown(wait=True)
+
+    @property
+    def workers(self) -> int:
+        """Number of consumers (not counting the ones being retired)."""
+        return len(self.consumers) - self._retiring
+
+    def _add_consumer(self) -> None:
+        task = asyncio.create_task(
+            self.process_queue()
+        )
+        task.add_done_callback(self._consumer_done)
+        self.consumers.append(task)
+
+    def _consumer_done(self, task: asyncio.Task) -> None:
+        try:
+            self.consumers.remove(task)
+        except ValueError:
+            pass
+
+    def scale(self, workers: int) -> None:
+        """Grow (or shrink) the number of consumers."""
+        current = self.workers
+        if workers > current:
+            for _ in range(workers - current):
+                self._add_consumer()
+        elif workers < current:
+            # idle consumers exit on the termination signal:
+            for _ in range(current - workers):
+                self._retiring += 1
+                self.queue.put_nowait(None)
+            # threads are started on demand: a new executor releases the
+            # idle ones (the old executor finish its running calls).
+            executor, self.executor = self.executor, self._make_executor()
+            executor.shutdown(wait=False)
+
+    async def fire_consumers(self):
+        """Fire up the Task consumers."""
+        if self._autoscaler is not None:
+            workers = self._autoscaler.min_workers
+        else:
+            workers = self.max_workers - 1
+        for _ in range(workers):
+            self._add_consumer()
@@ -0,0 +1,173 @@
+"""
+Task Scheduler.
+
+Delayed and periodic tasks for the Background Queue, kept on a timer heap
+(a single asyncio task sleeps until the next due timer), so scheduled tasks
+don't use any worker until they are enqueued.
+"""
+from typing import Any, Optional, Union
+from collections.abc import Awaitable, Callable
+import time
+import uuid
+import heapq
+import asyncio
+import itertools
+from datetime import datetime
+from navconfig.logging import logging
+
+
+class ScheduledTask:
+    """ScheduledTask.
+
+    A timer of the TaskScheduler, periodic if interval is set.
+
+    Args:
+        when: loop time (monotonic) of the next run.
+        fn: function (or TaskWrapper, partial) to enqueue.
+        interval: seconds between runs of a periodic task.
+        handle: TaskHandle of a one-shot task (the entry has the same id).
+        options: queue options (ex: rate_class) of every run.
+    """
+    def __init__(
+        self,
+        when: float,
+        fn: Any,
+        args: tuple = (),
+        kwargs: Optional[dict] = None,
+        interval: Optional[float] = None,
+        handle: Any = None,
+        options: Optional[dict] = None
+    ):
+        # one-shot tasks are cancelled by the ID of their TaskHandle:
+        self.id: uuid.UUID = handle.id if handle is not None else uuid.uuid4()
+        self.when = when
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.interval = interval
+        self.options = options or {}
+        # TaskHandle of a one-shot task (or the last run of a periodic task):
+        self.handle = handle
+        self.runs: int = 0
+        self.cancelled: bool = False
+
+    def __repr__(self):
+        kind = f"every {self.interval}s" if self.interval else "once"
+        return f"<ScheduledTask {self.id} {self.fn!r} {kind}>"
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def next_run(self) -> float:
+        """Seconds until the next run."""
+        return max(self.when - asyncio.get_running_loop().time(), 0.0)
+
+
+class TaskScheduler:
+    """TaskScheduler.
+
+    Timer heap calling `dispatch(entry)` when a ScheduledTask is due.
+
+    Args:
+        dispatch: coroutine function enqueueing a due ScheduledTask.
+    """
+    def __init__(self, dispatch: Callable[[ScheduledTask], Awaitable]):
+        self.logger = logging.getLogger('NAV.Queue.Scheduler')
+        self._dispatch = dispatch
+        self._timers: list = []
+        self._counter = itertools.count()
+        self._entries: dict[uuid.UUID, ScheduledTask] = {}
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def loop_time(when: Union[datetime, float]) -> float:
+        """Convert a datetime (or timestamp) to loop time."""
+        if isinstance(when, datetime):
+            when = when.timestamp()
+        return asyncio.get_running_loop().time() + (when - time.time())
+
+    def start(self) -> None:
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> list[ScheduledTask]:
+        """Stop the timers, returns the cancelled (pending) entries."""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        pending = [e for e in self._entries.values() if not e.cancelled]
+        for entry in pending:
+            entry.cancel()
+        self._entries.clear()
+        self._timers.clear()
+        return pending
+
+    def add(self, entry: ScheduledTask) -> ScheduledTask:
+        self._entries[entry.id] = entry
+        self._push(entry)
+        return entry
+
+    def _push(self, entry: ScheduledTask) -> None:
+        heapq.heappush(self._timers, (entry.when, next(self._counter), entry))
+        if self._timers[0][2] is entry:
+            # new earliest timer: the runner must sleep less.
+            self._wakeup.set()
+
+    def get(self, entry_id: Union[str, uuid.UUID]) -> Optional[ScheduledTask]:
+        if isinstance(entry_id, str):
+            entry_id = uuid.UUID(entry_id)
+        return self._entries.get(entry_id, None)
+
+    def cancel(self, entry_id: Union[str, uuid.UUID]) -> bool:
+        entry = self.get(entry_id)
+        if entry is None:
+            return False
+        entry.cancel()
+        self._entries.pop(entry.id, None)
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            while self._timers and self._timers[0][2].cancelled:
+                heapq.heappop(self._timers)
+            if not self._timers:
+                await self._wakeup.wait()
+                continue
+            delay = self._timers[0][0] - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, entry = heapq.heappop(self._timers)
+            if entry.cancelled:
+                continue
+            entry.runs += 1
+            try:
+                await self._dispatch(entry)
+            except Exception as exc:  # pylint: disable=W0718
+                self.logger.error(
+                    f"Error enqueueing Scheduled Task {entry!r}: {exc}"
+                )
+            if entry.interval and not entry.cancelled:
+                # fixed rate, skipping the runs missed (ex: a full queue):
+                now = loop.time()
+                entry.when += entry.interval
+                if entry.when <= now:
+                    entry.when += entry.interval * (
+                        (now - entry.when) // entry.interval + 1
+                    )
+                self._push(entry)
+            else:
+                self._entries.pop(entry.id, None)
@@ -0,0 +1,8 @@
+"""
+Backing Stores for BackgroundQueue.
+
+Persisting enqueued tasks to replay unacknowledged ones after a restart.
+"""
+from .abstract import BaseStore
+from .journal import JournalStore
+from .spill import SpillStore
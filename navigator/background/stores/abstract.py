@@ -0,0 +1,48 @@
+"""
+Base Abstract for all Background Queue Stores.
+"""
+from typing import Any, Optional
+from abc import ABC, abstractmethod
+from navconfig.logging import logging
+
+
+class BaseStore(ABC):
+    """BaseStore.
+
+    Records enqueued tasks (add) and finished tasks (ack), tasks added
+    but never acknowledged are returned by recover() on startup.
+    """
+    def __init__(self, **kwargs):
+        self.logger = logging.getLogger(
+            f'NAV.Queue.{self.__class__.__name__}'
+        )
+
+    def dump(self, handle: Any) -> Optional[str]:
+        """Serialize a TaskHandle (None if the task is not serializable)."""
+        try:
+            return handle.to_payload()
+        except RuntimeError as exc:
+            self.logger.warning(
+                f"Task {handle.task!r} is not serializable, won't be persisted: {exc}"
+            )
+            return None
+
+    @abstractmethod
+    async def open(self) -> None:
+        """Open the Store."""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Flush and close the Store."""
+
+    @abstractmethod
+    def add(self, handle: Any) -> bool:
+        """Record an enqueued task, returns False if was not persisted."""
+
+    @abstractmethod
+    def ack(self, task_id: Any) -> None:
+        """Record a finished task."""
+
+    @abstractmethod
+    async def recover(self) -> list[tuple[str, str]]:
+        """Returns the (task_id, payload) pairs never acknowledged."""
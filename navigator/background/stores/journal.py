@@ -0,0 +1,262 @@
+"""
+Journal Store.
+
+Append-only journal file (JSON lines) with batched writes and fsync.
+"""
+from typing import Any, Optional, Union
+import os
+import uuid
+import asyncio
+from pathlib import Path, PurePath
+from ...libs.json import json_encoder, json_decoder
+from .abstract import BaseStore
+
+
+class JournalStore(BaseStore):
+    """JournalStore.
+
+    Every enqueued task is appended as an "add" record and every finished
+    task as an "ack" record; records are buffered and written (and fsync'ed)
+    in batches, so durability doesn't cost a disk write per task.
+
+    Every process (ex: a gunicorn worker) writes a journal of its own,
+    "queue.journal" is written as "queue.<pid>.journal": recover() replays
+    the journal of this process and claims the journals of the processes
+    that are no longer running, never the tasks of a live sibling worker.
+
+    The journal is compacted (only pending tasks are kept) on recover()
+    and every time `compact_records` acknowledged records were written.
+
+    Args:
+        path: path of the journal file.
+        flush_interval: max time (in seconds) a record waits in the buffer.
+        batch_size: number of buffered records that forces a flush.
+        compact_records: number of finished records that forces a compaction.
+        worker: id of the worker (default: the pid of the process).
+    """
+    def __init__(
+        self,
+        path: Union[str, PurePath],
+        flush_interval: float = 0.05,
+        batch_size: int = 500,
+        compact_records: int = 10000,
+        worker: Optional[int] = None,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.base = Path(path)
+        self.worker: int = worker if worker is not None else os.getpid()
+        self.path = self._journal_of(self.worker)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.compact_records = compact_records
+        self._buffer: list = []
+        self._persisted: set = set()
+        # records written since the last compaction:
+        self._written: int = 0
+        self._file = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+
+    def __repr__(self):
+        return f"<JournalStore {self.path}>"
+
+    async def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+        self._close_file()
+
+    def add(self, handle: Any) -> bool:
+        payload = self.dump(handle)
+        if payload is None:
+            return False
+        task_id = str(handle.id)
+        self._persisted.add(task_id)
+        self._append({"op": "add", "id": task_id, "payload": payload})
+        return True
+
+    def ack(self, task_id: Any) -> None:
+        task_id = str(task_id)
+        if task_id not in self._persisted:
+            return
+        self._persisted.discard(task_id)
+        self._append({"op": "ack", "id": task_id})
+
+    def _append(self, record: dict) -> None:
+        self._buffer.append(json_encoder(record))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+                if self._written - len(self._persisted) >= self.compact_records:
+                    await self.compact()
+            except Exception as exc:  # pylint: disable=W0718
+                self.logger.error(
+                    f"Error writing Queue Journal {self.path}: {exc}"
+                )
+
+    async def flush(self) -> None:
+        """Write (and fsync) all the buffered records."""
+        async with self._lock:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if not self._buffer:
+            return
+        records, self._buffer = self._buffer, []
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write, records)
+
+    def _write(self, records: list) -> None:
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write('\n'.join(records) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._written += len(records)
+
+    async def compact(self) -> None:
+        """Rewrite the journal keeping only the pending tasks."""
+        async with self._lock:
+            await self._flush()
+            self._close_file()
+            loop = asyncio.get_running_loop()
+            pending = await loop.run_in_executor(
+                None, self._read_pending, self.path
+            )
+            await loop.run_in_executor(None, self._compact, pending)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _journal_of(self, worker: Any) -> Path:
+        return self.base.with_name(
+            f"{self.base.stem}.{worker}{self.base.suffix}"
+        )
+
+    def _owner_of(self, path: Path) -> Optional[int]:
+        """pid of the worker writing a journal (None: not a worker journal)."""
+        name = path.name[len(self.base.stem) + 1:]
+        if self.base.suffix:
+            name = name[:-len(self.base.suffix)]
+        try:
+            return int(name.split('.')[0])
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _is_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _claim_journals(self) -> list[Path]:
+        """Journals of this worker and of the workers no longer running.
+
+        A journal of a dead worker is renamed (atomically) as a journal of
+        this worker, so it's never claimed by two workers.
+        """
+        journals = []
+        if self.base.exists():
+            # written by a version without per-worker journals.
+            journals.append(self.base)
+        pattern = f"{self.base.stem}.*{self.base.suffix}"
+        for path in sorted(self.base.parent.glob(pattern)):
+            if path == self.path or path.name.endswith('.tmp'):
+                continue
+            owner = self._owner_of(path)
+            if owner is None:
+                continue
+            if owner != self.worker:
+                if self._is_alive(owner):
+                    continue
+                claimed = self._journal_of(f"{self.worker}.{uuid.uuid4().hex}")
+                try:
+                    os.rename(path, claimed)
+                except FileNotFoundError:
+                    continue  # claimed by another worker.
+                path = claimed
+            journals.append(path)
+        return journals
+
+    def _read_pending(self, path: Path) -> dict:
+        pending: dict = {}
+        if not path.exists():
+            return pending
+        with open(path, 'r', encoding='utf-8') as fp:
+            for line in fp:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json_decoder(line)
+                except Exception:  # pylint: disable=W0718
+                    # a partially written (last) record.
+                    self.logger.warning(
+                        f"Skipping corrupted record on {path}"
+                    )
+                    continue
+                if record.get('op') == 'add':
+                    pending[record['id']] = record
+                else:
+                    pending.pop(record.get('id'), None)
+        return pending
+
+    def _compact(self, pending: dict) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as fp:
+            for record in pending.values():
+                fp.write(json_encoder(record) + '\n')
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp, self.path)
+        self._written = len(pending)
+
+    def _recover(self) -> dict:
+        pending = self._read_pending(self.path)
+        claimed = self._claim_journals()
+        for path in claimed:
+            pending.update(self._read_pending(path))
+        # the claimed journals are merged on the journal of this worker:
+        self._compact(pending)
+        for path in claimed:
+            path.unlink(missing_ok=True)
+        return pending
+
+    async def recover(self) -> list[tuple[str, str]]:
+        async with self._lock:
+            self._close_file()
+            loop = asyncio.get_running_loop()
+            pending = await loop.run_in_executor(None, self._recover)
+        self._persisted.update(pending.keys())
+        return [
+            (task_id, record['payload']) for task_id, record in pending.items()
+        ]
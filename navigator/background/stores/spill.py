@@ -0,0 +1,110 @@
+"""
+Spill Store.
+
+FIFO file of serialized tasks, used for holding the overflow of a full queue
+on disk until there is room for them again.
+"""
+from typing import Union
+import os
+import asyncio
+import tempfile
+from pathlib import Path, PurePath
+from navconfig.logging import logging
+from ...libs.json import json_encoder, json_decoder
+
+
+class SpillStore:
+    """SpillStore.
+
+    Tasks are appended to the spill file (push) and read back in order
+    (pop), the file is removed once all the spilled tasks were read.
+
+    Args:
+        path: directory of the spill file (default: temporary directory).
+        name: name of the spill file.
+    """
+    def __init__(
+        self,
+        path: Union[str, PurePath, None] = None,
+        name: str = 'navigator_queue'
+    ):
+        self.logger = logging.getLogger('NAV.Queue.SpillStore')
+        directory = Path(path) if path else Path(tempfile.gettempdir())
+        self.path = directory.joinpath(f"{name}.{os.getpid()}.spill")
+        self._count: int = 0
+        self._writer = None
+        self._reader = None
+        self._lock = asyncio.Lock()
+
+    def __repr__(self):
+        return f"<SpillStore {self.path} pending={self._count}>"
+
+    def __len__(self) -> int:
+        return self._count
+
+    async def push(self, records: list[tuple[str, str]]) -> None:
+        """Append (task_id, payload) pairs to the spill file."""
+        if not records:
+            return
+        lines = [
+            json_encoder({"id": task_id, "payload": payload})
+            for task_id, payload in records
+        ]
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write, lines)
+            self._count += len(lines)
+
+    def _write(self, lines: list) -> None:
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = open(self.path, 'a', encoding='utf-8')
+        self._writer.write('\n'.join(lines) + '\n')
+        self._writer.flush()
+
+    async def pop(self, count: int) -> list[tuple[str, str]]:
+        """Read (and remove) up to `count` spilled tasks, in order."""
+        async with self._lock:
+            if self._count <= 0 or count <= 0:
+                return []
+            loop = asyncio.get_running_loop()
+            records = await loop.run_in_executor(None, self._read, count)
+            self._count -= len(records)
+            if self._count <= 0:
+                self._count = 0
+                await loop.run_in_executor(None, self._remove)
+            return records
+
+    def _read(self, count: int) -> list:
+        if self._reader is None:
+            self._reader = open(self.path, 'r', encoding='utf-8')
+        records = []
+        while len(records) < count:
+            line = self._reader.readline()
+            if not line:
+                break
+            try:
+                record = json_decoder(line)
+                records.append((record['id'], record['payload']))
+            except Exception:  # pylint: disable=W0718
+                self.logger.warning(
+                    f"Skipping corrupted record on {self.path}"
+                )
+        return records
+
+    def _remove(self) -> None:
+        for fp in (self._reader, self._writer):
+            if fp is not None:
+                fp.close()
+        self._reader = self._writer = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def close(self) -> None:
+        """Discard the spill file."""
+        async with self._lock:
+            self._count = 0
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._remove)
@@ -0,0 +1,58 @@
+"""
+Background Task.
+
+Calling blocking functions (or coroutines) in the background.
+"""
+from collections.abc import Awaitable, Callable
+import uuid
+import asyncio
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from .types import P
+from .pool import coroutine_in_thread
+from .wrapper import TaskWrapper
+
+
+class BackgroundTask:
+    """BackgroundTask.
+
+    Calling blocking functions in the background.
+    """
+    def __init__(
+        self,
+        fn: Callable[P, Awaitable],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> None:
+        self.fn = fn
+        self.id = kwargs.pop('id', uuid.uuid4())
+        self.in_thread = kwargs.pop('in_thread', False)
+        self.args = args
+        self.kwargs = kwargs
+
+    async def __call__(self):
+        return await self.fn(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        return f'<BackgroundTask {self.fn.__name__} with ID {self.id}>'
+
+    async def run(self):
+        # TODO: add Callback to task wrapper.
+        loop = asyncio.get_running_loop()
+        if isinstance(self.fn, TaskWrapper):
+            await self.fn()
+        elif isinstance(self.fn, partial):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                await loop.run_in_executor(executor, self.fn)
+        elif asyncio.iscoroutinefunction(self.fn):
+            coro = self.fn(*self.args, **self.kwargs)
+            if self.in_thread is True:
+                # returns the Future of the coroutine (can be awaited or ignored)
+                return coroutine_in_thread(coro)
+            else:
+                await coro
+        elif callable(self.fn):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                await loop.run_in_executor(
+                    executor, self.fn, *self.args, **self.kwargs
+                )
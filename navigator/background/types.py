@@ -0,0 +1,14 @@
+"""
+Common types for Background Task execution.
+"""
+import sys
+from typing import Any
+from collections.abc import Callable, Coroutine
+
+if sys.version_info >= (3, 10):  # pragma: no cover
+    from typing import ParamSpec
+else:  # pragma: no cover
+    from typing_extensions import ParamSpec  # noqa
+
+P = ParamSpec("P")
+coroutine = Callable[[int], Coroutine[Any, Any, str]]
@@ -0,0 +1,146 @@
+"""
+Task Wrapper for Background Task Execution.
+"""
+from typing import Union, Optional, Any
+from collections.abc import Awaitable, Callable
+import asyncio
+import random
+from concurrent.futures import Executor
+from navconfig.logging import logging
+from .types import coroutine
+from .pool import EventLoopPool, get_loop_pool
+from .process import run_in_process
+
+
+class TaskWrapper:
+    """TaskWrapper.
+
+    Task Wrapper for Background Task Execution.
+
+    Args:
+        fn: function or coroutine function to be executed.
+        jitter: random delay (in seconds) before execution and between retries.
+        timeout: max execution time (in seconds) when is running on a Queue.
+        max_retries: number of retries (on a Queue) if the task fails.
+        retry_delay: base delay (in seconds) of the exponential backoff.
+        lane: name of the Queue Lane (priority) for this task.
+        in_process: run the task in the Process Pool (for CPU-bound work),
+          function, arguments and result must be serializable by cloudpickle.
+        dedup_key: idempotency key, enqueuing a task while another one with
+          the same key is pending returns the pending one (coalesced).
+        debounce: delay (in seconds) before the task is enqueued, duplicates
+          enqueued in this window are coalesced into a single execution.
+        rate_class: task class for the Queue Rate Limits (ex: "hubspot").
+    """
+    def __init__(
+        self,
+        fn: Union[Callable, coroutine] = None,
+        *args,
+        jitter: float = 0.0,
+        timeout: Optional[float] = None,
+        max_retries: int = 0,
+        retry_delay: float = 1.0,
+        lane: Optional[str] = None,
+        in_process: bool = False,
+        dedup_key: Optional[str] = None,
+        debounce: Optional[float] = None,
+        rate_class: Optional[str] = None,
+        **kwargs
+    ):
+        self._callback_: Union[Callable, Awaitable] = kwargs.pop('callback', None)
+        self.args = args
+        self.kwargs = kwargs
+        self.fn = fn
+        self.jitter: float = jitter
+        self.timeout: Optional[float] = timeout
+        self.max_retries: int = max_retries
+        self.retry_delay: float = retry_delay
+        self.lane: Optional[str] = lane
+        self.in_process: bool = in_process
+        self.dedup_key: Optional[str] = dedup_key
+        self.debounce: Optional[float] = debounce
+        self.rate_class: Optional[str] = rate_class
+        self.logger = logging.getLogger('NAV.Queue.TaskWrapper')
+
+    @property
+    def name(self) -> str:
+        return getattr(self.fn, '__name__', repr(self.fn))
+
+    def __repr__(self):
+        return f"<TaskWrapper function={self.name}>"
+
+    def add_callback(self, callback: Union[Callable, Awaitable]):
+        """add_callback.
+
+        Description: Add a callback function to the TaskWrapper.
+
+        Args:
+        - callback (Union[Callable, Awaitable]):
+          Callback function to be called after the task is executed.
+        """
+        self._callback_ = callback
+
+    async def execute(
+        self,
+        executor: Optional[Executor] = None,
+        loop_pool: Optional[EventLoopPool] = None,
+        coro_in_threads: bool = True
+    ) -> Any:
+        """execute.
+
+        Run the wrapped function and return its result (exceptions are raised).
+        Coroutine functions are executed on the Event Loop Pool (loop_pool or
+        the shared one), or with asyncio.run on the executor when
+        coro_in_threads is False; blocking callables are executed on the
+        given executor (or in the Process Pool when in_process is True).
+        """
+        if self.jitter > 0:
+            # Random delay between 0 and jitter to avoid "thundering herd" problem
+            delay = random.uniform(0.1, self.jitter)
+            self.logger.debug(
+                f"executing {self.name} with Jitter: {delay} sec."
+            )
+            # Delay the execution by jitter seconds
+            await asyncio.sleep(delay)
+        if self.in_process is True:
+            return await run_in_process(self.fn, *self.args, **self.kwargs)
+        loop = asyncio.get_running_loop()
+        if asyncio.iscoroutinefunction(self.fn):
+            coro = self.fn(*self.args, **self.kwargs)
+            if coro_in_threads is True:
+                return await (loop_pool or get_loop_pool()).run(coro)
+            return await loop.run_in_executor(executor, asyncio.run, coro)
+        return await loop.run_in_executor(
+            executor,
+            self._call_sync
+        )
+
+    def _call_sync(self) -> Any:
+        return self.fn(*self.args, **self.kwargs)
+
+    async def run_callback(self, result: Any, executor: Optional[Executor] = None):
+        """Calling the callback function (if any) with the task result."""
+        if not callable(self._callback_):
+            return
+        if asyncio.iscoroutinefunction(self._callback_):
+            await self._callback_(result, *self.args, **self.kwargs)
+        else:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                executor,
+                lambda: self._callback_(result, *self.args, **self.kwargs)
+            )
+
+    async def __call__(self, executor: Optional[Executor] = None):
+        try:
+            result = await self.execute(executor)
+        except Exception as e:
+            self.logger.error(
+                f"Error executing TaskWrapper {self.name}: {e}"
+            )
+            result = {
+                "status": "failed",
+                "error": e
+            }
+        await self.run_callback(result, executor)
+        return result
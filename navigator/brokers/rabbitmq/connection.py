@@ -2,7 +2,7 @@
 RabbitMQ interface (connection and disconnections).
 """
 from typing import Optional, Union, Any
-from collections.abc import Callable, Awaitable
+from collections.abc import Callable, Awaitable, Hashable
 import asyncio
 from dataclasses import is_dataclass
 import aiormq
@@ -10,13 +10,28 @@ from aiormq.abc import AbstractConnection, AbstractChannel
 from datamodel import BaseModel
 from navigator.libs.json import json_encoder, json_decoder
 from navigator.exceptions import ValidationError
-from ...conf import rabbitmq_dsn
+from ...conf import (
+    rabbitmq_dsn,
+    RABBITMQ_PUBLISH_CHANNELS,
+    RABBITMQ_CONSUME_CHANNELS,
+    RABBITMQ_RETRY_DELAY,
+    RABBITMQ_RETRY_MAX_DELAY
+)
 from ..wrapper import BaseWrapper
 from ..connection import BaseConnection
+from .window import DeliveryWindow
+from .retry import RetryTopology
+from .pool import ChannelPool
 
 class RabbitMQConnection(BaseConnection):
     """
     Manages connection and disconnection of RabbitMQ Service.
+
+    Publishing and consuming use separated pools of channels (sizes:
+    publish_channels and consume_channels, by default RABBITMQ_PUBLISH_CHANNELS
+    and RABBITMQ_CONSUME_CHANNELS), so a slow consumer never blocks a publish.
+    Exchanges and queues are declared on a channel of their own: the broker
+    closes the channel of a failed declaration, never a consumer channel.
     """
     def __init__(
         self,
@@ -24,14 +39,34 @@ class RabbitMQConnection(BaseConnection):
         timeout: Optional[int] = 5,
         **kwargs
     ):
+        publish_channels = kwargs.pop('publish_channels', RABBITMQ_PUBLISH_CHANNELS)
+        consume_channels = kwargs.pop('consume_channels', RABBITMQ_CONSUME_CHANNELS)
         self._dsn = credentials if credentials is not None else rabbitmq_dsn
         print('DSN > ', rabbitmq_dsn)
         super().__init__(credentials=credentials, timeout=timeout, **kwargs)
         self._connection: Optional[AbstractConnection] = None
-        self._channel: Optional[AbstractChannel] = None
+        self._publish_channels = ChannelPool('publish', size=publish_channels)
+        self._consume_channels = ChannelPool('consume', size=consume_channels)
+        self._declare_channels = ChannelPool(
+            'declare', size=1, publisher_confirms=False
+        )
+        # exchanges already declared (by this connection):
+        self._exchanges: set = set()
 
     def get_channel(self) -> Optional[AbstractChannel]:
-        return self._channel
+        """Channel for declarations (None if it's not opened)."""
+        return self._declare_channels.channel(0)
+
+    async def declare_channel(self) -> AbstractChannel:
+        """Channel for declarations (re-opened if it was closed)."""
+        return await self._declare_channels.acquire()
+
+    async def publish_channel(
+        self,
+        key: Optional[Hashable] = None
+    ) -> AbstractChannel:
+        """Next channel of the publishing pool (pinned to key, if any)."""
+        return await self._publish_channels.acquire(key)
 
     async def connect(self) -> None:
         """
@@ -49,7 +84,9 @@ class RabbitMQConnection(BaseConnection):
                     timeout=self._timeout
                 )
                 self.reconnect_attempts = 0
-                self._channel = await self._connection.channel()
+                await self._publish_channels.open(self._connection)
+                await self._consume_channels.open(self._connection)
+                await self._declare_channels.open(self._connection)
                 if not self._monitor_task or self._monitor_task.done():
                     await self._start_connection_monitor()
         except asyncio.TimeoutError:
@@ -108,14 +145,10 @@ class RabbitMQConnection(BaseConnection):
         """
         Disconnect from RabbitMQ.
         """
-        if self._channel is not None:
-            try:
-                await self._channel.close()
-                self._channel = None
-            except Exception as err:
-                self.logger.warning(
-                    f"Error while closing channel: {err}"
-                )
+        await self._publish_channels.close()
+        await self._consume_channels.close()
+        await self._declare_channels.close()
+        self._exchanges.clear()
         if self._connection is not None:
             try:
                 await self._connection.close()
@@ -151,19 +184,22 @@ class RabbitMQConnection(BaseConnection):
 
         Methods to create and ensure the existence of exchanges.
         """
-        if not self._channel:
+        try:
+            channel = await self.declare_channel()
+        except RuntimeError:
             self.logger.error(
                 "RabbitMQ channel is not established."
             )
             return
 
         try:
-            await self._channel.exchange_declare(
+            await channel.exchange_declare(
                 exchange=exchange_name,
                 exchange_type=exchange_type,
                 durable=durable,
                 arguments=kwargs
             )
+            self._exchanges.add(exchange_name)
             self.logger.info(
                 f"Exchange '{exchange_name}' declared successfully."
             )
@@ -181,6 +217,8 @@ class RabbitMQConnection(BaseConnection):
         """
         Ensure that the specified exchange exists in RabbitMQ.
         """
+        if exchange_name in self._exchanges:
+            return
         await self.create_exchange(exchange_name, exchange_type, **kwargs)
 
     async def publish_message(
@@ -196,13 +234,39 @@ class RabbitMQConnection(BaseConnection):
         await self.ensure_connection()
         # Ensure the exchange exists before publishing
         await self.ensure_exchange(queue_name)
-        headers = kwargs.get('headers', {})
-        headers.setdefault('x-retry', '0')
+        body, properties = self.prepare_message(
+            body, headers=kwargs.pop('headers', None)
+        )
         args = {
             "mandatory": True,
             "timeout": None,
             **kwargs
         }
+        try:
+            # same channel for a routing key: its messages keep their order.
+            channel = await self.publish_channel((queue_name, routing_key))
+            await channel.basic_publish(
+                body,
+                exchange=queue_name,
+                routing_key=routing_key,
+                properties=properties,
+                **args
+            )
+        except Exception as exc:
+            self.logger.error(
+                f"Failed to publish message: {exc}"
+            )
+
+    def prepare_message(
+        self,
+        body: Union[str, list, dict, Any],
+        headers: Optional[dict] = None
+    ) -> tuple[bytes, aiormq.spec.Basic.Properties]:
+        """
+        Serialize the body of a message, returns the body and its properties.
+        """
+        headers = dict(headers or {})
+        headers.setdefault('x-retry', '0')
         properties_kwargs = {
             'headers': headers,
             'delivery_mode': 2  # Persistent messages
@@ -220,20 +284,10 @@ class RabbitMQConnection(BaseConnection):
             # Handle other types if necessary
             body = str(body)
             properties_kwargs['content_type'] = 'text/plain'
-        try:
-            await self._channel.basic_publish(
-                body.encode('utf-8'),
-                exchange=queue_name,
-                routing_key=routing_key,
-                properties=aiormq.spec.Basic.Properties(
-                    **properties_kwargs
-                ),
-                **args
-            )
-        except Exception as exc:
-            self.logger.error(
-                f"Failed to publish message: {exc}"
-            )
+        return (
+            body.encode('utf-8'),
+            aiormq.spec.Basic.Properties(**properties_kwargs)
+        )
 
     async def process_message(
         self,
@@ -280,13 +334,28 @@ class RabbitMQConnection(BaseConnection):
         self,
         callback: Callable[[aiormq.abc.DeliveredMessage, str], Awaitable[None]],
         requeue_on_fail: bool = False,
-        max_retries: int = 3
+        max_retries: int = 3,
+        window: Optional[DeliveryWindow] = None,
+        retry: Optional[RetryTopology] = None
     ) -> Callable:
         """
         Wrap the user-provided callback to handle message decoding and
         acknowledgment.
+
+        With a DeliveryWindow the messages are processed concurrently and
+        acknowledged in batches. With a RetryTopology failed messages are
+        retried after a delay (up to max_retries times), then dead-lettered;
+        without it failed messages are rejected.
         """
         async def wrapped_callback(message: aiormq.abc.DeliveredMessage):
+            if window is not None:
+                window.track(message.delivery_tag)
+                async with window.slot(message.delivery.routing_key):
+                    await process(message)
+            else:
+                await process(message)
+
+        async def process(message: aiormq.abc.DeliveredMessage):
             try:
                 properties = message.header.properties or aiormq.spec.Basic.Properties()
                 body = await self.process_message(message.body, properties)
@@ -295,7 +364,10 @@ class RabbitMQConnection(BaseConnection):
                 else:
                     callback(message, body)
                 # Acknowledge the message to indicate it has been processed
-                await self._channel.basic_ack(message.delivery_tag)
+                if window is not None:
+                    await window.ack(message.delivery_tag)
+                    return
+                await message.channel.basic_ack(message.delivery_tag)
                 self.logger.debug(
                     f"Message acknowledged: {message.delivery_tag}"
                 )
@@ -303,78 +375,169 @@ class RabbitMQConnection(BaseConnection):
                 self.logger.warning(
                     f"Error processing message: {e}"
                 )
-                # Get retry count from message properties headers
-                properties = message.header.properties or aiormq.spec.Basic.Properties()
-                headers = dict(properties.headers or {})
-                retry_count = headers.get('x-retry', 0)
-                # Ensure retry_count is an integer
-                if isinstance(retry_count, bytes):
-                    retry_count = int(retry_count.decode())
-                elif isinstance(retry_count, str):
-                    retry_count = int(retry_count)
-                else:
-                    retry_count = int(retry_count)
-                retry_count += 1
-                if retry_count <= max_retries:
-                    self.logger.info(
-                        f"Retrying message {message.delivery_tag}, attempt {retry_count}/{max_retries}"
-                    )
-                    # Optionally, reject the message and requeue it
-                    await self._channel.basic_nack(message.delivery_tag, requeue=False)
-                    # Republish the message with incremented retry count
-                    new_headers = headers.copy()
-                    new_headers['x-retry'] = str(retry_count)
-                    new_properties = aiormq.spec.Basic.Properties(
-                        content_type=properties.content_type,
-                        content_encoding=properties.content_encoding,
-                        headers=new_headers,
-                        delivery_mode=properties.delivery_mode,
-                        priority=properties.priority,
-                        correlation_id=properties.correlation_id,
-                        reply_to=properties.reply_to,
-                        expiration=properties.expiration,
-                        message_id=properties.message_id,
-                        timestamp=properties.timestamp,
-                        message_type=properties.message_type,
-                        user_id=properties.user_id,
-                        app_id=properties.app_id,
-                    )
-                    await self._channel.basic_publish(
-                        exchange=message.delivery.exchange,
-                        routing_key=message.delivery.routing_key,
-                        body=message.body,
-                        properties=new_properties
-                    )
-                else:
-                    self.logger.error(
-                        f"Max retries exceeded for message {message.delivery_tag}. Discarding message."
-                    )
-                    # Reject the message without requeueing
-                    await self._channel.basic_nack(message.delivery_tag, requeue=False)
+                await self._retry(message, e, max_retries, window, retry)
         return wrapped_callback
 
+    async def _ack(
+        self,
+        message: aiormq.abc.DeliveredMessage,
+        window: Optional[DeliveryWindow] = None
+    ) -> None:
+        if window is not None:
+            await window.ack(message.delivery_tag)
+        else:
+            await message.channel.basic_ack(message.delivery_tag)
+
+    async def _nack(
+        self,
+        message: aiormq.abc.DeliveredMessage,
+        window: Optional[DeliveryWindow] = None
+    ) -> None:
+        if window is not None:
+            await window.nack(message.delivery_tag, requeue=False)
+        else:
+            await message.channel.basic_nack(message.delivery_tag, requeue=False)
+
+    async def _retry(
+        self,
+        message: aiormq.abc.DeliveredMessage,
+        error: Exception,
+        max_retries: int,
+        window: Optional[DeliveryWindow] = None,
+        retry: Optional[RetryTopology] = None
+    ) -> None:
+        """Send a failed message to its delay queue (or to the DLQ)."""
+        if retry is None:
+            # Reject the message without requeueing
+            await self._nack(message, window)
+            return
+        # Get retry count from message properties headers
+        properties = message.header.properties or aiormq.spec.Basic.Properties()
+        retry_count = dict(properties.headers or {}).get('x-retry', 0)
+        if isinstance(retry_count, bytes):
+            retry_count = retry_count.decode()
+        retry_count = int(retry_count) + 1
+        try:
+            if retry_count <= min(max_retries, retry.max_retries):
+                self.logger.info(
+                    f"Retrying message {message.delivery_tag} in "
+                    f"{retry.delay_of(retry_count)} seconds, "
+                    f"attempt {retry_count}/{max_retries}"
+                )
+                await retry.retry(
+                    await self.publish_channel(), message, retry_count
+                )
+            else:
+                self.logger.error(
+                    f"Max retries exceeded for message {message.delivery_tag}. "
+                    f"Moving message to {retry.dead_letter_queue}."
+                )
+                await retry.dead_letter(
+                    await self.publish_channel(), message, error
+                )
+        except Exception as exc:  # pylint: disable=W0718
+            # not confirmed: the message is requeued by the broker.
+            self.logger.error(
+                f"Error retrying message {message.delivery_tag}: {exc}"
+            )
+            if window is not None:
+                await window.nack(message.delivery_tag, requeue=True)
+            else:
+                await message.channel.basic_nack(message.delivery_tag, requeue=True)
+            return
+        # confirmed copy on the delay (or dead-letter) queue:
+        await self._ack(message, window)
+
+    async def retry_topology(
+        self,
+        queue_name: str,
+        max_retries: int = 3,
+        delay: Optional[float] = None
+    ) -> RetryTopology:
+        """Declare the delay queues and dead-letter queue of a queue."""
+        topology = RetryTopology(
+            queue_name,
+            max_retries=max_retries,
+            delay=delay if delay is not None else RABBITMQ_RETRY_DELAY,
+            max_delay=RABBITMQ_RETRY_MAX_DELAY
+        )
+        await topology.declare(await self.declare_channel())
+        return topology
+
+    def delivery_window(
+        self,
+        channel: AbstractChannel,
+        concurrency: Optional[int] = None,
+        ordered: bool = False,
+        ack_batch: Optional[int] = None
+    ) -> Optional[DeliveryWindow]:
+        """Returns a DeliveryWindow for concurrent consumers (None: serial)."""
+        if not concurrency or concurrency <= 1:
+            return None
+        return DeliveryWindow(
+            channel,
+            concurrency=concurrency,
+            ack_batch=ack_batch,
+            ordered=ordered
+        )
+
     async def consume_messages(
         self,
         queue_name: str,
         callback: Callable[[aiormq.abc.DeliveredMessage, str], Awaitable[None]],
-        prefetch_count: int = 1
+        prefetch_count: int = 1,
+        concurrency: Optional[int] = None,
+        ordered: bool = False,
+        ack_batch: Optional[int] = None,
+        max_retries: int = 3,
+        retry_delay: Optional[float] = None
     ) -> None:
         """
         Consume messages from a queue.
+
+        Args:
+            queue_name: name of the queue.
+            callback: called with every message and its decoded body.
+            prefetch_count: max number of unacknowledged messages.
+            concurrency: number of messages processed at once (the
+              prefetch is raised to the in-flight window).
+            ordered: messages with the same routing key are processed in
+              order (when concurrency > 1).
+            ack_batch: max number of processed messages acknowledged at once.
+            max_retries: delayed retries of a failed message before moving
+              it to the dead-letter queue (see RetryTopology).
+            retry_delay: delay (in seconds) of the first retry
+              (default: RABBITMQ_RETRY_DELAY).
         """
         await self.ensure_connection()
         try:
             # Ensure the queue exists
-            await self._channel.queue_declare(queue=queue_name, durable=True)
+            channel = await self.declare_channel()
+            await channel.queue_declare(queue=queue_name, durable=True)
+            retry = await self.retry_topology(queue_name, max_retries, retry_delay)
 
-            # Set QoS (Quality of Service) settings
-            await self._channel.basic_qos(prefetch_count=prefetch_count)
+            async def setup(channel: AbstractChannel) -> None:
+                window = self.delivery_window(
+                    channel, concurrency, ordered, ack_batch
+                )
+                prefetch = prefetch_count
+                if window is not None:
+                    prefetch = max(prefetch, window.prefetch_count)
+                # Set QoS (Quality of Service) settings
+                await channel.basic_qos(prefetch_count=prefetch)
+                # Start consuming messages from the queue
+                await channel.basic_consume(
+                    queue=queue_name,
+                    consumer_callback=self.wrap_callback(
+                        callback,
+                        max_retries=max_retries,
+                        window=window,
+                        retry=retry
+                    ),
+                )
 
-            # Start consuming messages from the queue
-            await self._channel.basic_consume(
-                queue=queue_name,
-                consumer_callback=self.wrap_callback(callback),
-            )
+            # on a channel of its own (restored if the channel is closed):
+            await self._consume_channels.reserve(setup)
             self.logger.info(
                 f"Started consuming messages from queue '{queue_name}'."
             )
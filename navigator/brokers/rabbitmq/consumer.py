@@ -7,8 +7,14 @@ from typing import Union, Optional
 from collections.abc import Callable, Awaitable
 from aiohttp import web
 import aiormq
+from aiormq.abc import AbstractChannel
 from navconfig.logging import logging
+from ...conf import (
+    RABBITMQ_CONSUMER_CONCURRENCY,
+    RABBITMQ_CONSUMER_ORDERED
+)
 from .connection import RabbitMQConnection
+from .window import DeliveryWindow
 from ..consumer import BrokerConsumer
 
 
@@ -21,6 +27,13 @@ class RMQConsumer(RabbitMQConnection, BrokerConsumer):
     RMQConsumer.
 
     Broker Client (Consumer) using RabbitMQ.
+
+    Args:
+        concurrency: number of messages processed at once
+          (default: RABBITMQ_CONSUMER_CONCURRENCY, 1: one by one).
+        ordered: messages with the same routing key are processed in order
+          (default: RABBITMQ_CONSUMER_ORDERED).
+        ack_batch: max number of processed messages acknowledged at once.
     """
     _name_: str = "rabbitmq_consumer"
 
@@ -37,6 +50,13 @@ class RMQConsumer(RabbitMQConnection, BrokerConsumer):
         self._queue_name = kwargs.get('queue_name', None)
         if self._queue_name:
             self._exchange_name = self._queue_name
+        self._concurrency: int = kwargs.pop(
+            'concurrency', RABBITMQ_CONSUMER_CONCURRENCY
+        )
+        self._ordered: bool = kwargs.pop('ordered', RABBITMQ_CONSUMER_ORDERED)
+        self._ack_batch: Optional[int] = kwargs.pop('ack_batch', None)
+        # delivery windows of the subscriptions (one per consumer channel):
+        self._windows: list[DeliveryWindow] = []
         super().__init__(
             credentials=credentials,
             timeout=timeout,
@@ -86,37 +106,69 @@ class RMQConsumer(RabbitMQConnection, BrokerConsumer):
         prefetch_count: int = 1,
         requeue_on_fail: bool = True,
         max_retries: int = 3,
+        concurrency: Optional[int] = None,
+        ordered: bool = False,
+        ack_batch: Optional[int] = None,
+        retry_delay: Optional[float] = None,
         **kwargs
     ) -> None:
         """
         Subscribe to events from a specific exchange with a given routing key.
+
+        With concurrency > 1 up to `concurrency` messages are processed at
+        once and acknowledged in batches (see DeliveryWindow).
+
+        Failed messages are retried after an exponential delay (starting at
+        retry_delay seconds) up to max_retries times, then moved to the
+        dead-letter queue "{queue_name}.dlq" (see RetryTopology).
         """
         # Declare the queue
         await self.ensure_connection()
         try:
             await self.ensure_exchange(exchange_name=exchange, exchange_type=exchange_type)
-            await self._channel.queue_declare(queue=queue_name, durable=durable)
+            channel = await self.declare_channel()
+            await channel.queue_declare(queue=queue_name, durable=durable)
 
             # Bind the queue to the exchange
-            await self._channel.queue_bind(
+            await channel.queue_bind(
                 queue=queue_name,
                 exchange=exchange,
                 routing_key=routing_key
             )
 
-            # Set QoS (Quality of Service) settings
-            await self._channel.basic_qos(prefetch_count=prefetch_count)
+            retry = await self.retry_topology(queue_name, max_retries, retry_delay)
 
-            # Start consuming messages from the queue
-            await self._channel.basic_consume(
-                queue=queue_name,
-                consumer_callback=self.wrap_callback(
-                    callback,
-                    requeue_on_fail=requeue_on_fail,
-                    max_retries=max_retries
-                ),
-                **kwargs
-            )
+            async def setup(channel: AbstractChannel) -> None:
+                # a new window for every channel (delivery tags are per channel)
+                window = self.delivery_window(
+                    channel, concurrency, ordered, ack_batch
+                )
+                prefetch = prefetch_count
+                if window is not None:
+                    prefetch = max(prefetch, window.prefetch_count)
+                    # windows of closed (re-opened) channels are discarded:
+                    self._windows = [
+                        w for w in self._windows if not w.channel.is_closed
+                    ]
+                    self._windows.append(window)
+                # Set QoS (Quality of Service) settings
+                await channel.basic_qos(prefetch_count=prefetch)
+
+                # Start consuming messages from the queue
+                await channel.basic_consume(
+                    queue=queue_name,
+                    consumer_callback=self.wrap_callback(
+                        callback,
+                        requeue_on_fail=requeue_on_fail,
+                        max_retries=max_retries,
+                        window=window,
+                        retry=retry
+                    ),
+                    **kwargs
+                )
+
+            # restored on a new channel if the channel is closed:
+            await self._consume_channels.reserve(setup)
             self.logger.info(
                 f"Subscribed to queue '{queue_name}' on exchange '{exchange}' with routing '{routing_key}'."
             )
@@ -139,4 +191,17 @@ class RMQConsumer(RabbitMQConnection, BrokerConsumer):
             durable=True,
             prefetch_count=1,
             requeue_on_fail=True,
+            concurrency=self._concurrency,
+            ordered=self._ordered,
+            ack_batch=self._ack_batch
         )
+
+    async def stop(self, app: web.Application) -> None:
+        """Signal Function to be called when the application is stopped.
+
+        Acknowledge the processed messages and disconnect.
+        """
+        windows, self._windows = self._windows, []
+        for window in windows:
+            await window.close()
+        await super().stop(app)
@@ -0,0 +1,185 @@
+"""
+RabbitMQ Publish Pipeline.
+
+Pipelined publishing with publisher confirms: many messages are in flight
+at once, and every message has a future resolved by its confirmation.
+"""
+from typing import Any, Optional
+import asyncio
+from collections import deque
+from navconfig.logging import logging
+
+
+class PublishPipeline:
+    """PublishPipeline.
+
+    Messages are buffered and written in batches (every `batch_size`
+    messages or every `flush_interval` seconds) without waiting for the
+    confirmation of the previous ones; up to `max_in_flight` messages can
+    be unconfirmed, then publish() waits for a slot (backpressure).
+
+    The future of a message is resolved with the confirmation frame
+    (Basic.Ack), or fails with the error (nack, returned message, closed
+    channel).
+
+    Args:
+        connection: the RabbitMQConnection (channel opened with confirms).
+        max_in_flight: max number of unconfirmed messages.
+        batch_size: max number of messages written at once.
+        flush_interval: max time (in seconds) a message waits in the buffer.
+    """
+    def __init__(
+        self,
+        connection: Any,
+        max_in_flight: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 0.005
+    ):
+        self.connection = connection
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger('RabbitMQ.Pipeline')
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._buffer: deque = deque()
+        self._ready = asyncio.Event()
+        self._full = asyncio.Event()
+        self._sends: set = set()
+        self._runner: Optional[asyncio.Task] = None
+        self.published: int = 0
+        self.confirmed: int = 0
+        self.failed: int = 0
+
+    def __repr__(self):
+        return (
+            f"<PublishPipeline in_flight={self.in_flight} "
+            f"buffered={len(self._buffer)}>"
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self.published - self.confirmed - self.failed
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buffer),
+            "in_flight": self.in_flight,
+            "published": self.published,
+            "confirmed": self.confirmed,
+            "failed": self.failed
+        }
+
+    async def publish(
+        self,
+        body: Any,
+        exchange: str,
+        routing_key: str,
+        headers: Optional[dict] = None,
+        **kwargs
+    ) -> asyncio.Future:
+        """Buffer a message, returns the future of its confirmation."""
+        await self.connection.ensure_connection()
+        await self.connection.ensure_exchange(exchange)
+        body, properties = self.connection.prepare_message(body, headers=headers)
+        await self._slots.acquire()
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append(
+            (future, body, exchange, routing_key, properties, kwargs)
+        )
+        self.published += 1
+        self._ready.set()
+        if len(self._buffer) >= self.batch_size:
+            self._full.set()
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+        return future
+
+    async def _run(self) -> None:
+        while True:
+            if not self._buffer:
+                self._ready.clear()
+                await self._ready.wait()
+            if len(self._buffer) < self.batch_size:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._full.wait(), self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            self._write()
+
+    def _write(self) -> None:
+        """Write a batch (the confirmations are awaited by each send)."""
+        count = min(len(self._buffer), self.batch_size)
+        for _ in range(count):
+            send = asyncio.create_task(self._send(*self._buffer.popleft()))
+            self._sends.add(send)
+            send.add_done_callback(self._sends.discard)
+
+    async def _send(
+        self,
+        future: asyncio.Future,
+        body: bytes,
+        exchange: str,
+        routing_key: str,
+        properties: Any,
+        kwargs: dict
+    ) -> None:
+        try:
+            # same channel for a routing key: its messages keep their order.
+            channel = await self.connection.publish_channel(
+                (exchange, routing_key)
+            )
+            confirmation = await channel.basic_publish(
+                body,
+                exchange=exchange,
+                routing_key=routing_key,
+                properties=properties,
+                **{"mandatory": True, "timeout": None, **kwargs}
+            )
+            self.confirmed += 1
+            if not future.done():
+                future.set_result(confirmation)
+        except asyncio.CancelledError:
+            self.failed += 1
+            if not future.done():
+                future.cancel()
+            raise
+        except Exception as exc:  # pylint: disable=W0718
+            self.failed += 1
+            if not future.done():
+                future.set_exception(exc)
+        finally:
+            self._slots.release()
+
+    async def flush(self) -> None:
+        """Write the buffered messages and wait for all the confirmations."""
+        while self._buffer:
+            self._write()
+        if self._sends:
+            await asyncio.gather(*self._sends, return_exceptions=True)
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Flush (up to timeout seconds) and stop the pipeline."""
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                f"Closing Publish Pipeline with {self.in_flight} unconfirmed "
+                "messages."
+            )
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        while self._buffer:
+            future, *_ = self._buffer.popleft()
+            self.failed += 1
+            future.cancel()
+            self._slots.release()
+        for send in list(self._sends):
+            send.cancel()
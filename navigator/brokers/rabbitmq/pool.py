@@ -0,0 +1,191 @@
+"""
+RabbitMQ Channel Pool.
+
+Pools of channels of a connection (ex: one for publishing and another one
+for consuming), recovered automatically when a channel is closed.
+"""
+from typing import Optional
+from collections.abc import Callable, Awaitable, Hashable
+import asyncio
+from aiormq.abc import AbstractConnection, AbstractChannel
+from navconfig.logging import logging
+
+
+class ChannelPool:
+    """ChannelPool.
+
+    `size` channels of a connection, handed out in round-robin (or pinned
+    by a key, ex: the messages of a routing key keep their order). When the
+    broker closes a channel (ex: a failed declaration) the channel is
+    re-opened in background (with exponential backoff) and the setups
+    reserved on it (ex: a consumer) are executed again on the new channel.
+
+    When the connection is lost the channels are re-opened (with their
+    setups) by the next open(), after reconnecting.
+
+    Args:
+        name: name of the pool (for logging).
+        size: number of channels.
+        publisher_confirms: open the channels in confirm mode.
+        recovery_delay: seconds before re-opening a closed channel.
+    """
+    def __init__(
+        self,
+        name: str,
+        size: int = 1,
+        publisher_confirms: bool = True,
+        recovery_delay: float = 1.0
+    ):
+        if size < 1:
+            raise ValueError(f"Invalid size of Channel Pool {name}: {size}")
+        self.name = name
+        self.size = size
+        self.publisher_confirms = publisher_confirms
+        self.recovery_delay = recovery_delay
+        self.logger = logging.getLogger('RabbitMQ.Channels')
+        self._connection: Optional[AbstractConnection] = None
+        self._channels: list[Optional[AbstractChannel]] = [None] * size
+        # setups (ex: consumers) executed again when a channel is re-opened:
+        self._setups: list[list] = [[] for _ in range(size)]
+        self._recovering: dict[int, asyncio.Task] = {}
+        self._next: int = 0
+        self._closed: bool = True
+        self.recovered: int = 0
+
+    def __repr__(self):
+        return f"<ChannelPool {self.name} size={self.size}>"
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "open": sum(
+                1 for ch in self._channels if ch is not None and not ch.is_closed
+            ),
+            "recovering": len(self._recovering),
+            "recovered": self.recovered
+        }
+
+    def channel(self, index: int = 0) -> Optional[AbstractChannel]:
+        """Current channel of a slot of the pool."""
+        return self._channels[index]
+
+    async def open(self, connection: AbstractConnection) -> None:
+        """Open the channels (and execute again their setups)."""
+        self._connection = connection
+        self._closed = False
+        for index in range(self.size):
+            await self._open(index)
+
+    async def _open(self, index: int) -> AbstractChannel:
+        channel = await self._connection.channel(
+            publisher_confirms=self.publisher_confirms
+        )
+        self._channels[index] = channel
+        channel.closing.add_done_callback(
+            lambda _, index=index, channel=channel: self._channel_closed(
+                index, channel
+            )
+        )
+        for setup in self._setups[index]:
+            try:
+                await setup(channel)
+            except Exception as exc:  # pylint: disable=W0718
+                self.logger.error(
+                    f"Error restoring channel {self.name}[{index}]: {exc}"
+                )
+        return channel
+
+    def _channel_closed(self, index: int, channel: AbstractChannel) -> None:
+        if self._closed or self._channels[index] is not channel:
+            return
+        if self._connection is None or self._connection.is_closed:
+            # re-opened by open(), once the connection is recovered.
+            return
+        if index not in self._recovering:
+            self._recovering[index] = asyncio.create_task(self._recover(index))
+
+    async def _recover(self, index: int) -> None:
+        delay = self.recovery_delay
+        try:
+            while not self._closed:
+                await asyncio.sleep(delay)
+                if self._connection is None or self._connection.is_closed:
+                    return
+                try:
+                    await self._open(index)
+                    self.recovered += 1
+                    self.logger.warning(
+                        f"Channel {self.name}[{index}] was closed, re-opened."
+                    )
+                    return
+                except Exception as exc:  # pylint: disable=W0718
+                    self.logger.error(
+                        f"Error re-opening channel {self.name}[{index}]: {exc}"
+                    )
+                    delay = min(delay * 2, 30.0)
+        finally:
+            self._recovering.pop(index, None)
+
+    async def acquire(self, key: Optional[Hashable] = None) -> AbstractChannel:
+        """Returns the next open channel (round-robin).
+
+        With a key, always the same channel for the same key (re-opened if
+        it was closed): messages published on one channel keep their order.
+        """
+        if key is not None:
+            index = hash(key) % self.size
+            channel = self._channels[index]
+            if channel is not None and not channel.is_closed:
+                return channel
+            if self._closed or self._connection is None:
+                raise RuntimeError(f"Channel Pool {self.name} is closed.")
+            task = self._recovering.pop(index, None)
+            if task is not None:
+                task.cancel()
+            return await self._open(index)
+        for _ in range(self.size):
+            index = self._next
+            self._next = (self._next + 1) % self.size
+            channel = self._channels[index]
+            if channel is not None and not channel.is_closed:
+                return channel
+        if self._closed or self._connection is None:
+            raise RuntimeError(f"Channel Pool {self.name} is closed.")
+        # no open channel: re-opening one right now.
+        task = self._recovering.pop(index, None)
+        if task is not None:
+            task.cancel()
+        return await self._open(index)
+
+    async def reserve(
+        self,
+        setup: Callable[[AbstractChannel], Awaitable[None]]
+    ) -> AbstractChannel:
+        """Execute a setup (ex: basic_consume) on the least used channel.
+
+        The setup is executed again every time the channel is re-opened.
+        """
+        index = min(range(self.size), key=lambda idx: len(self._setups[idx]))
+        channel = self._channels[index]
+        if channel is None or channel.is_closed:
+            channel = await self._open(index)
+        await setup(channel)
+        self._setups[index].append(setup)
+        return channel
+
+    async def close(self) -> None:
+        """Close the channels (and forget their setups)."""
+        self._closed = True
+        for task in list(self._recovering.values()):
+            task.cancel()
+        self._recovering.clear()
+        for index, channel in enumerate(self._channels):
+            self._channels[index] = None
+            self._setups[index] = []
+            if channel is not None and not channel.is_closed:
+                try:
+                    await channel.close()
+                except Exception as exc:  # pylint: disable=W0718
+                    self.logger.warning(
+                        f"Error while closing channel {self.name}[{index}]: {exc}"
+                    )
@@ -3,9 +3,13 @@ RabbitMQ Producer Module.
 
 can be used to send messages to RabbitMQ.
 """
-from typing import Union, Optional
+from typing import Union, Optional, Any
+import asyncio
+from aiohttp import web
 from navconfig.logging import logging
+from ...conf import RABBITMQ_MAX_IN_FLIGHT, RABBITMQ_PUBLISH_BATCH
 from .connection import RabbitMQConnection
+from .pipeline import PublishPipeline
 from ..producer import BrokerProducer
 
 
@@ -22,6 +26,10 @@ class RMQProducer(BrokerProducer, RabbitMQConnection):
         queue_size: Size of Asyncio Queue for enqueuing messages before send.
         num_workers: Number of workers to process the queue.
         timeout: Timeout for RabbitMQ Connection.
+        max_in_flight: max number of unconfirmed messages (publisher confirms)
+          of the publish pipeline (default: RABBITMQ_MAX_IN_FLIGHT).
+        publish_batch: max number of messages written at once
+          (default: RABBITMQ_PUBLISH_BATCH).
     """
     _name_: str = "rabbitmq_producer"
 
@@ -33,6 +41,11 @@ class RMQProducer(BrokerProducer, RabbitMQConnection):
         timeout: Optional[int] = 5,
         **kwargs
     ):
+        self.pipeline = PublishPipeline(
+            self,
+            max_in_flight=kwargs.pop('max_in_flight', RABBITMQ_MAX_IN_FLIGHT),
+            batch_size=kwargs.pop('publish_batch', RABBITMQ_PUBLISH_BATCH)
+        )
         super(RMQProducer, self).__init__(
             credentials=credentials,
             queue_size=queue_size,
@@ -40,3 +53,122 @@ class RMQProducer(BrokerProducer, RabbitMQConnection):
             timeout=timeout,
             **kwargs
         )
+
+    async def publish(
+        self,
+        body: Any,
+        queue_name: str,
+        routing_key: str,
+        **kwargs
+    ) -> asyncio.Future:
+        """
+        Pipelined publish: returns (without waiting for the broker) a future
+        resolved when the message is confirmed, ex:
+
+            futures = [await producer.publish(e, 'events', 'key') for e in events]
+            await asyncio.gather(*futures)
+        """
+        return await self.pipeline.publish(
+            body, queue_name, routing_key, **kwargs
+        )
+
+    async def stop(self, app: web.Application) -> None:
+        # the queued events are published (and confirmed) before closing.
+        await self.event_queue.join()
+        await self.pipeline.close()
+        await super(RMQProducer, self).stop(app)
+
+    async def _event_broker(self, worker_id: int):
+        """
+        Event publisher (pipelined).
+
+        Events are handed to the publish pipeline without waiting for the
+        broker, an event is done when it's confirmed; failed events (not
+        published or not confirmed) are re-queued (with exponential backoff)
+        up to max_retries times.
+        """
+        while True:
+            event = await self.event_queue.get()
+            try:
+                routing = event.pop('routing_key')
+                queue_name = event.pop('queue_name')
+                body = event.pop('body')
+            except KeyError as e:
+                self.logger.error(
+                    f"Worker {worker_id} got an invalid event, missing {e}"
+                )
+                self.event_queue.task_done()
+                continue
+            # the other keys of the event are options of the publish:
+            options = {
+                key: value for key, value in event.items()
+                if key not in ('retries', 'max_retries')
+            }
+            try:
+                future = await self.publish(body, queue_name, routing, **options)
+            except Exception as e:  # pylint: disable=W0718
+                self.logger.error(
+                    f"Worker {worker_id} failed to publish event: {e}"
+                )
+                self._retry_event(e, body, queue_name, routing, event)
+                continue
+            future.add_done_callback(
+                lambda f, e=(body, queue_name, routing, event): (
+                    self._event_confirmed(f, *e)
+                )
+            )
+
+    def _event_confirmed(
+        self,
+        future: asyncio.Future,
+        body: Any,
+        queue_name: str,
+        routing_key: str,
+        event: dict
+    ) -> None:
+        exc = None if future.cancelled() else future.exception()
+        self._retry_event(exc, body, queue_name, routing_key, event)
+
+    def _retry_event(
+        self,
+        exc: Optional[BaseException],
+        body: Any,
+        queue_name: str,
+        routing_key: str,
+        event: dict
+    ) -> None:
+        """Re-queue a failed event (the event is done if exc is None)."""
+        retries = event.get('retries', 0) + 1
+        if exc is None or retries >= event.get('max_retries', 5):
+            if exc is not None:
+                self.logger.error(
+                    f"Event {queue_name}.{routing_key} was not published: {exc}"
+                )
+            self.event_queue.task_done()
+            return
+        delay = 2 ** (retries - 1)
+        self.logger.warning(
+            f"Event {queue_name}.{routing_key} was not published: {exc}. "
+            f"Retrying in {delay} seconds..."
+        )
+        retry = {
+            **event,
+            'body': body,
+            'queue_name': queue_name,
+            'routing_key': routing_key,
+            'retries': retries
+        }
+        # the event is done (for event_queue.join) once it's re-queued:
+        asyncio.get_running_loop().call_later(
+            delay, self._requeue_event, retry
+        )
+
+    def _requeue_event(self, event: dict) -> None:
+        try:
+            self.event_queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.logger.error(
+                f"Event queue is full, event {event['routing_key']} was discarded."
+            )
+        finally:
+            self.event_queue.task_done()
@@ -0,0 +1,172 @@
+"""
+RabbitMQ Retry Topology.
+
+Delayed retries of failed messages (per-attempt TTL delay queues) and a
+terminal dead-letter queue, declared automatically for a consumer queue.
+"""
+from typing import Any, Optional
+import aiormq
+from aiormq.abc import AbstractChannel
+
+
+class RetryTopology:
+    """RetryTopology.
+
+    For a queue "events" (with max_retries=3, delay=1):
+
+    * events.retry (direct exchange) routes a failed message, by attempt,
+      to a delay queue: events.retry.1 (TTL 1s), events.retry.2 (2s),
+      events.retry.3 (4s).
+    * the delay queues have no consumers: expired messages are dead-lettered
+      (default exchange) back to the "events" queue.
+    * events.dlx (fanout exchange) routes the messages exceeding max_retries
+      to the terminal dead-letter queue events.dlq.
+
+    Args:
+        queue_name: the consumer queue.
+        max_retries: number of delayed retries (one delay queue per attempt).
+        delay: delay (in seconds) of the first retry, doubled every attempt.
+        max_delay: max delay (in seconds) of a retry.
+    """
+    def __init__(
+        self,
+        queue_name: str,
+        max_retries: int = 3,
+        delay: float = 1.0,
+        max_delay: float = 300.0
+    ):
+        self.queue_name = queue_name
+        self.max_retries = max_retries
+        self.delay = delay
+        self.max_delay = max_delay
+
+    def __repr__(self):
+        return f"<RetryTopology {self.queue_name} retries={self.max_retries}>"
+
+    @property
+    def retry_exchange(self) -> str:
+        return f"{self.queue_name}.retry"
+
+    @property
+    def dead_letter_exchange(self) -> str:
+        return f"{self.queue_name}.dlx"
+
+    @property
+    def dead_letter_queue(self) -> str:
+        return f"{self.queue_name}.dlq"
+
+    def delay_queue(self, attempt: int) -> str:
+        return f"{self.retry_exchange}.{attempt}"
+
+    def delay_of(self, attempt: int) -> float:
+        """Delay (in seconds) before the retry `attempt` (exponential)."""
+        return min(self.delay * (2 ** (attempt - 1)), self.max_delay)
+
+    async def declare(self, channel: AbstractChannel) -> None:
+        """Declare the exchanges and queues (idempotent)."""
+        await channel.exchange_declare(
+            exchange=self.dead_letter_exchange,
+            exchange_type='fanout',
+            durable=True
+        )
+        await channel.queue_declare(queue=self.dead_letter_queue, durable=True)
+        await channel.queue_bind(
+            queue=self.dead_letter_queue,
+            exchange=self.dead_letter_exchange,
+            routing_key=''
+        )
+        if self.max_retries <= 0:
+            return
+        await channel.exchange_declare(
+            exchange=self.retry_exchange,
+            exchange_type='direct',
+            durable=True
+        )
+        for attempt in range(1, self.max_retries + 1):
+            queue = self.delay_queue(attempt)
+            await channel.queue_declare(
+                queue=queue,
+                durable=True,
+                arguments={
+                    "x-message-ttl": int(self.delay_of(attempt) * 1000),
+                    "x-dead-letter-exchange": '',
+                    "x-dead-letter-routing-key": self.queue_name
+                }
+            )
+            await channel.queue_bind(
+                queue=queue,
+                exchange=self.retry_exchange,
+                routing_key=str(attempt)
+            )
+
+    def _routing_key(self, message: aiormq.abc.DeliveredMessage) -> str:
+        """Routing key of the original publish (before any retry)."""
+        properties = message.header.properties or aiormq.spec.Basic.Properties()
+        headers = dict(properties.headers or {})
+        routing_key = headers.get('x-routing-key', message.delivery.routing_key)
+        if isinstance(routing_key, bytes):
+            routing_key = routing_key.decode()
+        return routing_key or ''
+
+    def _properties(
+        self,
+        message: aiormq.abc.DeliveredMessage,
+        headers: dict
+    ) -> aiormq.spec.Basic.Properties:
+        properties = message.header.properties or aiormq.spec.Basic.Properties()
+        return aiormq.spec.Basic.Properties(
+            content_type=properties.content_type,
+            content_encoding=properties.content_encoding,
+            headers={**dict(properties.headers or {}), **headers},
+            delivery_mode=properties.delivery_mode,
+            priority=properties.priority,
+            correlation_id=properties.correlation_id,
+            reply_to=properties.reply_to,
+            # a per-message TTL would override the delay of the queue:
+            expiration=None,
+            message_id=properties.message_id,
+            timestamp=properties.timestamp,
+            message_type=properties.message_type,
+            user_id=properties.user_id,
+            app_id=properties.app_id,
+        )
+
+    async def retry(
+        self,
+        channel: AbstractChannel,
+        message: aiormq.abc.DeliveredMessage,
+        attempt: int
+    ) -> None:
+        """Publish a failed message to the delay queue of the attempt."""
+        await channel.basic_publish(
+            message.body,
+            exchange=self.retry_exchange,
+            routing_key=str(attempt),
+            properties=self._properties(
+                message,
+                {
+                    "x-retry": str(attempt),
+                    "x-routing-key": self._routing_key(message)
+                }
+            )
+        )
+
+    async def dead_letter(
+        self,
+        channel: AbstractChannel,
+        message: aiormq.abc.DeliveredMessage,
+        error: Optional[Any] = None
+    ) -> None:
+        """Publish a message to the terminal dead-letter queue."""
+        await channel.basic_publish(
+            message.body,
+            exchange=self.dead_letter_exchange,
+            routing_key=self._routing_key(message),
+            properties=self._properties(
+                message,
+                {
+                    "x-error": str(error) if error is not None else '',
+                    "x-routing-key": self._routing_key(message)
+                }
+            )
+        )
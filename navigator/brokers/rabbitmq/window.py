@@ -0,0 +1,189 @@
+"""
+RabbitMQ Delivery Window.
+
+In-flight window of a consumer: deliveries are processed concurrently (up to
+a limit), acknowledgements are batched and, optionally, deliveries with the
+same routing key are processed in order.
+"""
+from typing import Optional
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from aiormq.abc import AbstractChannel
+from navconfig.logging import logging
+
+
+class DeliveryWindow:
+    """DeliveryWindow.
+
+    Delivery tags are tracked in arrival order; a batch of consecutive
+    processed deliveries is acknowledged at once (basic_ack with
+    multiple=True), every `ack_batch` processed deliveries or every
+    `ack_interval` seconds. Processed deliveries behind a slower one are
+    acknowledged individually after `ack_interval` seconds (or when
+    `ack_batch` of them are waiting), so they don't hold the prefetch.
+
+    Args:
+        channel: the consumer channel (delivery tags are per channel).
+        concurrency: max number of deliveries processed at once.
+        ack_batch: max number of processed deliveries waiting for an ack.
+        ack_interval: max time (in seconds) a processed delivery waits
+          for an ack.
+        ordered: deliveries with the same routing key are processed one
+          at a time, in arrival order.
+    """
+    def __init__(
+        self,
+        channel: AbstractChannel,
+        concurrency: int = 10,
+        ack_batch: Optional[int] = None,
+        ack_interval: float = 0.05,
+        ordered: bool = False
+    ):
+        if concurrency < 1:
+            raise ValueError(
+                f"Invalid Delivery Window concurrency: {concurrency}"
+            )
+        self.channel = channel
+        self.concurrency = concurrency
+        self.ack_batch: int = ack_batch or max(concurrency // 2, 1)
+        self.ack_interval = ack_interval
+        self.ordered = ordered
+        self.logger = logging.getLogger('RabbitMQ.Window')
+        self._semaphore = asyncio.BoundedSemaphore(concurrency)
+        # [delivery tag, state]: pending, ack (processed) or settled.
+        self._tags: deque = deque()
+        self._entries: dict[int, list] = {}
+        self._ready: int = 0
+        # routing key: [lock, number of deliveries using it]
+        self._keys: dict[str, list] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._flushing = asyncio.Lock()
+        self.acked: int = 0
+        self.ack_frames: int = 0
+
+    def __repr__(self):
+        return (
+            f"<DeliveryWindow concurrency={self.concurrency} "
+            f"in_flight={len(self._tags)}>"
+        )
+
+    @property
+    def prefetch_count(self) -> int:
+        """Deliveries the broker can send without waiting for an ack."""
+        return self.concurrency + self.ack_batch
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._tags),
+            "ready": self._ready,
+            "acked": self.acked,
+            "ack_frames": self.ack_frames
+        }
+
+    def track(self, delivery_tag: int) -> None:
+        """Register a delivery (must be called in arrival order)."""
+        entry = [delivery_tag, 'pending']
+        self._tags.append(entry)
+        self._entries[delivery_tag] = entry
+
+    @asynccontextmanager
+    async def slot(self, routing_key: Optional[str] = None):
+        """Wait for a free slot (and for the turn of the routing key)."""
+        key = None
+        if self.ordered:
+            key = self._keys.get(routing_key)
+            if key is None:
+                key = self._keys[routing_key] = [asyncio.Lock(), 0]
+            key[1] += 1
+        try:
+            if key is not None:
+                await key[0].acquire()
+            try:
+                async with self._semaphore:
+                    yield
+            finally:
+                if key is not None:
+                    key[0].release()
+        finally:
+            if key is not None:
+                key[1] -= 1
+                if key[1] == 0:
+                    del self._keys[routing_key]
+
+    async def ack(self, delivery_tag: int) -> None:
+        """Mark a delivery as processed (acknowledged on the next flush)."""
+        entry = self._entries.get(delivery_tag)
+        if entry is None:
+            return
+        entry[1] = 'ack'
+        self._ready += 1
+        if self._ready >= self.ack_batch:
+            await self.flush()
+        elif self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+
+    async def nack(self, delivery_tag: int, requeue: bool = False) -> None:
+        """Reject a delivery (immediately)."""
+        # settled once sent, so it's never covered by a multiple ack:
+        await self.channel.basic_nack(delivery_tag, requeue=requeue)
+        self.settle(delivery_tag)
+
+    def settle(self, delivery_tag: int) -> None:
+        """Forget a delivery settled outside of the window."""
+        entry = self._entries.get(delivery_tag)
+        if entry is not None:
+            entry[1] = 'settled'
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.ack_interval)
+        await self.flush(force=True)
+
+    async def flush(self, force: bool = False) -> None:
+        """Acknowledge the processed deliveries.
+
+        Args:
+            force: acknowledge the processed deliveries behind a pending one.
+        """
+        async with self._flushing:
+            if self.channel.is_closed:
+                # unacked deliveries are redelivered by the broker.
+                self._tags.clear()
+                self._entries.clear()
+                self._ready = 0
+                return
+            last: Optional[int] = None
+            count = 0
+            while self._tags and self._tags[0][1] != 'pending':
+                tag, state = self._tags.popleft()
+                del self._entries[tag]
+                if state == 'ack':
+                    last = tag
+                    count += 1
+            stragglers = [entry[0] for entry in self._tags if entry[1] == 'ack']
+            if not force and len(stragglers) < self.ack_batch:
+                # waiting (a bit) for the pending deliveries before them:
+                self._ready = len(stragglers)
+                stragglers = []
+            else:
+                self._ready = 0
+            try:
+                if last is not None:
+                    await self.channel.basic_ack(last, multiple=True)
+                    self.ack_frames += 1
+                for tag in stragglers:
+                    self._entries[tag][1] = 'settled'
+                    await self.channel.basic_ack(tag)
+                    self.ack_frames += 1
+                self.acked += count + len(stragglers)
+            except Exception as exc:  # pylint: disable=W0718
+                self.logger.error(f"Error acknowledging deliveries: {exc}")
+
+    async def close(self) -> None:
+        """Acknowledge the processed deliveries and stop the window."""
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        await self.flush(force=True)
@@ -18,7 +18,9 @@ from ...conf import (
     REDIS_BROKER_PORT,
     REDIS_BROKER_PASSWORD,
     REDIS_BROKER_DB,
-    REDIS_BROKER_URL
+    REDIS_BROKER_URL,
+    REDIS_BROKER_BATCH,
+    REDIS_BROKER_CONCURRENCY
 )
 
 class RedisConnection(BaseConnection):
@@ -213,15 +215,61 @@ class RedisConnection(BaseConnection):
         self,
         queue_name: Optional[str],
         callback: Callable[[Dict[str, Any], str], Awaitable[None]],
-        count: int = 1,
-        block: int = 1000,
+        count: Optional[int] = None,
+        block: Optional[int] = 1000,
         **kwargs
     ):
         """
         Consume messages from the specified Redis Stream and process them with the callback.
+
+        Messages are read in batches (`count`, default: REDIS_BROKER_BATCH),
+        processed concurrently by up to `concurrency` handlers (default:
+        REDIS_BROKER_CONCURRENCY) and acknowledged with a single XACK of
+        all the processed IDs. Failed messages are not acknowledged (they
+        remain pending on the consumer group).
         """
         stream = queue_name or self._queue_name
         consumer_name = kwargs.get('consumer_name', self._consumer_name)
+        count = count or REDIS_BROKER_BATCH
+        concurrency = kwargs.get('concurrency', REDIS_BROKER_CONCURRENCY)
+        slots = asyncio.Semaphore(concurrency)
+        handlers: set = set()
+        acks: list = []
+        flusher: Optional[asyncio.Task] = None
+
+        async def flush_acks() -> None:
+            while acks:
+                ids = acks[:]
+                acks.clear()
+                try:
+                    await self._connection.xack(stream, self._group_name, *ids)
+                    self.logger.debug(f"{len(ids)} messages acknowledged.")
+                except Exception as e:
+                    self.logger.error(f"Error acknowledging messages: {e}")
+
+        async def handle(message_id: str, message_data: dict) -> None:
+            nonlocal flusher
+            try:
+                processed_message = await self.process_message(message_data)
+                data = {
+                    "message_id": message_id,
+                    "data": message_data
+                }
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(data, processed_message)
+                else:
+                    callback(data, processed_message)
+                acks.append(message_id)
+                # Acknowledge the processed messages (in background):
+                if flusher is None or flusher.done():
+                    flusher = asyncio.create_task(flush_acks())
+            except Exception as e:
+                self.logger.error(
+                    f"Error processing message {message_id}: {e}"
+                )
+            finally:
+                slots.release()
+
         try:
             # Clean up old messages before starting
             await self.cleanup_old_messages(stream)
@@ -234,37 +282,36 @@ class RedisConnection(BaseConnection):
                     block=block
                 )
                 if not response:
-                    await asyncio.sleep(1)
+                    if block is None:
+                        # non-blocking reads: avoid a busy loop.
+                        await asyncio.sleep(1)
                     continue
                 for _, messages in response:
                     for message_id, message_data in messages:
-                        try:
-                            processed_message = await self.process_message(message_data)
-                            data = {
-                                "message_id": message_id,
-                                "data": message_data
-                            }
-                            if asyncio.iscoroutinefunction(callback):
-                                await callback(data, processed_message)
-                            else:
-                                callback(data, processed_message)
-                            # Acknowledge the message
-                            await self._connection.xack(stream, self._group_name, message_id)
-                            self.logger.info(
-                                f"Message {message_id} acknowledged."
-                            )
-                        except Exception as e:
-                            self.logger.error(
-                                f"Error processing message {message_id}: {e}"
-                            )
+                        # waits for a free handler (backpressure):
+                        await slots.acquire()
+                        handler = asyncio.create_task(
+                            handle(message_id, message_data)
+                        )
+                        handlers.add(handler)
+                        handler.add_done_callback(handlers.discard)
         except (asyncio.CancelledError, KeyboardInterrupt):
             self.logger.info(
                 "Message consumption cancelled. Cleaning up..."
             )
+            # running messages are not acknowledged (remain pending):
+            for handler in list(handlers):
+                handler.cancel()
             raise
         except Exception as e:
             self.logger.error(f"Error consuming messages from stream '{stream}': {e}")
             raise
+        finally:
+            # no handler is left behind, the processed messages are acknowledged:
+            await asyncio.gather(*handlers, return_exceptions=True)
+            if flusher is not None:
+                await asyncio.gather(flusher, return_exceptions=True)
+            await flush_acks()
 
     async def cleanup_old_messages(self, stream):
         """Removes messages older than 7 days from the stream."""
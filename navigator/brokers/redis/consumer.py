@@ -5,9 +5,12 @@ Can be used to consume messages from Redis Streams.
 """
 from typing import Union, Optional, Any
 from collections.abc import Callable, Awaitable
+import time
 import asyncio
 from aiohttp import web
 from navconfig.logging import logging
+from ...conf import QUEUE_LOG_SAMPLE, QUEUE_LOG_INTERVAL
+from ...background.logs import EventLogger
 from .connection import RedisConnection
 from ..consumer import BrokerConsumer
 
@@ -30,6 +33,8 @@ class RedisConsumer(RedisConnection, BrokerConsumer):
         self._queue_name = kwargs.get('queue_name', 'message_stream')
         self._group_name = kwargs.get('group_name', 'default_group')
         self._consumer_name = kwargs.get('consumer_name', 'default_consumer')
+        log_sample = kwargs.pop('log_sample', QUEUE_LOG_SAMPLE)
+        log_interval = kwargs.pop('log_interval', QUEUE_LOG_INTERVAL)
         super().__init__(
             credentials=credentials,
             timeout=timeout,
@@ -40,6 +45,10 @@ class RedisConsumer(RedisConnection, BrokerConsumer):
             **kwargs
         )
         self.logger = logging.getLogger('RedisConsumer')
+        # Message events (sampled, and aggregated into periodic summaries):
+        self.events = EventLogger(
+            self.logger, sample=log_sample, interval=log_interval
+        )
         self.consumer_task: Optional[asyncio.Task] = None
         self._callback_ = callback if callback else self.subscriber_callback
 
@@ -67,13 +76,26 @@ class RedisConsumer(RedisConnection, BrokerConsumer):
         Wraps the user-provided callback for message handling.
         """
         async def wrapped_callback(message_id, body):
+            started = time.monotonic()
+            status = 'done'
+            fields = {}
             try:
                 if asyncio.iscoroutinefunction(callback):
                     await callback(message_id, body)
                 else:
                     callback(message_id, body)
             except Exception as e:
-                self.logger.error(f"Error processing message {message_id}: {e}")
+                # failures are always logged (by the event):
+                status = 'failed'
+                fields['error'] = e
+            self.events.emit(
+                'message.consumed',
+                status=status,
+                duration=time.monotonic() - started,
+                stream=self._queue_name,
+                message_id=message_id,
+                **fields
+            )
         return wrapped_callback
 
     async def event_subscribe(
@@ -132,6 +154,7 @@ class RedisConsumer(RedisConnection, BrokerConsumer):
         Connect to Redis, and start consuming.
         """
         await super().start(app)
+        self.events.start()
         await self.subscribe_to_events(
             queue_name=self._queue_name,
             callback=self._callback_
@@ -143,4 +166,5 @@ class RedisConsumer(RedisConnection, BrokerConsumer):
         Stop consuming and disconnect from Redis.
         """
         await self.stop_consumer()
+        await self.events.stop()
         await super().stop(app)
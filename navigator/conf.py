@@ -207,6 +207,50 @@ MEMCACHE_PORT = config.get("MEMCACHE_PORT", 11211)
 Background Tasks
 """
 QUEUE_CALLBACK = config.get('QUEUE_CALLBACK', fallback=None)
+# Queue Callback receives a list of completion events (instead of one by one):
+QUEUE_CALLBACK_BATCH = config.getboolean(
+    'QUEUE_CALLBACK_BATCH', fallback=False
+)
+# Max number of completion events waiting for the Queue Callback:
+QUEUE_CALLBACK_SIZE = config.getint('QUEUE_CALLBACK_SIZE', fallback=10000)
+# Number of concurrent calls of the Queue Callback:
+QUEUE_CALLBACK_WORKERS = config.getint('QUEUE_CALLBACK_WORKERS', fallback=1)
+# Log one in N successful tasks (failures are always logged, 0: none):
+QUEUE_LOG_SAMPLE = config.getint('QUEUE_LOG_SAMPLE', fallback=100)
+# Seconds between summaries (counts and durations) of the task events:
+QUEUE_LOG_INTERVAL = float(config.get('QUEUE_LOG_INTERVAL', fallback=60))
+# Number of threads (each one with a persistent event loop) for coroutines:
+QUEUE_LOOP_WORKERS = config.getint('QUEUE_LOOP_WORKERS', fallback=4)
+# Processes for CPU-bound tasks (0: number of CPUs):
+QUEUE_PROCESS_WORKERS = config.getint('QUEUE_PROCESS_WORKERS', fallback=0)
+# Start method of those processes (never "fork": the process is multithreaded):
+QUEUE_PROCESS_START = config.get('QUEUE_PROCESS_START', fallback='forkserver')
+# Journal file for persisting the enqueued tasks (disabled by default):
+QUEUE_JOURNAL = config.get('QUEUE_JOURNAL', fallback=None)
+# Overflow policy of a full queue: block, reject, drop_oldest or spill
+QUEUE_OVERFLOW = config.get('QUEUE_OVERFLOW', fallback='block')
+# Max time (in seconds) put() waits for room on "block" policy (0: forever):
+QUEUE_PUT_TIMEOUT = float(config.get('QUEUE_PUT_TIMEOUT', fallback=0))
+# Directory for tasks spilled to disk on "spill" policy (default: tmp dir):
+QUEUE_SPILL_PATH = config.get('QUEUE_SPILL_PATH', fallback=None)
+# Max time (in seconds) for finishing the pending tasks on shutdown:
+QUEUE_DRAIN_TIMEOUT = float(config.get('QUEUE_DRAIN_TIMEOUT', fallback=30))
+# Priority Lanes: {"lane": {"weight": 1, "concurrency": null, "size": 0}}
+QUEUE_LANES = {"default": {"weight": 1}}
+lanes = config.get("QUEUE_LANES")
+if lanes is not None:
+    try:
+        QUEUE_LANES = orjson.loads(lanes)
+    except orjson.JSONDecodeError:
+        logging.exception("NAV: Invalid Queue Lanes on *QUEUE_LANES*")
+# Rate Limits by task class: {"class": {"rate": 10, "per": 1, "concurrency": 2}}
+QUEUE_RATE_LIMITS = {}
+rate_limits = config.get("QUEUE_RATE_LIMITS")
+if rate_limits is not None:
+    try:
+        QUEUE_RATE_LIMITS = orjson.loads(rate_limits)
+    except orjson.JSONDecodeError:
+        logging.exception("NAV: Invalid Queue Rate Limits on *QUEUE_RATE_LIMITS*")
 
 """
 Brokers:
@@ -223,6 +267,27 @@ RABBITMQ_PASS = config.get("RABBITMQ_PASS", fallback="guest")
 RABBITMQ_VHOST = config.get("RABBITMQ_VHOST", fallback="navigator")
 # RabbitMQ DSN
 rabbitmq_dsn = f"amqp://{RABBITMQ_USER}:{RABBITMQ_PASS}@{RABBITMQ_HOST}:{RABBITMQ_PORT}/{RABBITMQ_VHOST}"
+# Delay (in seconds) of the first retry of a failed message (doubled on
+# every attempt, up to RABBITMQ_RETRY_MAX_DELAY):
+RABBITMQ_RETRY_DELAY = float(config.get("RABBITMQ_RETRY_DELAY", fallback=1))
+RABBITMQ_RETRY_MAX_DELAY = float(
+    config.get("RABBITMQ_RETRY_MAX_DELAY", fallback=300)
+)
+# Channels (per connection) for publishing and for consuming on RabbitMQ:
+RABBITMQ_PUBLISH_CHANNELS = config.getint("RABBITMQ_PUBLISH_CHANNELS", fallback=2)
+RABBITMQ_CONSUME_CHANNELS = config.getint("RABBITMQ_CONSUME_CHANNELS", fallback=1)
+# Max number of unconfirmed messages of the RabbitMQ publish pipeline:
+RABBITMQ_MAX_IN_FLIGHT = config.getint("RABBITMQ_MAX_IN_FLIGHT", fallback=1000)
+# Max number of messages written at once by the RabbitMQ publish pipeline:
+RABBITMQ_PUBLISH_BATCH = config.getint("RABBITMQ_PUBLISH_BATCH", fallback=100)
+# Messages processed at once by the RabbitMQ consumers (1: one by one):
+RABBITMQ_CONSUMER_CONCURRENCY = config.getint(
+    "RABBITMQ_CONSUMER_CONCURRENCY", fallback=1
+)
+# Messages with the same routing key are processed in order:
+RABBITMQ_CONSUMER_ORDERED = config.getboolean(
+    "RABBITMQ_CONSUMER_ORDERED", fallback=False
+)
 BROKER_MANAGER_QUEUE_SIZE = config.getint(
     "BROKER_MANAGER_QUEUE_SIZE",
     fallback=4
@@ -236,6 +301,10 @@ REDIS_BROKER_PORT = config.get("REDIS_BROKER_PORT", fallback=CACHE_PORT)
 REDIS_BROKER_PASSWORD = config.get("REDIS_BROKER_PASSWORD", fallback=None)
 REDIS_BROKER_DB = config.get("REDIS_BROKER_DB", fallback=CACHE_DB)
 REDIS_BROKER_URL = f"redis://{REDIS_BROKER_HOST}:{REDIS_BROKER_PORT}/{REDIS_BROKER_DB}"
+# Messages read at once (XREADGROUP count) by the Redis consumers:
+REDIS_BROKER_BATCH = config.getint("REDIS_BROKER_BATCH", fallback=10)
+# Messages processed at once by a Redis consumer:
+REDIS_BROKER_CONCURRENCY = config.getint("REDIS_BROKER_CONCURRENCY", fallback=10)
 
 
 ### Zammad Integration via Actions:
@@ -0,0 +1,24 @@
+import pytest
+from aiohttp import web
+from navigator.background import BackgroundQueue
+
+
+@pytest.fixture
+async def make_queue():
+    """Build (and start) BackgroundQueues, stopped at the end of the test."""
+    queues = []
+
+    async def factory(start: bool = True, **kwargs) -> BackgroundQueue:
+        kwargs.setdefault('max_workers', 3)
+        kwargs.setdefault('queue_size', 10)
+        kwargs.setdefault('drain_timeout', 1)
+        app = web.Application()
+        queue = BackgroundQueue(app, **kwargs)
+        if start:
+            await queue.on_startup(app)
+            queues.append((queue, app))
+        return queue
+
+    yield factory
+    for queue, app in queues:
+        await queue.on_cleanup(app)
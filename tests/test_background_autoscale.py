@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+from navigator.background.autoscale import Autoscaler
+
+
+def make_autoscaler(depth: int = 0, running: int = 0, **kwargs) -> Autoscaler:
+    queue = SimpleNamespace(
+        queue=SimpleNamespace(qsize=lambda: depth, running=running),
+        workers=2
+    )
+    kwargs.setdefault('cpu_limit', 101.0)
+    return Autoscaler(queue, min_workers=1, max_workers=6, **kwargs)
+
+
+def test_scale_up_when_busy():
+    scaler = make_autoscaler(depth=5, running=2)
+    assert scaler.evaluate(2) == 3
+    assert scaler.evaluate(6) == 6
+
+
+def test_scale_up_on_wait_time():
+    scaler = make_autoscaler(depth=1, running=0, target_wait=0.1)
+    assert scaler.evaluate(4) == 4
+    for _ in range(10):
+        scaler.observe(1.0)
+    assert scaler.evaluate(4) == 6
+
+
+def test_scale_down_when_idle():
+    scaler = make_autoscaler(idle_time=0)
+    assert scaler.evaluate(3) == 2
+    assert scaler.evaluate(1) == 1
+
+
+def test_cpu_limit():
+    scaler = make_autoscaler(depth=5, running=2, cpu_limit=-1)
+    assert scaler.evaluate(2) == 2
@@ -0,0 +1,33 @@
+async def total(items, factor=1):
+    return sum(items) * factor
+
+
+async def test_batch_max_size(make_queue):
+    queue = await make_queue()
+    handles = [
+        await queue.put_batch(total, idx, max_size=4, max_wait=10)
+        for idx in range(4)
+    ]
+    assert all(handle is handles[0] for handle in handles)
+    assert await handles[0].wait(2) == 6
+
+
+async def test_batch_max_wait(make_queue):
+    queue = await make_queue()
+    first = await queue.put_batch(total, 1, factor=10, max_wait=0.02)
+    second = await queue.put_batch(total, 2, max_wait=0.02)
+    assert first is second
+    assert first.status == 'scheduled'
+    # options of the first item apply to the batch:
+    assert await first.wait(2) == 30
+
+
+async def test_batch_keys(make_queue):
+    queue = await make_queue()
+    first = await queue.put_batch(total, 1, batch_key='a', max_wait=10)
+    second = await queue.put_batch(total, 2, batch_key='b', max_wait=10)
+    assert first is not second
+    await queue.flush_batch('a')
+    await queue.flush_batch('b')
+    assert await first.wait(2) == 1
+    assert await second.wait(2) == 2
@@ -0,0 +1,74 @@
+import pytest
+from navigator.background import TaskGraph
+
+
+async def fetch(value):
+    return value
+
+
+async def double(value):
+    return value * 2
+
+
+async def combine(left, right):
+    return left + right
+
+
+async def broken(value):
+    raise ValueError('broken')
+
+
+def test_validate_cycles():
+    graph = TaskGraph('cycle')
+    graph.add('a', fetch, 1, depends_on=['b'])
+    graph.add('b', fetch, 2, depends_on=['a'])
+    with pytest.raises(ValueError):
+        graph.validate()
+
+
+def test_validate_unknown_dependency():
+    graph = TaskGraph('unknown')
+    graph.add('a', fetch, 1, depends_on=['missing'])
+    with pytest.raises(ValueError):
+        graph.validate()
+
+
+def test_duplicated_task():
+    graph = TaskGraph('duplicated')
+    graph.add('a', fetch, 1)
+    with pytest.raises(ValueError):
+        graph.add('a', fetch, 2)
+
+
+async def test_graph_results(make_queue):
+    graph = TaskGraph('diamond')
+    graph.add('fetch', fetch, 3)
+    graph.add('left', double, depends_on=['fetch'])
+    graph.add('right', fetch, depends_on=['fetch'])
+    graph.add('combine', combine, depends_on=['left', 'right'])
+    queue = await make_queue()
+    run = await queue.put_graph(graph)
+    results = await run.wait(2)
+    assert results == {'fetch': 3, 'left': 6, 'right': 3, 'combine': 9}
+    assert run.status == 'done'
+
+
+async def test_graph_failure_cancels_dependents(make_queue):
+    graph = TaskGraph('failing')
+    graph.add('fetch', fetch, 1)
+    graph.add('broken', broken, depends_on=['fetch'])
+    graph.add('after', double, depends_on=['broken'])
+    graph.add('last', double, depends_on=['after'])
+    graph.add('other', double, depends_on=['fetch'])
+    queue = await make_queue()
+    run = await queue.put_graph(graph)
+    await run.wait(2)
+    statuses = {name: handle.status for name, handle in run.handles.items()}
+    assert statuses == {
+        'fetch': 'done',
+        'broken': 'failed',
+        'after': 'cancelled',
+        'last': 'cancelled',
+        'other': 'done'
+    }
+    assert run.status == 'failed'
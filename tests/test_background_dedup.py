@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from navigator.background import TaskWrapper
+
+
+async def test_coalesce_pending(make_queue):
+    calls = []
+
+    async def task(value):
+        calls.append(value)
+        return value
+
+    queue = await make_queue(start=False)
+    first = await queue.put(task, 1, dedup_key='key')
+    second = await queue.put(task, 2, dedup_key='key')
+    third = await queue.put(TaskWrapper(task, 3, dedup_key='key'))
+    assert first is second is third
+    assert first.coalesced == 2
+    await queue.on_startup(queue.app)
+    try:
+        assert await first.wait(2) == 1
+        # no longer pending: a duplicate is a new execution.
+        again = await queue.put(task, 4, dedup_key='key')
+        assert again is not first
+        assert await again.wait(2) == 4
+        assert calls == [1, 4]
+    finally:
+        await queue.on_cleanup(queue.app)
+
+
+async def test_debounce(make_queue):
+    calls = []
+
+    async def task(value):
+        calls.append(value)
+
+    queue = await make_queue()
+    handles = [
+        await queue.put(task, idx, dedup_key='key', debounce=0.05)
+        for idx in range(5)
+    ]
+    assert all(handle is handles[0] for handle in handles)
+    assert handles[0].status == 'scheduled'
+    await handles[0].wait(2)
+    assert calls == [0]
+
+
+async def test_put_many_dedup(make_queue):
+    async def task():
+        return 'ok'
+
+    queue = await make_queue(start=False)
+    handles = await queue.put_many([
+        TaskWrapper(task, dedup_key='a'),
+        TaskWrapper(task, dedup_key='a'),
+        TaskWrapper(task, dedup_key='b')
+    ])
+    assert handles[0] is handles[1]
+    assert handles[0] is not handles[2]
+    assert queue.queue.qsize() == 2
+
+
+async def test_cancelled_put_releases_the_key(make_queue):
+    queue = await make_queue(start=False, queue_size=3)
+    for idx in range(3):
+        await queue.put(asyncio.sleep, 0)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(queue.put(asyncio.sleep, 0, dedup_key='key'), 0.05)
+    assert 'key' not in queue._keys
+    assert len(queue._tasks) == 3
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from navigator.background import RedisTransport
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+async def add(a, b):
+    return a + b
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+async def make_transport(server, name: str, **kwargs) -> RedisTransport:
+    transport = RedisTransport(stream='tasks', group='workers', block=10, **kwargs)
+    transport.consumer_name = name
+    transport._broker._consumer_name = name
+    transport._broker._connection = fakeredis.FakeAsyncRedis(
+        server=server, decode_responses=True
+    )
+    await transport._broker.ensure_group_exists()
+    return transport
+
+
+async def test_publish_and_pull(server):
+    transport = await make_transport(server, 'worker-1')
+    await transport.publish([('t1', 'payload-1'), ('t2', 'payload-2')])
+    tasks = await transport.pull(5)
+    assert [(task_id, body) for _, task_id, body in tasks] == [
+        ('t1', 'payload-1'), ('t2', 'payload-2')
+    ]
+    await transport.ack(*(message_id for message_id, _, _ in tasks))
+    conn = transport._broker.get_connection()
+    assert (await conn.xpending('tasks', 'workers'))['pending'] == 0
+
+
+async def test_orphan_tasks_are_claimed(server):
+    dead = await make_transport(server, 'dead', claim_idle=50)
+    await dead.publish([('t1', 'payload-1')])
+    assert len(await dead.pull(5)) == 1
+    # the consumer died without acknowledging the task:
+    dead._heartbeat.cancel()
+    await asyncio.sleep(0.1)
+    alive = await make_transport(server, 'alive', claim_idle=50)
+    tasks = await alive.pull(5)
+    assert [task_id for _, task_id, _ in tasks] == ['t1']
+    await alive.disconnect()
+
+
+async def test_running_tasks_are_not_claimed(server):
+    worker = await make_transport(server, 'worker-1', claim_idle=100)
+    other = await make_transport(server, 'worker-2', claim_idle=100)
+    await worker.publish([('t1', 'payload-1')])
+    (message_id, _, _), = await worker.pull(5)
+    # a task running for longer than claim_idle:
+    await asyncio.sleep(0.3)
+    assert await other.pull(5) == []
+    await worker.ack(message_id)
+    assert not worker._pulled
+    await worker.disconnect()
+
+
+async def test_distributed_queue(make_queue, server):
+    transport = await make_transport(server, 'worker-1')
+    transport.connect = transport._broker.ensure_group_exists
+    queue = await make_queue(transport=transport)
+    handle = await queue.put(add, 1, 2)
+    assert handle.status == 'published'
+    for _ in range(200):
+        executed = queue.get_task(handle.id)
+        if executed is not None and executed.done():
+            break
+        await asyncio.sleep(0.01)
+    assert executed.result == 3
+
+
+async def test_failed_publish_forgets_the_task(make_queue, server):
+    transport = await make_transport(server, 'worker-1')
+    transport.connect = transport._broker.ensure_group_exists
+    queue = await make_queue(transport=transport)
+    publish = transport.publish
+
+    async def broken(tasks):
+        raise ConnectionError('redis is down')
+
+    transport.publish = broken
+    with pytest.raises(ConnectionError):
+        await queue.put(add, 1, 2, dedup_key='sum')
+    assert 'sum' not in queue._keys
+    transport.publish = publish
+    handle = await queue.put(add, 1, 2, dedup_key='sum')
+    assert handle.status == 'published'
+    assert handle.coalesced == 0
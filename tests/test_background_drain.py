@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from navigator.background import QueueDraining, JournalStore
+
+
+async def test_drain_running_tasks(make_queue):
+    queue = await make_queue()
+    handles = [await queue.put(asyncio.sleep, 0.05, idx) for idx in range(4)]
+    report = await queue.drain(timeout=2)
+    assert report['drained'] == 4
+    assert report['dropped'] == 0
+    assert [handle.result for handle in handles] == [0, 1, 2, 3]
+
+
+async def test_not_accepting_while_draining(make_queue):
+    queue = await make_queue()
+    await queue.drain()
+    with pytest.raises(QueueDraining) as exc:
+        await queue.put(asyncio.sleep, 0)
+    assert exc.value.status == 503
+
+
+async def test_drain_timeout(make_queue):
+    queue = await make_queue()
+    handle = await queue.put(asyncio.sleep, 5)
+    await asyncio.sleep(0.01)
+    report = await queue.drain(timeout=0.05)
+    assert report['dropped'] == 1
+    assert handle.status == 'cancelled'
+
+
+async def test_drain_persists_leftovers(make_queue, tmp_path):
+    path = tmp_path.joinpath('queue.journal')
+    queue = await make_queue(store=JournalStore(path), max_workers=2)
+    running = await queue.put(asyncio.sleep, 5)
+    pending = await queue.put(asyncio.sleep, 0)
+    scheduled = await queue.put_after(60, asyncio.sleep, 0)
+    await asyncio.sleep(0.01)
+    report = await queue.drain(timeout=0.05)
+    assert report['persisted'] == 3
+    await queue._store.close()
+    recovered = {task_id for task_id, _ in await JournalStore(path).recover()}
+    assert recovered == {str(running.id), str(pending.id), str(scheduled.id)}
+
+
+async def test_empty_queue(make_queue):
+    queue = await make_queue(start=False)
+    handle = await queue.put(asyncio.sleep, 0)
+    report = await queue.empty_queue()
+    assert report['dropped'] == 1
+    assert handle.status == 'cancelled'
+    assert queue._draining is True
@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+from navigator.background import CompletionEvent, CallbackStream
+
+
+def make_event(idx: int) -> CompletionEvent:
+    handle = SimpleNamespace(
+        id=idx, task=f"task-{idx}", status='done', result=idx, error=None,
+        lane=None, attempts=1, created_at=0.0, started_at=1.0, finished_at=2.0
+    )
+    return CompletionEvent(handle)
+
+
+async def test_callback_per_event():
+    received = []
+
+    async def callback(task, result=None):
+        received.append((task, result))
+
+    stream = CallbackStream(callback, flush_interval=0.01)
+    stream.start()
+    for idx in range(3):
+        stream.push(make_event(idx))
+    await stream.stop()
+    assert received == [('task-0', 0), ('task-1', 1), ('task-2', 2)]
+    assert stream.stats()['delivered'] == 3
+
+
+async def test_callback_batches():
+    batches = []
+
+    def callback(events):
+        batches.append([event.result for event in events])
+
+    stream = CallbackStream(callback, batch=True, batch_size=4, flush_interval=0.01)
+    stream.start()
+    for idx in range(10):
+        stream.push(make_event(idx))
+    await stream.stop()
+    assert [result for batch in batches for result in batch] == list(range(10))
+    assert all(len(batch) <= 4 for batch in batches)
+
+
+async def test_bounded_stream():
+    async def callback(task, result=None):
+        await asyncio.sleep(0)
+
+    stream = CallbackStream(callback, maxsize=5)
+    for idx in range(8):
+        stream.push(make_event(idx))
+    assert len(stream) == 5
+    assert stream.stats()['dropped'] == 3
+
+
+async def test_failing_callback():
+    async def callback(task, result=None):
+        raise ValueError('broken')
+
+    stream = CallbackStream(callback, flush_interval=0.01)
+    stream.start()
+    stream.push(make_event(1))
+    await stream.stop()
+    assert stream.stats()['failed'] == 1
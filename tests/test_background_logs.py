@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import pytest
+from navigator.background import EventLogger
+from navigator.brokers.redis import RedisConsumer
+
+
+class Records(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def records():
+    handler = Records()
+    yield handler
+    for name in ('test.events', 'RedisConsumer', 'NAV.Queue'):
+        logging.getLogger(name).removeHandler(handler)
+
+
+def make_logger(handler, name: str = 'test.events') -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    return logger
+
+
+def test_sampled_events(records):
+    events = EventLogger(make_logger(records), sample=10, interval=0)
+    for idx in range(25):
+        events.emit('task.finished', status='done', duration=0.1, task_id=idx)
+    assert [r.fields['task_id'] for r in records.records] == [0, 10, 20]
+    assert records.records[0].levelno == logging.DEBUG
+    assert records.records[0].event == 'task.finished'
+
+
+def test_failures_are_always_logged(records):
+    events = EventLogger(make_logger(records), sample=0, interval=0)
+    events.emit('task.finished', status='done')
+    events.emit('task.finished', status='failed', error='boom')
+    assert len(records.records) == 1
+    assert records.records[0].levelno == logging.WARNING
+    assert 'status=failed' in records.records[0].getMessage()
+
+
+def test_summary(records):
+    events = EventLogger(make_logger(records), sample=0, interval=0)
+    events.emit('task.finished', status='done', duration=1.0)
+    events.emit('task.finished', status='done', duration=3.0)
+    events.emit('task.finished', status='failed', duration=2.0)
+    summary = events.summary()
+    assert summary['events']['task.finished']['done'] == {
+        "count": 2, "avg": 2.0, "max": 3.0
+    }
+    assert summary['events']['task.finished']['failed']['count'] == 1
+    assert events.summary()['events'] == {}
+
+
+async def test_redis_consumer_failures_logged_once(records):
+    consumer = RedisConsumer(log_interval=0)
+    make_logger(records, 'RedisConsumer')
+
+    async def broken(message_id, body):
+        raise ValueError('broken')
+
+    await consumer.wrap_callback(broken)('1-0', 'body')
+    failures = [r for r in records.records if r.levelno >= logging.WARNING]
+    assert len(failures) == 1
+    assert failures[0].fields['error'].args == ('broken',)
+
+
+async def test_queue_failures_logged_once(records, make_queue):
+    queue = await make_queue(max_retries=0)
+    make_logger(records, 'NAV.Queue')
+
+    async def broken():
+        raise ValueError('broken')
+
+    handle = await queue.put(broken)
+    await handle.wait(2)
+    await asyncio.sleep(0.01)
+    failures = [r for r in records.records if r.levelno >= logging.WARNING]
+    assert len(failures) == 1
+    assert failures[0].event == 'task.finished'
+    assert failures[0].fields['error'] is handle.error
+    assert failures[0].exc_info[1] is handle.error
@@ -0,0 +1,27 @@
+import asyncio
+
+
+async def add(a, b):
+    return a + b
+
+
+async def broken():
+    raise ValueError('broken')
+
+
+async def test_disabled_profiling(make_queue):
+    queue = await make_queue()
+    assert queue.get_metrics() == {}
+
+
+async def test_task_metrics(make_queue):
+    queue = await make_queue(enable_profiling=True)
+    handles = [await queue.put(add, idx, idx) for idx in range(3)]
+    handles.append(await queue.put(broken))
+    await asyncio.gather(*(handle.wait(2) for handle in handles))
+    await asyncio.sleep(0.01)
+    tasks = queue.get_metrics()['tasks']
+    assert tasks['add']['count'] == 3
+    assert tasks['add']['failed'] == 0
+    assert tasks['broken']['failed'] == 1
+    assert set(tasks['add']['latency_ms']) >= {'p50', 'p99', 'histogram'}
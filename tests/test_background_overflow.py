@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from navigator.background import QueueOverflow
+
+
+async def add(a, b):
+    return a + b
+
+
+async def test_small_queue_watermarks(make_queue):
+    queue = await make_queue(start=False, queue_size=2)
+    assert queue.high_watermark == 1
+    assert queue.low_watermark == 0
+
+
+async def test_default_watermarks(make_queue):
+    queue = await make_queue(start=False, queue_size=10)
+    assert (queue.high_watermark, queue.low_watermark) == (8, 5)
+    queue = await make_queue(start=False, queue_size=10, high_watermark=3)
+    assert (queue.high_watermark, queue.low_watermark) == (3, 2)
+
+
+async def test_invalid_watermarks(make_queue):
+    with pytest.raises(ValueError):
+        await make_queue(start=False, queue_size=10, low_watermark=9)
+
+
+async def test_reject(make_queue):
+    queue = await make_queue(start=False, queue_size=4, overflow='reject')
+    for idx in range(3):
+        await queue.put(add, idx, idx)
+    # at the high watermark (3), new tasks are rejected:
+    with pytest.raises(QueueOverflow) as exc:
+        await queue.put(add, 1, 1)
+    assert exc.value.status == 429
+    assert queue.pressure()['overloaded'] is True
+
+
+async def test_drop_oldest(make_queue):
+    queue = await make_queue(start=False, queue_size=2, overflow='drop_oldest')
+    first = await queue.put(add, 1, 1)
+    await queue.put(add, 2, 2)
+    await queue.put(add, 3, 3)
+    assert first.status == 'cancelled'
+    assert isinstance(first.error, QueueOverflow)
+    assert queue.queue.qsize() == 2
+
+
+async def test_block_with_timeout(make_queue):
+    queue = await make_queue(start=False, queue_size=1, put_timeout=0.05)
+    await queue.put(add, 1, 1)
+    with pytest.raises(QueueOverflow):
+        await queue.put(add, 2, 2)
+
+
+async def test_spill(make_queue, tmp_path):
+    queue = await make_queue(
+        start=False, queue_size=4, overflow='spill', spill_path=tmp_path
+    )
+    handles = [await queue.put(add, idx, idx) for idx in range(6)]
+    assert [h.status for h in handles].count('spilled') == 3
+    assert queue.pressure()['spilled'] == 3
+    await queue.on_startup(queue.app)
+    try:
+        results = await asyncio.gather(*(h.wait(2) for h in handles))
+        assert results == [idx * 2 for idx in range(6)]
+        assert queue.pressure()['spilled'] == 0
+    finally:
+        await queue.on_cleanup(queue.app)
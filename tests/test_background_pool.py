@@ -0,0 +1,37 @@
+import asyncio
+import threading
+from navigator.background import EventLoopPool, TaskWrapper
+
+
+async def current_thread():
+    await asyncio.sleep(0)
+    return threading.current_thread().name
+
+
+async def test_pool_runs_coroutines():
+    pool = EventLoopPool(max_workers=2, name='TestPool')
+    try:
+        results = await asyncio.gather(*(pool.run(current_thread()) for _ in range(4)))
+        assert all(name.startswith('TestPool-') for name in results)
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
+
+
+async def test_wrapper_uses_queue_loop_pool(make_queue):
+    pool = EventLoopPool(max_workers=1, name='QueuePool')
+    try:
+        queue = await make_queue(loop_pool=pool)
+        handle = await queue.put(TaskWrapper(current_thread))
+        assert await handle.wait(2) == 'QueuePool-0'
+    finally:
+        pool.shutdown()
+
+
+async def test_wrapper_without_coro_in_threads(make_queue):
+    pool = EventLoopPool(max_workers=1, name='UnusedPool')
+    queue = await make_queue(loop_pool=pool, coro_in_threads=False)
+    handle = await queue.put(TaskWrapper(current_thread))
+    name = await handle.wait(2)
+    assert name.startswith('ThreadPoolExecutor')
+    assert not pool.running
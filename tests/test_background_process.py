@@ -0,0 +1,42 @@
+import os
+import threading
+from functools import partial
+from navigator.background import TaskWrapper
+from navigator.background.process import get_process_pool, run_in_process
+
+
+async def test_pool_is_not_forked():
+    pool = get_process_pool()
+    assert pool._mp_context.get_start_method() != 'fork'
+
+
+async def test_run_in_process():
+    assert await run_in_process(lambda: os.getpid()) != os.getpid()
+    assert await run_in_process(partial(pow, 2), 10) == 1024
+
+
+async def test_put_in_process(make_queue):
+    queue = await make_queue()
+    handle = await queue.put(
+        lambda value: (os.getpid(), value * 2), 21, in_process=True
+    )
+    pid, result = await handle.wait(30)
+    assert handle.status == 'done'
+    assert result == 42
+    assert pid != os.getpid()
+
+
+async def test_wrapper_in_process(make_queue):
+    queue = await make_queue()
+    handle = await queue.put(TaskWrapper(sum, [1, 2, 3], in_process=True))
+    assert await handle.wait(30) == 6
+    handle = await queue.put(partial(max, 4, 7), in_process=True)
+    assert await handle.wait(30) == 7
+
+
+async def test_not_picklable(make_queue):
+    queue = await make_queue()
+    handle = await queue.put(lambda lock: lock, threading.Lock(), in_process=True)
+    await handle.wait(30)
+    assert handle.status == 'failed'
+    assert isinstance(handle.error, RuntimeError)
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from navigator.background import TaskWrapper, TaskHandle
+
+
+async def add(a, b):
+    return a + b
+
+
+def multiply(a, b):
+    return a * b
+
+
+async def test_put_returns_handle(make_queue):
+    queue = await make_queue()
+    handle = await queue.put(add, 1, 2)
+    assert isinstance(handle, TaskHandle)
+    assert await handle.wait(2) == 3
+    assert handle.status == 'done'
+    assert queue.get_task(str(handle.id)) is handle
+
+
+async def test_put_blocking_callable(make_queue):
+    queue = await make_queue()
+    handle = await queue.put(multiply, 3, 4)
+    assert await handle.wait(2) == 12
+
+
+async def test_task_timeout(make_queue):
+    queue = await make_queue()
+    handle = await queue.put(TaskWrapper(asyncio.sleep, 5, timeout=0.05))
+    await handle.wait(2)
+    assert handle.status == 'timeout'
+    assert isinstance(handle.error, asyncio.TimeoutError)
+
+
+async def test_task_retries(make_queue):
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ValueError('flaky')
+        return 'ok'
+
+    queue = await make_queue()
+    handle = await queue.put(TaskWrapper(flaky, max_retries=3, retry_delay=0.01))
+    assert await handle.wait(2) == 'ok'
+    assert handle.attempts == 3
+
+
+async def test_task_failure(make_queue):
+    async def broken():
+        raise ValueError('broken')
+
+    queue = await make_queue(max_retries=1, retry_delay=0.01)
+    handle = await queue.put(broken)
+    await handle.wait(2)
+    assert handle.status == 'failed'
+    assert handle.attempts == 2
+    assert isinstance(handle.error, ValueError)
+
+
+async def test_put_many(make_queue):
+    queue = await make_queue()
+    handles = await queue.put_many([
+        (add, (1, 1)),
+        TaskWrapper(add, 2, 2),
+        (multiply, (2, 3), {})
+    ])
+    results = await asyncio.gather(*(handle.wait(2) for handle in handles))
+    assert results == [2, 4, 6]
+
+
+async def test_put_many_all_or_none(make_queue):
+    queue = await make_queue(start=False, queue_size=3)
+    with pytest.raises(asyncio.QueueFull):
+        await queue.put_many([(add, (1, 1))] * 4)
+    assert queue.queue.qsize() == 0
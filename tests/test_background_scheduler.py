@@ -0,0 +1,56 @@
+import time
+import asyncio
+from navigator.background import TaskHandle
+
+
+async def add(a, b):
+    return a + b
+
+
+async def test_put_after(make_queue):
+    queue = await make_queue()
+    started = time.monotonic()
+    handle = await queue.put_after(0.05, add, 1, 2)
+    assert handle.status == 'scheduled'
+    assert await handle.wait(2) == 3
+    assert time.monotonic() - started >= 0.04
+
+
+async def test_put_at(make_queue):
+    queue = await make_queue()
+    handle = await queue.put_at(time.time() + 0.02, add, 2, 2)
+    assert await handle.wait(2) == 4
+
+
+async def test_cancel_put_after(make_queue):
+    calls = []
+
+    async def task():
+        calls.append(1)
+
+    queue = await make_queue()
+    handle = await queue.put_after(0.05, task)
+    assert queue.unschedule(handle.id) is True
+    assert handle.status == 'cancelled'
+    await asyncio.sleep(0.1)
+    assert calls == []
+    assert len(queue._scheduler) == 0
+    # already cancelled:
+    assert queue.unschedule(str(handle.id)) is False
+
+
+async def test_periodic_task(make_queue):
+    calls = []
+
+    async def tick():
+        calls.append(time.monotonic())
+
+    queue = await make_queue()
+    entry = queue.schedule(0.02, tick, start=time.time())
+    await asyncio.sleep(0.11)
+    assert queue.unschedule(entry.id) is True
+    runs = len(calls)
+    assert runs >= 3
+    await asyncio.sleep(0.05)
+    assert len(calls) == runs
+    assert isinstance(entry.handle, TaskHandle)
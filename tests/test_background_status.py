@@ -0,0 +1,32 @@
+import asyncio
+import orjson
+from aiohttp.test_utils import make_mocked_request
+
+
+async def broken():
+    raise ValueError('broken')
+
+
+async def test_queue_status(make_queue):
+    queue = await make_queue(max_workers=3, admin_url='/queue/status')
+    running = await queue.put(asyncio.sleep, 0.2)
+    failed = await queue.put(broken)
+    await failed.wait(2)
+    await asyncio.sleep(0.01)
+    status = queue.get_status()
+    assert status['workers'] == 2
+    assert [task['task_id'] for task in status['running']] == [str(running.id)]
+    assert status['failures'][0]['task_id'] == str(failed.id)
+    assert status['throughput']['total'] == {'failed': 1}
+    assert {c['state'] for c in status['consumers']} == {'running', 'idle'}
+
+
+async def test_status_handler(make_queue):
+    queue = await make_queue(admin_url='/queue/status')
+    routes = [route.resource.canonical for route in queue.app.router.routes()]
+    assert '/queue/status' in routes
+    response = await queue.status_handler(
+        make_mocked_request('GET', '/queue/status')
+    )
+    assert response.status == 200
+    assert orjson.loads(response.body)['draining'] is False
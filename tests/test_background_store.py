@@ -0,0 +1,99 @@
+import os
+import asyncio
+from navigator.background import JournalStore
+
+
+async def add(a, b):
+    return a + b
+
+
+async def wait_for_task(queue, task_id, timeout: float = 2.0):
+    for _ in range(int(timeout / 0.01)):
+        handle = queue.get_task(task_id)
+        if handle is not None and handle.done():
+            return handle
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Task {task_id} was not replayed")
+
+
+async def test_journal_recover(tmp_path):
+    path = tmp_path.joinpath('queue.journal')
+    store = JournalStore(path)
+    await store.open()
+    handle = type('Handle', (), {})()
+    for task_id in ('a', 'b', 'c'):
+        handle.id = task_id
+        handle.to_payload = lambda task_id=task_id: f"payload-{task_id}"
+        assert store.add(handle) is True
+    store.ack('b')
+    await store.close()
+    recovered = await JournalStore(path).recover()
+    assert recovered == [('a', 'payload-a'), ('c', 'payload-c')]
+
+
+async def test_journal_replay(make_queue, tmp_path):
+    path = tmp_path.joinpath('queue.journal')
+    # a queue that was stopped before running its tasks:
+    store = JournalStore(path)
+    crashed = await make_queue(start=False, store=store)
+    await store.open()
+    handle = await crashed.put(add, 2, 3)
+    assert handle.persisted is True
+    await store.close()
+    # tasks never acknowledged are replayed on startup:
+    queue = await make_queue(store=JournalStore(path))
+    replayed = await wait_for_task(queue, handle.id)
+    assert replayed.result == 5
+    await queue._store.flush()
+    assert await JournalStore(path).recover() == []
+
+
+def dead_pid() -> int:
+    pid = 999999
+    while JournalStore._is_alive(pid):
+        pid -= 1
+    return pid
+
+
+async def add_tasks(store, *task_ids):
+    handle = type('Handle', (), {})()
+    for task_id in task_ids:
+        handle.id = task_id
+        handle.to_payload = lambda task_id=task_id: f"payload-{task_id}"
+        store.add(handle)
+    await store.flush()
+
+
+async def test_journal_per_worker(tmp_path):
+    path = tmp_path.joinpath('queue.journal')
+    alive = JournalStore(path, worker=os.getppid())
+    dead = JournalStore(path, worker=dead_pid())
+    await add_tasks(alive, 'a')
+    await add_tasks(dead, 'b')
+    await alive.close()
+    await dead.close()
+    assert alive.path != dead.path != path
+    store = JournalStore(path)
+    # the tasks of a live sibling worker are not replayed:
+    assert await store.recover() == [('b', 'payload-b')]
+    assert alive.path.exists()
+    assert not dead.path.exists()
+    # the claimed tasks belong to this worker now:
+    assert await JournalStore(path).recover() == [('b', 'payload-b')]
+
+
+async def test_journal_compaction(tmp_path):
+    path = tmp_path.joinpath('queue.journal')
+    store = JournalStore(path, flush_interval=0.01, compact_records=10)
+    await store.open()
+    await add_tasks(store, *(str(idx) for idx in range(20)))
+    for idx in range(19):
+        store.ack(str(idx))
+    await asyncio.sleep(0.1)
+    # compacted while running: only the pending task is kept.
+    assert store.path.read_text().count('\n') == 1
+    await add_tasks(store, 'last')
+    await store.close()
+    assert await JournalStore(path).recover() == [
+        ('19', 'payload-19'), ('last', 'payload-last')
+    ]
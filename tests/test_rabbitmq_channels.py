@@ -0,0 +1,156 @@
+import asyncio
+import pytest
+from navigator.brokers.rabbitmq import RMQConsumer
+from navigator.brokers.rabbitmq import connection as rabbitmq
+from navigator.brokers.rabbitmq.pool import ChannelPool
+
+
+class Channel:
+    def __init__(self, number: int, fail_declare: bool = False):
+        self.number = number
+        self.fail_declare = fail_declare
+        self.closing = asyncio.get_running_loop().create_future()
+        self.calls = []
+
+    @property
+    def is_closed(self):
+        return self.closing.done()
+
+    async def close(self):
+        if not self.closing.done():
+            self.closing.set_result(None)
+
+    async def queue_declare(self, **kwargs):
+        if self.fail_declare:
+            # PRECONDITION_FAILED: the broker closes the channel.
+            await self.close()
+            raise RuntimeError('inequivalent arg durable')
+        self.calls.append(('queue_declare', kwargs))
+
+    def __getattr__(self, name):
+        async def call(**kwargs):
+            self.calls.append((name, kwargs))
+        return call
+
+
+class Connection:
+    def __init__(self, fail_declare: bool = False):
+        self.fail_declare = fail_declare
+        self.channels = []
+        self.is_closed = False
+
+    async def channel(self, publisher_confirms=True):
+        channel = Channel(len(self.channels), self.fail_declare)
+        self.channels.append(channel)
+        return channel
+
+    async def close(self):
+        self.is_closed = True
+
+
+async def test_round_robin():
+    pool = ChannelPool('test', size=3)
+    await pool.open(Connection())
+    channels = [(await pool.acquire()).number for _ in range(4)]
+    assert channels == [0, 1, 2, 0]
+    await pool.channel(1).close()
+    channels = [(await pool.acquire()).number for _ in range(3)]
+    assert channels == [2, 0, 2]
+    await pool.close()
+
+
+async def test_pinned_channels():
+    pool = ChannelPool('test', size=3)
+    await pool.open(Connection())
+    channels = {(await pool.acquire(('events', 'user.created'))) for _ in range(5)}
+    assert len(channels) == 1
+    pinned = channels.pop()
+    await pinned.close()
+    # re-opened on the same slot of the pool:
+    again = await pool.acquire(('events', 'user.created'))
+    assert again is not pinned
+    assert pool.channel(hash(('events', 'user.created')) % 3) is again
+    assert await pool.acquire(('events', 'user.created')) is again
+    await pool.close()
+
+
+async def test_reserve_restored_on_recovery():
+    pool = ChannelPool('test', size=2, recovery_delay=0.01)
+    connection = Connection()
+    await pool.open(connection)
+    setups = []
+
+    async def setup(channel):
+        setups.append(channel.number)
+
+    await pool.reserve(setup)
+    await pool.reserve(setup)
+    assert setups == [0, 1]
+    await pool.channel(0).close()
+    await asyncio.sleep(0.05)
+    # re-opened on a new channel, with its setup:
+    assert setups == [0, 1, 2]
+    assert pool.channel(0).number == 2
+    assert pool.stats() == {
+        "size": 2, "open": 2, "recovering": 0, "recovered": 1
+    }
+    await pool.close()
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    def patch(connection):
+        async def fake_connect(dsn):
+            return connection
+        monkeypatch.setattr(rabbitmq.aiormq, 'connect', fake_connect)
+    return patch
+
+
+async def test_declarations_have_a_channel_of_their_own(connect):
+    connection = Connection()
+    connect(connection)
+    consumer = RMQConsumer(queue_name='events', consume_channels=1)
+    await consumer.connect()
+    try:
+
+        async def callback(message, body):
+            pass
+
+        await consumer.subscribe_to_events(
+            'events', 'events', '#', callback, max_retries=1
+        )
+        consume = consumer._consume_channels.channel(0)
+        declare = consumer.get_channel()
+        assert declare is not consume
+        assert [name for name, _ in consume.calls] == ['basic_qos', 'basic_consume']
+        assert ('queue_declare', {'queue': 'events', 'durable': True}) in declare.calls
+    finally:
+        await consumer.disconnect()
+
+
+async def test_failed_declaration_keeps_the_consumer(connect):
+    connection = Connection()
+    connect(connection)
+    consumer = RMQConsumer(queue_name='events', consume_channels=1)
+    await consumer.connect()
+    try:
+
+        async def callback(message, body):
+            pass
+
+        await consumer.subscribe_to_events(
+            'events', 'events', '#', callback, max_retries=1
+        )
+        consume = consumer._consume_channels.channel(0)
+        declare = consumer.get_channel()
+        declare.fail_declare = True
+        with pytest.raises(RuntimeError):
+            await consumer.subscribe_to_events(
+                'events', 'other', '#', callback, max_retries=1
+            )
+        assert declare.is_closed
+        assert not consume.is_closed
+        # the next declaration gets a new channel:
+        assert await consumer.declare_channel() is not declare
+    finally:
+        await consumer.disconnect()
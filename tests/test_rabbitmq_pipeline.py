@@ -0,0 +1,145 @@
+import asyncio
+import pytest
+from navigator.brokers.rabbitmq import RMQProducer
+from navigator.brokers.rabbitmq.pipeline import PublishPipeline
+
+
+class Channel:
+    def __init__(self, confirm: float = 0, fail: bool = False):
+        self.confirm = confirm
+        self.fail = fail
+        self.published = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def basic_publish(self, body, **kwargs):
+        self.published.append((body, kwargs['routing_key']))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.confirm)
+        finally:
+            self.in_flight -= 1
+        if self.fail:
+            raise RuntimeError('nack')
+        return 'ack'
+
+
+class Connection:
+    def __init__(self, channel: Channel):
+        self.channel = channel
+        self.keys = []
+
+    async def ensure_connection(self):
+        pass
+
+    async def ensure_exchange(self, exchange):
+        pass
+
+    def prepare_message(self, body, headers=None):
+        return body.encode(), headers
+
+    async def publish_channel(self, key=None):
+        self.keys.append(key)
+        return self.channel
+
+
+async def test_confirmed_messages():
+    channel = Channel(confirm=0.01)
+    pipeline = PublishPipeline(Connection(channel), batch_size=10)
+    futures = [
+        await pipeline.publish(f'm{idx}', 'events', f'key.{idx}')
+        for idx in range(25)
+    ]
+    assert await asyncio.gather(*futures) == ['ack'] * 25
+    assert [body for body, _ in channel.published] == [
+        f'm{idx}'.encode() for idx in range(25)
+    ]
+    # many messages waiting for their confirmation at once:
+    assert channel.max_in_flight > 1
+    assert pipeline.stats()['confirmed'] == 25
+    await pipeline.close()
+
+
+async def test_channel_pinned_by_routing_key():
+    connection = Connection(Channel())
+    pipeline = PublishPipeline(connection)
+    futures = [
+        await pipeline.publish('m', 'events', f'key.{idx % 2}') for idx in range(4)
+    ]
+    await asyncio.gather(*futures)
+    assert connection.keys == [('events', 'key.0'), ('events', 'key.1')] * 2
+    await pipeline.close()
+
+
+async def test_max_in_flight():
+    channel = Channel(confirm=0.01)
+    pipeline = PublishPipeline(Connection(channel), max_in_flight=3, batch_size=2)
+    futures = [await pipeline.publish('m', 'events', 'key') for _ in range(10)]
+    await asyncio.gather(*futures)
+    assert channel.max_in_flight <= 3
+    await pipeline.close()
+
+
+async def test_failed_confirmation():
+    pipeline = PublishPipeline(Connection(Channel(fail=True)))
+    future = await pipeline.publish('m', 'events', 'key')
+    with pytest.raises(RuntimeError):
+        await future
+    assert pipeline.stats()['failed'] == 1
+    assert pipeline.in_flight == 0
+    await pipeline.close()
+
+
+async def test_publish_options():
+    channel = Channel()
+    channel.options = []
+    basic_publish = channel.basic_publish
+
+    async def publish(body, **kwargs):
+        channel.options.append(kwargs)
+        return await basic_publish(body, **kwargs)
+
+    channel.basic_publish = publish
+    pipeline = PublishPipeline(Connection(channel))
+    await (await pipeline.publish('m', 'events', 'key'))
+    await (await pipeline.publish('m', 'events', 'key', mandatory=False, timeout=5))
+    assert [(o['mandatory'], o['timeout']) for o in channel.options] == [
+        (True, None), (False, 5)
+    ]
+    await pipeline.close()
+
+
+async def test_close_flushes_the_buffer():
+    pipeline = PublishPipeline(
+        Connection(Channel()), batch_size=100, flush_interval=10
+    )
+    future = await pipeline.publish('m', 'events', 'key')
+    await pipeline.close()
+    assert future.result() == 'ack'
+
+
+async def test_failed_publish_is_requeued():
+    producer = RMQProducer('amqp://localhost', num_workers=1)
+    calls = []
+
+    async def publish(body, queue_name, routing_key, **kwargs):
+        calls.append((body, kwargs))
+        if len(calls) == 1:
+            raise ConnectionError('closed')
+        future = asyncio.get_running_loop().create_future()
+        future.set_result('ack')
+        return future
+
+    producer.publish = publish
+    worker = asyncio.create_task(producer._event_broker(0))
+    try:
+        await producer.queue_event(
+            'event', 'events', 'key', headers={'x-id': '1'}, mandatory=False
+        )
+        await asyncio.wait_for(producer.event_queue.join(), 3)
+    finally:
+        worker.cancel()
+    # the options of the event are kept on every attempt:
+    options = {'headers': {'x-id': '1'}, 'mandatory': False}
+    assert calls == [('event', options), ('event', options)]
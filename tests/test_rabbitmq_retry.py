@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+import aiormq
+from navigator.brokers.rabbitmq import RMQConsumer
+from navigator.brokers.rabbitmq.retry import RetryTopology
+
+
+class Channel:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    def __getattr__(self, name):
+        async def call(*args, **kwargs):
+            if self.fail and name == 'basic_publish':
+                raise RuntimeError('nack')
+            self.calls.append((name, args, kwargs))
+        return call
+
+
+def make_message(retry=None, routing_key='user.created'):
+    headers = {'x-retry': retry} if retry is not None else {}
+    return SimpleNamespace(
+        body=b'{}',
+        delivery_tag=7,
+        delivery=SimpleNamespace(routing_key=routing_key),
+        header=SimpleNamespace(
+            properties=aiormq.spec.Basic.Properties(
+                headers=headers, content_type='application/json'
+            )
+        ),
+        channel=Channel()
+    )
+
+
+async def test_declare():
+    channel = Channel()
+    topology = RetryTopology('events', max_retries=3, delay=1, max_delay=3)
+    await topology.declare(channel)
+    exchanges = {
+        kwargs['exchange']: kwargs['exchange_type']
+        for name, _, kwargs in channel.calls if name == 'exchange_declare'
+    }
+    assert exchanges == {'events.dlx': 'fanout', 'events.retry': 'direct'}
+    queues = {
+        kwargs['queue']: kwargs.get('arguments')
+        for name, _, kwargs in channel.calls if name == 'queue_declare'
+    }
+    assert queues['events.dlq'] is None
+    assert [queues[f'events.retry.{n}']['x-message-ttl'] for n in (1, 2, 3)] == [
+        1000, 2000, 3000
+    ]
+    assert queues['events.retry.1']['x-dead-letter-routing-key'] == 'events'
+
+
+async def test_retry_and_dead_letter():
+    channel = Channel()
+    topology = RetryTopology('events')
+    await topology.retry(channel, make_message(), 2)
+    _, _, kwargs = channel.calls[-1]
+    assert kwargs['exchange'] == 'events.retry'
+    assert kwargs['routing_key'] == '2'
+    assert kwargs['properties'].headers == {
+        'x-retry': '2', 'x-routing-key': 'user.created'
+    }
+    # the original routing key survives the delay queue:
+    message = make_message(retry=b'2', routing_key='events')
+    message.header.properties.headers['x-routing-key'] = b'user.created'
+    await topology.dead_letter(channel, message, ValueError('broken'))
+    _, _, kwargs = channel.calls[-1]
+    assert kwargs['exchange'] == 'events.dlx'
+    assert kwargs['routing_key'] == 'user.created'
+    assert kwargs['properties'].headers['x-error'] == 'broken'
+    assert kwargs['properties'].content_type == 'application/json'
+
+
+async def test_consumer_retry_path():
+    consumer = RMQConsumer(queue_name='events')
+    channel = Channel()
+
+    async def publish_channel():
+        return channel
+
+    consumer.publish_channel = publish_channel
+    topology = RetryTopology('events', max_retries=3)
+    error = ValueError('broken')
+    message = make_message(retry='1')
+    await consumer._retry(message, error, 3, retry=topology)
+    assert channel.calls[-1][2]['exchange'] == 'events.retry'
+    assert message.channel.calls == [('basic_ack', (7,), {})]
+    message = make_message(retry='3')
+    await consumer._retry(message, error, 3, retry=topology)
+    assert channel.calls[-1][2]['exchange'] == 'events.dlx'
+    assert message.channel.calls == [('basic_ack', (7,), {})]
+    # not confirmed: the message goes back to its queue.
+    channel.fail = True
+    message = make_message()
+    await consumer._retry(message, error, 3, retry=topology)
+    assert message.channel.calls == [('basic_nack', (7,), {'requeue': True})]
@@ -0,0 +1,85 @@
+import asyncio
+from navigator.brokers.rabbitmq import RMQConsumer
+from navigator.brokers.rabbitmq.window import DeliveryWindow
+
+
+class Channel:
+    def __init__(self):
+        self.is_closed = False
+        self.calls = []
+
+    async def basic_ack(self, delivery_tag, multiple=False):
+        self.calls.append(('ack', delivery_tag, multiple))
+
+    async def basic_nack(self, delivery_tag, requeue=False):
+        self.calls.append(('nack', delivery_tag, requeue))
+
+
+async def test_batched_acks():
+    channel = Channel()
+    window = DeliveryWindow(channel, concurrency=4, ack_batch=3)
+    for tag in (1, 2, 3):
+        window.track(tag)
+    for tag in (1, 2, 3):
+        await window.ack(tag)
+    assert channel.calls == [('ack', 3, True)]
+    assert window.stats()['acked'] == 3
+    assert len(window) == 0
+
+
+async def test_nack_is_not_covered_by_a_multiple_ack():
+    channel = Channel()
+    window = DeliveryWindow(channel, concurrency=4, ack_batch=10)
+    for tag in (1, 2, 3):
+        window.track(tag)
+    await window.ack(1)
+    await window.nack(2)
+    await window.ack(3)
+    await window.close()
+    assert channel.calls == [('nack', 2, False), ('ack', 3, True)]
+    assert window.acked == 2
+
+
+async def test_stragglers_acked_on_close():
+    channel = Channel()
+    window = DeliveryWindow(channel, concurrency=4, ack_batch=10)
+    for tag in (1, 2, 3):
+        window.track(tag)
+    await window.ack(2)
+    await window.ack(3)
+    await window.close()
+    # 1 is still pending: 2 and 3 are acknowledged one by one.
+    assert channel.calls == [('ack', 2, False), ('ack', 3, False)]
+    assert len(window) == 3
+
+
+async def test_ordered_slots():
+    window = DeliveryWindow(Channel(), concurrency=4, ordered=True)
+    order = []
+
+    async def process(key, name, delay):
+        async with window.slot(key):
+            await asyncio.sleep(delay)
+            order.append(name)
+
+    await asyncio.gather(
+        process('a', 'a1', 0.03),
+        process('a', 'a2', 0),
+        process('b', 'b1', 0.01)
+    )
+    assert order == ['b1', 'a1', 'a2']
+    assert window._keys == {}
+
+
+async def test_consumer_closes_every_window():
+    consumer = RMQConsumer(queue_name='test')
+    channels = [Channel(), Channel()]
+    for channel in channels:
+        window = consumer.delivery_window(channel, concurrency=4)
+        window.track(1)
+        await window.ack(1)
+        consumer._windows.append(window)
+
+    await consumer.stop(None)
+    assert [channel.calls for channel in channels] == [[('ack', 1, True)]] * 2
+    assert consumer._windows == []
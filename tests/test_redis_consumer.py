@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from navigator.brokers.redis.connection import RedisConnection
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+async def make_connection(reads: list) -> RedisConnection:
+    """Connection to a fake Redis; `reads` are the results of xreadgroup."""
+    broker = RedisConnection()
+    broker._queue_name = 'events'
+    broker._group_name = 'workers'
+    broker._connection = conn = fakeredis.FakeAsyncRedis(decode_responses=True)
+    await broker.ensure_group_exists()
+    # the initial message of the stream:
+    [(_, [(initial, _)])] = await conn.xreadgroup(
+        'workers', 'default_consumer', {'events': '>'}
+    )
+    await conn.xack('events', 'workers', initial)
+    xreadgroup = conn.xreadgroup
+
+    async def read(**kwargs):
+        if reads:
+            result = reads.pop(0)
+            if isinstance(result, Exception):
+                raise result
+        response = await xreadgroup(**kwargs)
+        if not response:
+            # fakeredis doesn't block:
+            await asyncio.sleep(kwargs['block'] / 1000)
+        return response
+
+    conn.xreadgroup = read
+    return broker
+
+
+async def pending(broker: RedisConnection) -> int:
+    return (await broker._connection.xpending('events', 'workers'))['pending']
+
+
+async def test_batch_consumption():
+    broker = await make_connection([])
+    for idx in range(5):
+        await broker.publish_message({"idx": idx}, 'events')
+    received = []
+
+    async def callback(message, body):
+        received.append(body['idx'])
+
+    consumer = asyncio.create_task(
+        broker.consume_messages('events', callback, count=2, block=10, concurrency=2)
+    )
+    await asyncio.sleep(0.1)
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+    assert sorted(received) == [0, 1, 2, 3, 4]
+    assert await pending(broker) == 0
+
+
+async def test_failed_messages_remain_pending():
+    broker = await make_connection([])
+    for idx in range(3):
+        await broker.publish_message({"idx": idx}, 'events')
+
+    async def callback(message, body):
+        if body['idx'] == 1:
+            raise ValueError('broken')
+
+    consumer = asyncio.create_task(
+        broker.consume_messages('events', callback, block=10)
+    )
+    await asyncio.sleep(0.1)
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+    assert await pending(broker) == 1
+
+
+async def test_read_error_waits_for_the_handlers():
+    broker = await make_connection([None, ConnectionError('lost')])
+    for idx in range(3):
+        await broker.publish_message({"idx": idx}, 'events')
+    received = []
+
+    async def callback(message, body):
+        await asyncio.sleep(0.05)
+        received.append(body['idx'])
+
+    with pytest.raises(ConnectionError):
+        await broker.consume_messages('events', callback, block=10)
+    # the running handlers finished and their messages were acknowledged:
+    assert sorted(received) == [0, 1, 2]
+    assert await pending(broker) == 0